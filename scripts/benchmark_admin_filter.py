@@ -0,0 +1,146 @@
+"""Compare admin filter evaluation before and after sharing the admin set.
+
+A dispatcher gets `--handlers` admin handlers, each guarded by
+an admin filter and a text filter that never matches, followed by one
+catch-all handler, like the real bot where an update from a regular
+user is checked against every admin handler. The "before" filter
+builds `config.AppSettings()` on every check, the "after" filter is
+`common.filters.AdminFilter` reading admin status computed once by
+`UserContextMiddleware`.
+
+Usage:
+    python scripts/benchmark_admin_filter.py [--updates 2000]
+"""
+import argparse
+import asyncio
+import os
+import pathlib
+import statistics
+import sys
+import time
+
+SRC_PATH = pathlib.Path(__file__).parent.parent / 'src'
+sys.path.insert(0, str(SRC_PATH))
+
+os.environ.setdefault('BOT_TOKEN', '123456789:ABCDEFGHIJKLMNOPQRSabcdefghklm')
+os.environ.setdefault('ADMINS_ID', '[1, 2, 3]')
+
+from aiogram import Bot, Dispatcher  # noqa: E402
+from aiogram.dispatcher.filters import BoundFilter, Text  # noqa: E402
+from aiogram.types import CallbackQuery, Message, Update  # noqa: E402
+
+import config  # noqa: E402
+from common.filters import AdminFilter  # noqa: E402
+from users.middlewares import UserContextMiddleware  # noqa: E402
+
+
+class SettingsAdminFilter(BoundFilter):
+    """Admin filter as it was before the admin set was shared."""
+
+    async def check(
+            self,
+            message_or_callback_query: Message | CallbackQuery,
+    ) -> bool:
+        user_telegram_id = message_or_callback_query.from_user.id
+        if isinstance(message_or_callback_query, (Message, CallbackQuery)):
+            return user_telegram_id in config.AppSettings().admins_id
+
+
+class UserRepositoryStub:
+
+    async def is_banned(self, telegram_id: int) -> bool:
+        return False
+
+    async def get_cached_by_telegram_id(self, telegram_id: int) -> None:
+        return None
+
+
+async def handle(message: Message) -> None:
+    pass
+
+
+def make_update(update_id: int) -> Update:
+    return Update(**{
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'from': {'id': 100, 'is_bot': False, 'first_name': 'User'},
+            'chat': {'id': 100, 'type': 'private'},
+            'date': 1700000000,
+            'text': 'Hello',
+        },
+    })
+
+
+async def benchmark_filter(
+        admin_filter_class: type[BoundFilter],
+        *,
+        handlers_count: int,
+        updates_count: int,
+) -> list[float]:
+    bot = Bot(os.environ['BOT_TOKEN'])
+    dispatcher = Dispatcher(bot)
+    dispatcher.setup_middleware(
+        UserContextMiddleware(
+            user_repository=UserRepositoryStub(),
+            admin_telegram_ids=config.AppSettings().admins_id,
+        ),
+    )
+    for index in range(handlers_count):
+        dispatcher.register_message_handler(
+            handle,
+            admin_filter_class(),
+            Text(f'Admin command {index}'),
+            state='*',
+        )
+    dispatcher.register_message_handler(handle, state='*')
+
+    latencies: list[float] = []
+    for update_id in range(updates_count):
+        update = make_update(update_id)
+        started_at = time.perf_counter()
+        await dispatcher.process_update(update)
+        latencies.append(time.perf_counter() - started_at)
+    await (await bot.get_session()).close()
+    return latencies
+
+
+def format_latencies(latencies: list[float]) -> str:
+    latencies = sorted(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    return (
+        f'{len(latencies) / sum(latencies):9.1f} updates/s'
+        f' | median {statistics.median(latencies) * 1000:7.3f} ms'
+        f' | p99 {p99 * 1000:7.3f} ms'
+    )
+
+
+async def run_benchmarks(*, handlers_count: int, updates_count: int) -> None:
+    for name, admin_filter_class in (
+            ('before (AppSettings per check)', SettingsAdminFilter),
+            ('after (shared admin set)', AdminFilter),
+    ):
+        latencies = await benchmark_filter(
+            admin_filter_class,
+            handlers_count=handlers_count,
+            updates_count=updates_count,
+        )
+        print(f'{name:32} {format_latencies(latencies)}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--handlers', type=int, default=50)
+    parser.add_argument('--updates', type=int, default=2000)
+    arguments = parser.parse_args()
+
+    asyncio.run(
+        run_benchmarks(
+            handlers_count=arguments.handlers,
+            updates_count=arguments.updates,
+        )
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+"""Compare SQLite engine profiles under concurrent reads and writes.
+
+Writers emulate cart updates (stock decrement + cart row update in one
+transaction), readers emulate catalog browsing (products of a category
+with joined media). Every profile from `database.engine.ENGINE_PROFILES`
+runs against its own temporary database file.
+
+Usage:
+    python scripts/benchmark_sqlite_engine_profiles.py [--seconds 5]
+"""
+import argparse
+import pathlib
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from decimal import Decimal
+
+SRC_PATH = pathlib.Path(__file__).parent.parent / 'src'
+sys.path.insert(0, str(SRC_PATH))
+
+import sqlalchemy  # noqa: E402
+from sqlalchemy import select, update  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlalchemy.orm import sessionmaker, joinedload  # noqa: E402
+
+from database import schemas  # noqa: E402
+from database.engine import (  # noqa: E402
+    ENGINE_PROFILES,
+    SQLiteEngineProfile,
+    apply_engine_profile,
+)
+from database.schemas.base import Base  # noqa: E402
+
+PRODUCTS_COUNT = 200
+
+
+def create_session_factory(
+        database_path: pathlib.Path,
+        profile: SQLiteEngineProfile,
+) -> sessionmaker:
+    engine = sqlalchemy.create_engine(f'sqlite:///{database_path}')
+    apply_engine_profile(engine, profile)
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+
+    with session_factory() as session, session.begin():
+        user = schemas.User(telegram_id=1)
+        category = schemas.Category(
+            name='Benchmark',
+            priority=0,
+            max_displayed_stock_count=0,
+            is_hidden=False,
+            can_be_seen=True,
+        )
+        session.add_all((user, category))
+        session.flush()
+        for index in range(PRODUCTS_COUNT):
+            product = schemas.Product(
+                category_id=category.id,
+                name=f'Product {index}',
+                description='Benchmark product',
+                price=Decimal('1.00'),
+                quantity=10 ** 9,
+                max_replacement_time_in_minutes=15,
+                is_duplicated_stock_entries_allowed=False,
+                is_hidden=False,
+                can_be_purchased=True,
+            )
+            session.add(product)
+            session.flush()
+            session.add(
+                schemas.CartProduct(
+                    user_id=user.id,
+                    product_id=product.id,
+                    quantity=0,
+                ),
+            )
+    return session_factory
+
+
+def run_writer(
+        session_factory: sessionmaker,
+        stop_event: threading.Event,
+        latencies: list[float],
+        errors: list[Exception],
+) -> None:
+    product_id = 0
+    while not stop_event.is_set():
+        product_id = product_id % PRODUCTS_COUNT + 1
+        started_at = time.perf_counter()
+        try:
+            with session_factory() as session, session.begin():
+                session.execute(
+                    update(schemas.Product)
+                    .where(schemas.Product.id == product_id)
+                    .values(quantity=schemas.Product.quantity - 1)
+                )
+                session.execute(
+                    update(schemas.CartProduct)
+                    .where(schemas.CartProduct.product_id == product_id)
+                    .values(quantity=schemas.CartProduct.quantity + 1)
+                )
+        except OperationalError as error:
+            errors.append(error)
+        else:
+            latencies.append(time.perf_counter() - started_at)
+
+
+def run_reader(
+        session_factory: sessionmaker,
+        stop_event: threading.Event,
+        latencies: list[float],
+        errors: list[Exception],
+) -> None:
+    statement = (
+        select(schemas.Product)
+        .where(schemas.Product.category_id == 1)
+        .options(
+            joinedload(schemas.Product.media),
+            joinedload(schemas.Product.permitted_gateways),
+        )
+    )
+    while not stop_event.is_set():
+        started_at = time.perf_counter()
+        try:
+            with session_factory() as session:
+                session.scalars(statement).unique().all()
+        except OperationalError as error:
+            errors.append(error)
+        else:
+            latencies.append(time.perf_counter() - started_at)
+
+
+def format_latencies(latencies: list[float], seconds: float) -> str:
+    if not latencies:
+        return 'no successful operations'
+    latencies = sorted(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    return (
+        f'{len(latencies) / seconds:8.1f} ops/s'
+        f' | median {statistics.median(latencies) * 1000:7.2f} ms'
+        f' | p99 {p99 * 1000:7.2f} ms'
+        f' | max {latencies[-1] * 1000:7.2f} ms'
+    )
+
+
+def benchmark_profile(
+        name: str,
+        profile: SQLiteEngineProfile,
+        *,
+        seconds: float,
+        writers_count: int,
+        readers_count: int,
+) -> None:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        session_factory = create_session_factory(
+            database_path=pathlib.Path(temp_dir) / 'benchmark.db',
+            profile=profile,
+        )
+        stop_event = threading.Event()
+        write_latencies: list[float] = []
+        read_latencies: list[float] = []
+        errors: list[Exception] = []
+        threads = [
+            threading.Thread(
+                target=run_writer,
+                args=(session_factory, stop_event, write_latencies, errors),
+            ) for _ in range(writers_count)
+        ] + [
+            threading.Thread(
+                target=run_reader,
+                args=(session_factory, stop_event, read_latencies, errors),
+            ) for _ in range(readers_count)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop_event.set()
+        for thread in threads:
+            thread.join()
+
+    print(f'Profile "{name}": {profile.get_pragmas() or "SQLite defaults"}')
+    print(f'  writes: {format_latencies(write_latencies, seconds)}')
+    print(f'  reads:  {format_latencies(read_latencies, seconds)}')
+    print(f'  "database is locked" errors: {len(errors)}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--readers', type=int, default=4)
+    arguments = parser.parse_args()
+
+    for name, profile in ENGINE_PROFILES.items():
+        benchmark_profile(
+            name,
+            profile,
+            seconds=arguments.seconds,
+            writers_count=arguments.writers,
+            readers_count=arguments.readers,
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""POST recorded Telegram updates to the bot running in webhook mode.
+
+Every file must contain one Update object as returned by Bot API.
+Updates are sent concurrently, the same way Telegram delivers them
+over several connections.
+
+Usage:
+    python scripts/post_webhook_updates.py \
+        --url http://127.0.0.1:8080/webhook \
+        --secret-token <WEBHOOK_SECRET_TOKEN> \
+        scripts/webhook_updates/start_command.json
+"""
+import argparse
+import asyncio
+import json
+import pathlib
+import sys
+import time
+
+import httpx
+
+SRC_PATH = pathlib.Path(__file__).parent.parent / 'src'
+sys.path.insert(0, str(SRC_PATH))
+
+from common.webhook import SECRET_TOKEN_HEADER  # noqa: E402
+
+
+async def post_update(
+        http_client: httpx.AsyncClient,
+        *,
+        url: str,
+        update_path: pathlib.Path,
+) -> None:
+    update = json.loads(update_path.read_text())
+    started_at = time.perf_counter()
+    response = await http_client.post(url, json=update)
+    print(
+        f'{update_path.name}: {response.status_code} {response.text!r}'
+        f' in {(time.perf_counter() - started_at) * 1000:.1f} ms'
+    )
+
+
+async def post_updates(
+        *,
+        url: str,
+        secret_token: str | None,
+        update_paths: list[pathlib.Path],
+        repeat_count: int,
+) -> None:
+    headers = {}
+    if secret_token is not None:
+        headers[SECRET_TOKEN_HEADER] = secret_token
+    async with httpx.AsyncClient(headers=headers, timeout=60) as http_client:
+        await asyncio.gather(
+            *(
+                post_update(http_client, url=url, update_path=update_path)
+                for update_path in update_paths * repeat_count
+            )
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('update_paths', type=pathlib.Path, nargs='+')
+    parser.add_argument('--url', default='http://127.0.0.1:8080/webhook')
+    parser.add_argument('--secret-token')
+    parser.add_argument('--repeat', type=int, default=1)
+    arguments = parser.parse_args()
+
+    asyncio.run(
+        post_updates(
+            url=arguments.url,
+            secret_token=arguments.secret_token,
+            update_paths=arguments.update_paths,
+            repeat_count=arguments.repeat,
+        )
+    )
+
+
+if __name__ == '__main__':
+    main()
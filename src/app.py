@@ -1,12 +1,16 @@
 import asyncio
+import contextlib
 import logging
+import signal
+from datetime import timedelta
 
+import dotenv
 import structlog
 import tzlocal
-from aiogram import Bot, Dispatcher, executor
-from aiogram.contrib.fsm_storage.memory import MemoryStorage
+from aiogram import Dispatcher, executor
 from aiogram.types import ParseMode, BotCommand
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.interval import IntervalTrigger
 
 import backup.handlers
 import cart.handlers
@@ -21,14 +25,33 @@ import support.handlers
 import time_sensitive_discounts.handlers
 import top_up_bonuses.handlers
 import users.handlers
+from cart.debouncer import CartQuantityChangeDebouncer
 from cart.repositories import CartRepository
+from cart.services import CartReservationsSweeper
 from categories.repositories import CategoryRepository
+from common.admins import AdminTelegramIds
+from common.background_tasks import BackgroundTaskQueue
+from common.fsm_storage import SQLiteStorage
 from common.middlewares import DependencyInjectMiddleware
+from common.rate_limiters import TokenBucket
+from common.repositories import RepositoryThreadPool
+from common.send_queue import OutboundSendQueue, QueuedBot
 from common.services import AdminsNotificator
 from common.views import ErrorView
-from database import session_factory
+from common.webhook import (
+    SecretTokenWebhookRequestHandler,
+    create_webhook_app,
+)
+from database import session_factory, async_session_factory
 from database.setup import init_tables
-from payments.services.payments_apis import CoinbaseAPI
+from mailing.repositories import MailingJobRepository
+from mailing.services import MailingJobManager
+from payments.models import PaymentMethod
+from payments.repositories import PendingChargeRepository
+from payments.services.payments_apis import CoinbaseAPI, CoinPaymentsAPI
+from payments.services.payments_apis.http_client import create_http_client
+from payments.services.pending_charges import PendingChargesPoller
+from products.cache import ProductCache
 from products.repositories import ProductRepository
 from sales.repositories import SaleRepository
 from shop_info.repositories import ShopInfoRepository
@@ -40,7 +63,11 @@ from time_sensitive_discounts.repositories import (
     TimeSensitiveDiscountRepository,
 )
 from top_up_bonuses.repositories import TopUpBonusRepository
-from users.middlewares import BannedUserMiddleware, AdminIdentifierMiddleware
+from users.cache import UserCache
+from users.middlewares import (
+    UserContextMiddleware,
+    UserReachabilityMiddleware,
+)
 from users.repositories import UserRepository
 
 logger = structlog.get_logger('app')
@@ -70,8 +97,72 @@ async def set_default_commands(dispatcher: Dispatcher):
     )
 
 
+def reload_admin_telegram_ids(dispatcher: Dispatcher) -> None:
+    dotenv.load_dotenv(override=True)
+    admin_telegram_ids: AdminTelegramIds = dispatcher['admin_telegram_ids']
+    admin_telegram_ids.reload(config.AppSettings().admins_id)
+    logger.info('Admins reloaded', admins_count=len(admin_telegram_ids))
+
+
 async def on_startup(dispatcher):
+    # `kill -HUP` picks up changed ADMINS_ID without restart,
+    # signal handlers are not supported on Windows
+    with contextlib.suppress(NotImplementedError, AttributeError):
+        asyncio.get_running_loop().add_signal_handler(
+            signal.SIGHUP,
+            reload_admin_telegram_ids,
+            dispatcher,
+        )
+    dispatcher['background_task_queue'].start()
     await set_default_commands(dispatcher)
+    user_repository: UserRepository = dispatcher['user_repository']
+    await user_repository.load_banned_telegram_ids()
+    await user_repository.load_unreachable_telegram_ids()
+    mailing_job_manager: MailingJobManager = dispatcher['mailing_job_manager']
+    await mailing_job_manager.resume_running()
+
+
+async def on_shutdown(dispatcher):
+    await dispatcher['cart_quantity_change_debouncer'].shutdown()
+    await dispatcher['mailing_job_manager'].shutdown()
+    await dispatcher['background_task_queue'].shutdown()
+    await dispatcher.bot.send_queue.close()
+    await dispatcher['http_client'].aclose()
+
+
+def start_webhook(
+        dispatcher: Dispatcher,
+        webhook_settings: config.WebhookSettings,
+) -> None:
+
+    async def set_webhook(dispatcher: Dispatcher) -> None:
+        await dispatcher.bot.set_webhook(
+            url=webhook_settings.url + webhook_settings.path,
+            max_connections=webhook_settings.max_concurrent_updates,
+            drop_pending_updates=True,
+            secret_token=webhook_settings.secret_token,
+        )
+
+    if webhook_settings.secret_token is None:
+        logger.warning(
+            'Webhook secret token is not set,'
+            ' requests are accepted without verification',
+        )
+    webhook_executor = executor.Executor(dispatcher)
+    webhook_executor.on_startup((set_webhook, on_startup))
+    webhook_executor.on_shutdown(on_shutdown)
+    webhook_executor.set_webhook(
+        webhook_path=webhook_settings.path,
+        request_handler=SecretTokenWebhookRequestHandler,
+        web_app=create_webhook_app(
+            secret_token=webhook_settings.secret_token,
+            max_concurrent_updates=webhook_settings.max_concurrent_updates,
+        ),
+    )
+    webhook_executor.run_app(
+        host=webhook_settings.host,
+        port=webhook_settings.port,
+    )
 
 
 def setup_logging():
@@ -93,15 +184,30 @@ def setup_logging():
 
 
 def main():
-    bot = Bot(config.AppSettings().bot_token, parse_mode=ParseMode.HTML)
-    dispatcher = Dispatcher(bot, storage=MemoryStorage())
-
+    app_settings = config.AppSettings()
+    send_queue = OutboundSendQueue(
+        global_rate=app_settings.telegram_global_rate_limit,
+        per_chat_rate=app_settings.telegram_per_chat_rate_limit,
+    )
+    bot = QueuedBot(
+        app_settings.bot_token,
+        parse_mode=ParseMode.HTML,
+        send_queue=send_queue,
+    )
     config.PRODUCT_UNITS_PATH.mkdir(parents=True, exist_ok=True)
     config.MEDIA_FILES_PATH.mkdir(parents=True, exist_ok=True)
 
+    storage = SQLiteStorage(
+        config.DATA_PATH / 'fsm_states.db',
+        state_ttl=app_settings.fsm_state_ttl,
+    )
+    dispatcher = Dispatcher(bot, storage=storage)
+
     scheduler = AsyncIOScheduler(timezone=str(tzlocal.get_localzone()))
-    app_settings = config.AppSettings()
-    admin_telegram_ids = app_settings.admins_id
+    scheduler.add_job(send_queue.log_stats, IntervalTrigger(minutes=5))
+    scheduler.add_job(storage.log_stats, IntervalTrigger(minutes=5))
+    admin_telegram_ids = AdminTelegramIds(app_settings.admins_id)
+    dispatcher['admin_telegram_ids'] = admin_telegram_ids
 
     setup_logging()
     # tasks.setup_tasks(scheduler)
@@ -110,29 +216,149 @@ def main():
 
     coinbase_settings = config.CoinbaseSettings()
 
+    user_cache = UserCache(
+        ttl=app_settings.user_cache_ttl,
+        max_size=app_settings.user_cache_max_size,
+    )
+    scheduler.add_job(user_cache.log_stats, IntervalTrigger(minutes=5))
+    user_repository = UserRepository(async_session_factory, user_cache)
+    dispatcher['user_repository'] = user_repository
+    background_task_queue = BackgroundTaskQueue()
+    dispatcher['background_task_queue'] = background_task_queue
     admins_notificator = AdminsNotificator(
         bot=bot,
-        admin_ids=app_settings.admins_id,
+        admin_ids=admin_telegram_ids,
+        user_repository=user_repository,
+        background_task_queue=background_task_queue,
     )
 
-    user_repository = UserRepository(session_factory)
-    dispatcher.setup_middleware(BannedUserMiddleware(user_repository))
-    dispatcher.setup_middleware(AdminIdentifierMiddleware(admin_telegram_ids))
+    if app_settings.repository_thread_pool_size > 0:
+        repository_thread_pool = RepositoryThreadPool(
+            max_workers=app_settings.repository_thread_pool_size,
+        )
+        scheduler.add_job(
+            repository_thread_pool.log_stats,
+            IntervalTrigger(minutes=5),
+        )
+    else:
+        repository_thread_pool = None
+
+    product_cache = ProductCache(
+        max_size=app_settings.product_cache_max_size,
+    )
+    scheduler.add_job(product_cache.log_stats, IntervalTrigger(minutes=5))
+
+    cart_repository = CartRepository(
+        session_factory,
+        product_cache,
+        reservation_ttl=timedelta(
+            minutes=app_settings.cart_reservation_ttl_in_minutes,
+        ),
+    )
+    cart_reservations_sweeper = CartReservationsSweeper(cart_repository)
+    scheduler.add_job(
+        cart_reservations_sweeper.sweep,
+        IntervalTrigger(minutes=1),
+        max_instances=1,
+        coalesce=True,
+    )
+    scheduler.add_job(
+        cart_reservations_sweeper.log_stats,
+        IntervalTrigger(minutes=5),
+    )
+    cart_quantity_change_debouncer = CartQuantityChangeDebouncer(
+        cart_repository,
+        delay=app_settings.cart_quantity_change_delay,
+    )
+    dispatcher['cart_quantity_change_debouncer'] = (
+        cart_quantity_change_debouncer
+    )
+    scheduler.add_job(
+        cart_quantity_change_debouncer.log_stats,
+        IntervalTrigger(minutes=5),
+    )
+
+    http_client = create_http_client()
+    dispatcher['http_client'] = http_client
+    coinbase_api = CoinbaseAPI(
+        coinbase_settings.api_key,
+        http_client=http_client,
+    )
+    payment_apis = {PaymentMethod.COINBASE: coinbase_api}
+    coinpayments_settings = config.CoinpaymentsSettings()
+    if coinpayments_settings.is_enabled:
+        payment_apis[PaymentMethod.COINPAYMENTS] = CoinPaymentsAPI(
+            coinpayments_settings.public_key,
+            coinpayments_settings.secret_key,
+            http_client=http_client,
+        )
+    pending_charge_repository = PendingChargeRepository(
+        session_factory,
+        repository_thread_pool,
+        user_cache,
+    )
+    top_up_bonus_repository = TopUpBonusRepository(session_factory)
+    pending_charges_poller = PendingChargesPoller(
+        bot=bot,
+        payment_apis=payment_apis,
+        pending_charge_repository=pending_charge_repository,
+        top_up_bonus_repository=top_up_bonus_repository,
+        admins_notificator=admins_notificator,
+    )
+    scheduler.add_job(
+        pending_charges_poller.poll,
+        IntervalTrigger(seconds=30),
+        max_instances=1,
+        coalesce=True,
+    )
+
+    scheduler.add_job(
+        user_repository.load_banned_telegram_ids,
+        IntervalTrigger(minutes=10),
+    )
+    mailing_job_manager = MailingJobManager(
+        bot=bot,
+        mailing_job_repository=MailingJobRepository(
+            session_factory,
+            repository_thread_pool,
+        ),
+        user_repository=user_repository,
+        rate_limiter=TokenBucket(rate=app_settings.mailing_rate_limit),
+        workers_count=app_settings.mailing_workers_count,
+    )
+    dispatcher['mailing_job_manager'] = mailing_job_manager
+    user_context_middleware = UserContextMiddleware(
+        user_repository=user_repository,
+        admin_telegram_ids=admin_telegram_ids,
+    )
+    dispatcher.setup_middleware(user_context_middleware)
+    dispatcher.setup_middleware(UserReachabilityMiddleware(user_repository))
     dispatcher.setup_middleware(
         DependencyInjectMiddleware(
             bot=bot,
             dispatcher=dispatcher,
             user_repository=user_repository,
-            product_repository=ProductRepository(session_factory),
-            category_repository=CategoryRepository(session_factory),
-            cart_repository=CartRepository(session_factory),
+            product_repository=ProductRepository(
+                session_factory,
+                repository_thread_pool,
+                product_cache,
+            ),
+            category_repository=CategoryRepository(
+                session_factory,
+                repository_thread_pool,
+            ),
+            cart_repository=cart_repository,
+            cart_quantity_change_debouncer=cart_quantity_change_debouncer,
             sale_repository=SaleRepository(session_factory),
             time_sensitive_discount_repository=(
                 TimeSensitiveDiscountRepository(session_factory)
             ),
-            top_up_bonus_repository=TopUpBonusRepository(session_factory),
-            coinbase_api=CoinbaseAPI(coinbase_settings.api_key),
+            top_up_bonus_repository=top_up_bonus_repository,
+            pending_charge_repository=pending_charge_repository,
+            coinbase_api=coinbase_api,
             admins_notificator=admins_notificator,
+            background_task_queue=background_task_queue,
+            mailing_job_manager=mailing_job_manager,
             support_ticket_repository=SupportTicketRepository(session_factory),
             support_ticket_reply_repository=(
                 SupportTicketReplyRepository(session_factory)
@@ -144,13 +370,19 @@ def main():
     register_handlers(dispatcher)
 
     setup_logging()
+    scheduler.start()
 
+    webhook_settings = config.WebhookSettings()
     try:
-        executor.start_polling(
-            dispatcher=dispatcher,
-            on_startup=on_startup,
-            skip_updates=True,
-        )
+        if webhook_settings.is_enabled:
+            start_webhook(dispatcher, webhook_settings)
+        else:
+            executor.start_polling(
+                dispatcher=dispatcher,
+                on_startup=on_startup,
+                on_shutdown=on_shutdown,
+                skip_updates=True,
+            )
     except RuntimeError as error:
         logger.critical("Error during bot starting!")
         view = ErrorView(error)
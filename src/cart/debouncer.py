@@ -0,0 +1,206 @@
+import asyncio
+import contextlib
+from dataclasses import dataclass, field
+from typing import Protocol
+
+import structlog
+from aiogram.types import Message
+from aiogram.utils.exceptions import MessageNotModified
+from structlog.stdlib import BoundLogger
+
+from cart.exceptions import (
+    CartProductDoesNotExistError,
+    NotEnoughProductQuantityError,
+    ProductQuantityOutOfRangeError,
+)
+from cart.models import CartProduct, QuantityChangeDebouncerStats
+from cart.views import UserShoppingCartView
+from common.views import edit_message_by_view
+
+__all__ = ('CartQuantityChangeDebouncer',)
+
+logger: BoundLogger = structlog.get_logger('app')
+
+
+class HasCartQuantityMethods(Protocol):
+
+    def get_cart_products(
+            self,
+            *,
+            user_telegram_id: int,
+    ) -> list[CartProduct]: ...
+
+    def change_quantity(
+            self,
+            *,
+            cart_product_id: int,
+            user_telegram_id: int,
+            quantity_delta: int,
+    ) -> list[CartProduct]: ...
+
+
+@dataclass(slots=True)
+class _PendingChanges:
+    message: Message
+    quantity_deltas: dict[int, int] = field(default_factory=dict)
+    flush_task: asyncio.Task | None = None
+
+
+class CartQuantityChangeDebouncer:
+    """Coalesces user's rapid cart quantity changes into one write.
+
+    Changes are summed per cart product until the user stops tapping
+    for `delay` seconds, then the net change is applied and the cart
+    message is edited once. If the net change is not allowed by stock
+    or order limits, it is reduced towards zero until it is allowed.
+    That matches applying changes one by one, except for minimum order
+    quantity: the net change can reach it at once, although every
+    single change would have been rejected.
+
+    Repository is synchronous, so changes are applied in a thread.
+    """
+
+    def __init__(
+            self,
+            cart_repository: HasCartQuantityMethods,
+            *,
+            delay: float = 0.7,
+    ):
+        self.__cart_repository = cart_repository
+        self.__delay = delay
+        self.__pending_changes: dict[int, _PendingChanges] = {}
+        self.__changes_count = 0
+        self.__writes_count = 0
+        self.__edits_count = 0
+
+    def add(
+            self,
+            *,
+            message: Message,
+            user_telegram_id: int,
+            cart_product_id: int,
+            quantity_delta: int,
+    ) -> None:
+        """Schedule quantity change, postponing pending changes of user.
+
+        Args:
+            message: Cart message to edit after changes are applied.
+            user_telegram_id: Telegram ID of cart owner.
+            cart_product_id: ID of cart product to change.
+            quantity_delta: Number of pieces to add, negative to remove.
+        """
+        self.__changes_count += 1
+        pending_changes = self.__pending_changes.setdefault(
+            user_telegram_id,
+            _PendingChanges(message=message),
+        )
+        pending_changes.message = message
+        pending_changes.quantity_deltas[cart_product_id] = (
+            pending_changes.quantity_deltas.get(cart_product_id, 0)
+            + quantity_delta
+        )
+        if pending_changes.flush_task is not None:
+            pending_changes.flush_task.cancel()
+        pending_changes.flush_task = asyncio.create_task(
+            self.__flush_later(user_telegram_id),
+        )
+
+    async def __flush_later(self, user_telegram_id: int) -> None:
+        await asyncio.sleep(self.__delay)
+        await self.__flush(user_telegram_id)
+
+    async def __flush(self, user_telegram_id: int) -> None:
+        # new changes made while this one is applied are pending again
+        pending_changes = self.__pending_changes.pop(user_telegram_id)
+        try:
+            cart_products, writes_count = await asyncio.to_thread(
+                self.__apply,
+                user_telegram_id=user_telegram_id,
+                quantity_deltas=pending_changes.quantity_deltas,
+            )
+            self.__writes_count += writes_count
+            if cart_products is None:
+                return
+            view = UserShoppingCartView(cart_products)
+            with contextlib.suppress(MessageNotModified):
+                await edit_message_by_view(
+                    message=pending_changes.message,
+                    view=view,
+                )
+            self.__edits_count += 1
+        except Exception:
+            logger.exception(
+                'Could not apply cart quantity changes',
+                user_telegram_id=user_telegram_id,
+            )
+
+    def __apply(
+            self,
+            *,
+            user_telegram_id: int,
+            quantity_deltas: dict[int, int],
+    ) -> tuple[list[CartProduct] | None, int]:
+        """Apply net changes of cart products.
+
+        Returns:
+            Cart products after changes, or None if cart has not been
+            changed, and number of quantity updates made.
+        """
+        cart_products = None
+        writes_count = 0
+        is_cart_outdated = False
+        for cart_product_id, quantity_delta in quantity_deltas.items():
+            step = 1 if quantity_delta > 0 else -1
+            while quantity_delta != 0:
+                writes_count += 1
+                try:
+                    cart_products = self.__cart_repository.change_quantity(
+                        cart_product_id=cart_product_id,
+                        user_telegram_id=user_telegram_id,
+                        quantity_delta=quantity_delta,
+                    )
+                except (
+                        NotEnoughProductQuantityError,
+                        ProductQuantityOutOfRangeError,
+                ):
+                    quantity_delta -= step
+                except CartProductDoesNotExistError:
+                    is_cart_outdated = True
+                    break
+                else:
+                    break
+        if is_cart_outdated and cart_products is None:
+            # cart message shows deleted product, show the actual cart
+            cart_products = self.__cart_repository.get_cart_products(
+                user_telegram_id=user_telegram_id,
+            )
+        return cart_products, writes_count
+
+    async def shutdown(self) -> None:
+        """Apply pending changes right away."""
+        # cancel all delayed flushes first, so none of them takes
+        # changes away while others are being applied
+        for pending_changes in self.__pending_changes.values():
+            if pending_changes.flush_task is not None:
+                pending_changes.flush_task.cancel()
+        for user_telegram_id in tuple(self.__pending_changes):
+            if user_telegram_id in self.__pending_changes:
+                await self.__flush(user_telegram_id)
+
+    def get_stats(self) -> QuantityChangeDebouncerStats:
+        return QuantityChangeDebouncerStats(
+            changes_count=self.__changes_count,
+            writes_count=self.__writes_count,
+            edits_count=self.__edits_count,
+            pending_users_count=len(self.__pending_changes),
+        )
+
+    def log_stats(self) -> None:
+        stats = self.get_stats()
+        logger.info(
+            'Cart quantity change debouncer stats',
+            changes_count=stats.changes_count,
+            writes_count=stats.writes_count,
+            edits_count=stats.edits_count,
+            pending_users_count=stats.pending_users_count,
+        )
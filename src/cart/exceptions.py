@@ -10,3 +10,10 @@ class ProductQuantityOutOfRangeError(Exception):
     def __init__(self, *args, product_id: int):
         super().__init__(*args)
         self.product_id = product_id
+
+
+class CartProductDoesNotExistError(Exception):
+
+    def __init__(self, *args, cart_product_id: int):
+        super().__init__(*args)
+        self.cart_product_id = cart_product_id
@@ -3,13 +3,18 @@ from typing import Literal
 from aiogram import Dispatcher
 from aiogram.dispatcher import FSMContext
 from aiogram.dispatcher.filters import Text
-from aiogram.types import Message, ContentType, ChatType, CallbackQuery
+from aiogram.types import (
+    CallbackQuery,
+    ChatType,
+    ContentType,
+    Message,
+)
 
 from cart.callback_data import (
     CartProductDeleteCallbackData, CartProductQuantityUpdateCallbackData,
 )
+from cart.debouncer import CartQuantityChangeDebouncer
 from cart.repositories import CartRepository
-from cart.services import validate_product_quantity_change
 from cart.states import UserShoppingCartDeleteAllStates
 from cart.views import (
     UserShoppingCartView,
@@ -19,41 +24,22 @@ from common.views import answer_view, edit_message_by_view
 
 __all__ = ('register_handlers',)
 
-from products.repositories import ProductRepository
-
 
 async def on_product_quantity_update_in_shopping_cart(
         callback_query: CallbackQuery,
         callback_data: dict,
         state: FSMContext,
-        cart_repository: CartRepository,
-        product_repository: ProductRepository,
+        cart_quantity_change_debouncer: CartQuantityChangeDebouncer,
 ) -> None:
     cart_product_id: int = callback_data['cart_product_id']
     action: Literal['increment', 'decrement'] = callback_data['action']
-    cart_product = cart_repository.get_by_id(cart_product_id)
-    product = product_repository.get_by_id(cart_product.product.id)
-
-    will_be_changed_to = (
-        cart_product.quantity + 1 if action == 'increment'
-        else cart_product.quantity - 1
-    )
-
-    validate_product_quantity_change(
-        product=product,
-        cart_product_quantity=cart_product.quantity,
-        will_be_changed_to=will_be_changed_to,
-    )
-    cart_repository.update_quantity(
-        product_id=product.id,
-        quantity=will_be_changed_to,
-        cart_product_id=cart_product_id,
-    )
-    cart_products = cart_repository.get_cart_products(
+    cart_quantity_change_debouncer.add(
+        message=callback_query.message,
         user_telegram_id=callback_query.from_user.id,
+        cart_product_id=cart_product_id,
+        quantity_delta=1 if action == 'increment' else -1,
     )
-    view = UserShoppingCartView(cart_products)
-    await edit_message_by_view(message=callback_query.message, view=view)
+    await callback_query.answer()
     await state.finish()
 
 
@@ -16,7 +16,8 @@ from cart.views import (
 from common.views import answer_view
 from products.callback_data import UserProductAddToCartCallbackData
 from products.repositories import ProductRepository
-from users.repositories import UserRepository
+from users.exceptions import UserNotInDatabase
+from users.models import User
 
 __all__ = ('register_handlers',)
 
@@ -26,7 +27,9 @@ async def on_not_enough_product_quantity_error(
         exception: NotEnoughProductQuantityError,
         product_repository: ProductRepository,
 ) -> bool:
-    product = product_repository.get_by_id(product_id=exception.product_id)
+    product = await product_repository.get_by_id(
+        product_id=exception.product_id,
+    )
     view = NotEnoughProductQuantityWarningView(product.quantity)
     if update.message is not None:
         await answer_view(message=update.message, view=view)
@@ -43,7 +46,7 @@ async def on_product_quantity_out_of_range_error(
         exception: ProductQuantityOutOfRangeError,
         product_repository: ProductRepository,
 ) -> bool:
-    product = product_repository.get_by_id(exception.product_id)
+    product = await product_repository.get_by_id(exception.product_id)
     view = ProductQuantityOutOfRangeWarningView(product)
     if update.message is not None:
         await answer_view(message=update.message, view=view)
@@ -69,7 +72,7 @@ async def on_add_product_to_cart(
 async def on_product_quantity_input(
         message: Message,
         state: FSMContext,
-        user_repository: UserRepository,
+        user: User | None,
         product_repository: ProductRepository,
         cart_repository: CartRepository,
 ) -> None:
@@ -80,14 +83,15 @@ async def on_product_quantity_input(
     state_data = await state.get_data()
     product_id: int = state_data['product_id']
     quantity = int(message.text)
-    product = product_repository.get_by_id(product_id)
+    product = await product_repository.get_by_id(product_id)
 
     validate_product_quantity_change(
         product=product,
         cart_product_quantity=0,
         will_be_changed_to=quantity,
     )
-    user = user_repository.get_by_telegram_id(message.from_user.id)
+    if user is None:
+        raise UserNotInDatabase
     cart_repository.create(
         user_id=user.id,
         product_id=product.id,
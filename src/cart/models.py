@@ -4,6 +4,9 @@ from decimal import Decimal
 __all__ = (
     'Product',
     'CartProduct',
+    'ReleasedReservations',
+    'ReservationsSweeperStats',
+    'QuantityChangeDebouncerStats',
 )
 
 
@@ -23,3 +26,44 @@ class CartProduct:
     @property
     def total_cost(self) -> Decimal:
         return self.product.price * self.quantity
+
+
+@dataclass(frozen=True, slots=True)
+class ReleasedReservations:
+    """Outcome of returning reserved stock from carts to products.
+
+    Attributes:
+        cart_products_count: Number of deleted cart products.
+        products_count: Number of products that got their stock back.
+        quantity: Total number of pieces returned to stock.
+    """
+
+    cart_products_count: int = 0
+    products_count: int = 0
+    quantity: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class ReservationsSweeperStats:
+    """Totals of expired reservations released since the bot started."""
+
+    sweeps_count: int
+    released_cart_products_count: int
+    released_quantity: int
+
+
+@dataclass(frozen=True, slots=True)
+class QuantityChangeDebouncerStats:
+    """Cart quantity changes made by users and work done to apply them.
+
+    Attributes:
+        changes_count: Number of quantity changes made by users.
+        writes_count: Number of quantity updates in the database.
+        edits_count: Number of cart message edits.
+        pending_users_count: Number of users with changes not applied yet.
+    """
+
+    changes_count: int
+    writes_count: int
+    edits_count: int
+    pending_users_count: int
@@ -1,15 +1,50 @@
-from sqlalchemy import select, update, delete
-from sqlalchemy.orm import Session
+from collections.abc import Iterable
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import ColumnElement, func, or_, select, update, delete
+from sqlalchemy.orm import Session, sessionmaker
 
 from cart import models as cart_models
+from cart.exceptions import (
+    CartProductDoesNotExistError,
+    NotEnoughProductQuantityError,
+    ProductQuantityOutOfRangeError,
+)
 from common.repositories import BaseRepository
 from database.schemas import CartProduct, User, Product
+from products.cache import ProductCache
 from products.exceptions import ProductDoesNotExistError
 
 __all__ = ('CartRepository',)
 
 
 class CartRepository(BaseRepository):
+    """Users' carts storage.
+
+    Adding products to cart reserves their stock, so every method that
+    changes stock invalidates the product in product cache if provided.
+    Reservation expires after `reservation_ttl` since the last change
+    of the cart product, then `release_expired` returns it to stock.
+    """
+
+    def __init__(
+            self,
+            session_factory: sessionmaker,
+            product_cache: ProductCache | None = None,
+            reservation_ttl: timedelta = timedelta(hours=1),
+    ):
+        super().__init__(session_factory)
+        self.__product_cache = product_cache
+        self.__reservation_ttl = reservation_ttl
+
+    def __get_expires_at(self) -> datetime:
+        return _get_utc_now() + self.__reservation_ttl
+
+    def __invalidate_products(self, product_ids: Iterable[int]) -> None:
+        if self.__product_cache is None:
+            return
+        for product_id in product_ids:
+            self.__product_cache.invalidate_product(product_id)
 
     def get_by_id(self, cart_product_id: int) -> cart_models.CartProduct:
         statement = (
@@ -42,6 +77,18 @@ class CartRepository(BaseRepository):
             self,
             *,
             user_telegram_id: int,
+    ) -> list[cart_models.CartProduct]:
+        with self._session_factory() as session:
+            return self.__get_cart_products(
+                session=session,
+                user_id_clause=User.telegram_id == user_telegram_id,
+            )
+
+    def __get_cart_products(
+            self,
+            *,
+            session: Session,
+            user_id_clause: ColumnElement[bool],
     ) -> list[cart_models.CartProduct]:
         statement = (
             select(
@@ -53,10 +100,9 @@ class CartRepository(BaseRepository):
             )
             .join(User, onclause=CartProduct.user_id == User.id)
             .join(Product, onclause=CartProduct.product_id == Product.id)
-            .where(User.telegram_id == user_telegram_id)
+            .where(user_id_clause)
         )
-        with self._session_factory() as session:
-            rows = session.execute(statement).all()
+        rows = session.execute(statement).all()
         return [
             cart_models.CartProduct(
                 id=cart_product_id,
@@ -81,122 +127,208 @@ class CartRepository(BaseRepository):
         cart_product = CartProduct(
             user_id=user_id,
             product_id=product_id,
-            quantity=quantity
+            quantity=quantity,
+            expires_at=self.__get_expires_at(),
         )
         product_quantity_update_statement = (
             update(Product)
-            .where(Product.id == product_id)
+            .where(Product.id == product_id, Product.quantity >= quantity)
             .values(quantity=Product.quantity - quantity)
+            .returning(Product.id)
         )
         with self._session_factory() as session:
             with session.begin():
+                if session.scalar(product_quantity_update_statement) is None:
+                    raise NotEnoughProductQuantityError(product_id=product_id)
                 session.add(cart_product)
-                session.execute(product_quantity_update_statement)
-
-    def get_quantity(self, cart_product_id: int) -> int:
-        statement = (
-            select(CartProduct.quantity)
-            .where(CartProduct.id == cart_product_id)
-        )
-        with self._session_factory() as session:
-            row = session.execute(statement).first()
-        if row is None:
-            raise ProductDoesNotExistError
-        return row[0]
+        self.__invalidate_products((product_id,))
 
-    def update_quantity(
+    def change_quantity(
             self,
             *,
-            product_id: int,
-            quantity: int,
-            cart_product_id: int | None = None,
-    ) -> None:
-        product_quantity_statement = (
-            select(Product.quantity)
-            .where(Product.id == product_id)
-        )
+            cart_product_id: int,
+            user_telegram_id: int,
+            quantity_delta: int,
+    ) -> list[cart_models.CartProduct]:
+        """Change quantity of product in user's cart in one transaction.
 
-        if cart_product_id is None:
-            cart_product_quantity = 0
-        else:
-            cart_product_quantity = self.get_quantity(cart_product_id)
+        Stock is reserved by conditional `UPDATE ... WHERE quantity >= n`,
+        so concurrent changes can neither oversell the product nor
+        overwrite each other's stock values.
 
-        with self._session_factory() as session:
-            with session.begin():
-                product_quantity_row = (
-                    session.execute(product_quantity_statement).first()
-                )
-                if product_quantity_row is None:
-                    raise ProductDoesNotExistError
+        Args:
+            cart_product_id: ID of product in cart.
+            user_telegram_id: Telegram ID of the cart's owner.
+            quantity_delta: Number of pieces to add, negative to remove.
 
-                product_quantity: int = product_quantity_row[0]
+        Returns:
+            All products of user's cart after the change.
 
-                quantity_to_add_to_user_cart = quantity - cart_product_quantity
-                product_quantity_after_update = (
-                        product_quantity - quantity_to_add_to_user_cart
-                )
+        Raises:
+            CartProductDoesNotExistError: If user has no such cart product.
+            NotEnoughProductQuantityError: If stock is not sufficient.
+            ProductQuantityOutOfRangeError: If new quantity is outside
+                product's min/max order quantity.
+        """
+        cart_product_filter = (
+            CartProduct.id == cart_product_id,
+            CartProduct.user_id.in_(
+                select(User.id).where(User.telegram_id == user_telegram_id)
+            ),
+        )
+        cart_product_product_id = (
+            select(CartProduct.product_id)
+            .where(*cart_product_filter)
+            .scalar_subquery()
+        )
+        reserve_stock_statement = (
+            update(Product)
+            .where(
+                Product.id == cart_product_product_id,
+                Product.quantity >= quantity_delta,
+            )
+            .values(quantity=Product.quantity - quantity_delta)
+            .returning(
+                Product.id,
+                Product.min_order_quantity,
+                Product.max_order_quantity,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        with self._session_factory() as session:
+            with session.begin():
+                row = session.execute(reserve_stock_statement).first()
+                if row is None:
+                    product_id = session.scalar(
+                        select(CartProduct.product_id)
+                        .where(*cart_product_filter)
+                    )
+                    if product_id is None:
+                        raise CartProductDoesNotExistError(
+                            cart_product_id=cart_product_id,
+                        )
+                    raise NotEnoughProductQuantityError(product_id=product_id)
+                product_id, min_order_quantity, max_order_quantity = row
 
-                update_product_quantity_statement = (
-                    update(Product)
-                    .where(Product.id == product_id)
-                    .values(quantity=product_quantity_after_update)
-                )
-                update_cart_product_quantity_statement = (
+                new_quantity = CartProduct.quantity + quantity_delta
+                conditions = [
+                    CartProduct.id == cart_product_id,
+                    new_quantity >= max(min_order_quantity or 0, 0),
+                ]
+                if max_order_quantity is not None:
+                    conditions.append(new_quantity <= max_order_quantity)
+                user_id = session.scalar(
                     update(CartProduct)
-                    .where(CartProduct.id == cart_product_id)
-                    .values(quantity=quantity)
+                    .where(*conditions)
+                    .values(
+                        quantity=new_quantity,
+                        expires_at=self.__get_expires_at(),
+                    )
+                    .returning(CartProduct.user_id)
+                    .execution_options(synchronize_session=False)
                 )
+                if user_id is None:
+                    raise ProductQuantityOutOfRangeError(product_id=product_id)
 
-                session.execute(update_product_quantity_statement)
-                session.execute(update_cart_product_quantity_statement)
+                cart_products = self.__get_cart_products(
+                    session=session,
+                    user_id_clause=User.id == user_id,
+                )
+        self.__invalidate_products((product_id,))
+        return cart_products
 
-    def __update_product_quantity(
+    def __release(
             self,
             *,
             session: Session,
-            product_id: int,
-            quantity_to_add: int,
-    ) -> None:
-        statement = (
+            cart_products_clause: ColumnElement[bool],
+    ) -> tuple[cart_models.ReleasedReservations, list[int]]:
+        """Return stock of matching cart products and delete them.
+
+        Stock of every affected product is updated by one statement,
+        no matter how many cart products are released.
+
+        Returns:
+            Released reservations and IDs of products got their stock.
+        """
+        released_quantity = (
+            select(func.sum(CartProduct.quantity))
+            .where(CartProduct.product_id == Product.id, cart_products_clause)
+            .scalar_subquery()
+        )
+        product_ids = session.scalars(
             update(Product)
-            .where(Product.id == product_id)
-            .values(quantity=Product.quantity + quantity_to_add)
+            .where(
+                Product.id.in_(
+                    select(CartProduct.product_id)
+                    .where(cart_products_clause)
+                ),
+            )
+            .values(quantity=Product.quantity + released_quantity)
+            .returning(Product.id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        quantities = session.scalars(
+            delete(CartProduct)
+            .where(cart_products_clause)
+            .returning(CartProduct.quantity)
+            .execution_options(synchronize_session=False)
+        ).all()
+        released_reservations = cart_models.ReleasedReservations(
+            cart_products_count=len(quantities),
+            products_count=len(product_ids),
+            quantity=sum(quantities),
         )
-        session.execute(statement)
+        return released_reservations, product_ids
 
     def delete_by_id(self, cart_product_id: int) -> None:
-        cart_product = self.get_by_id(cart_product_id)
-        delete_cart_product_statement = (
-            delete(CartProduct)
-            .where(CartProduct.id == cart_product_id)
-        )
         with self._session_factory() as session:
             with session.begin():
-                self.__update_product_quantity(
+                _, product_ids = self.__release(
                     session=session,
-                    product_id=cart_product.product.id,
-                    quantity_to_add=cart_product.quantity,
+                    cart_products_clause=CartProduct.id == cart_product_id,
                 )
-                session.execute(delete_cart_product_statement)
+        self.__invalidate_products(product_ids)
 
     def delete_by_user_telegram_id(self, user_telegram_id: int) -> None:
-        cart_products = self.get_cart_products(
-            user_telegram_id=user_telegram_id,
-        )
         select_user_id_statement = (
             select(User.id)
             .where(User.telegram_id == user_telegram_id)
         )
-        delete_cart_products_statement = (
-            delete(CartProduct)
-            .where(CartProduct.user_id.in_(select_user_id_statement))
-        )
         with self._session_factory() as session:
             with session.begin():
-                for cart_product in cart_products:
-                    self.__update_product_quantity(
-                        session=session,
-                        product_id=cart_product.product.id,
-                        quantity_to_add=cart_product.quantity,
-                    )
-                session.execute(delete_cart_products_statement)
+                _, product_ids = self.__release(
+                    session=session,
+                    cart_products_clause=CartProduct.user_id.in_(
+                        select_user_id_statement,
+                    ),
+                )
+        self.__invalidate_products(product_ids)
+
+    def release_expired(
+            self,
+            *,
+            now: datetime | None = None,
+    ) -> cart_models.ReleasedReservations:
+        """Return stock of expired reservations and delete them from carts.
+
+        Cart products created before reservations started to expire
+        have no expiry time and are released too.
+        """
+        if now is None:
+            now = _get_utc_now()
+        with self._session_factory() as session:
+            with session.begin():
+                released_reservations, product_ids = self.__release(
+                    session=session,
+                    cart_products_clause=or_(
+                        CartProduct.expires_at < now,
+                        CartProduct.expires_at.is_(None),
+                    ),
+                )
+        self.__invalidate_products(product_ids)
+        return released_reservations
+
+
+def _get_utc_now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
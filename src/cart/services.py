@@ -1,14 +1,22 @@
+import threading
 from typing import Protocol
 
+import structlog
+from structlog.stdlib import BoundLogger
+
 from cart.exceptions import (
     NotEnoughProductQuantityError,
     ProductQuantityOutOfRangeError,
 )
+from cart.models import ReleasedReservations, ReservationsSweeperStats
 
 __all__ = (
     'validate_product_quantity_change',
+    'CartReservationsSweeper',
 )
 
+logger: BoundLogger = structlog.get_logger('app')
+
 
 class Product(Protocol):
     id: int
@@ -60,3 +68,59 @@ def validate_product_quantity_change(
 
     if more_than_allowed or less_than_required:
         raise ProductQuantityOutOfRangeError(product_id=product.id)
+
+
+class HasReleaseExpiredMethod(Protocol):
+
+    def release_expired(self) -> ReleasedReservations: ...
+
+
+class CartReservationsSweeper:
+    """Periodically returns stock of expired cart reservations.
+
+    `sweep` is blocking and meant to be run by scheduler in a thread.
+    Totals of released reservations are kept for `log_stats`.
+    """
+
+    def __init__(self, cart_repository: HasReleaseExpiredMethod):
+        self.__cart_repository = cart_repository
+        self.__lock = threading.Lock()
+        self.__sweeps_count = 0
+        self.__released_cart_products_count = 0
+        self.__released_quantity = 0
+
+    def sweep(self) -> ReleasedReservations:
+        released_reservations = self.__cart_repository.release_expired()
+        with self.__lock:
+            self.__sweeps_count += 1
+            self.__released_cart_products_count += (
+                released_reservations.cart_products_count
+            )
+            self.__released_quantity += released_reservations.quantity
+        if released_reservations.cart_products_count:
+            logger.info(
+                'Expired cart reservations released',
+                cart_products_count=released_reservations.cart_products_count,
+                products_count=released_reservations.products_count,
+                quantity=released_reservations.quantity,
+            )
+        return released_reservations
+
+    def get_stats(self) -> ReservationsSweeperStats:
+        with self.__lock:
+            return ReservationsSweeperStats(
+                sweeps_count=self.__sweeps_count,
+                released_cart_products_count=(
+                    self.__released_cart_products_count
+                ),
+                released_quantity=self.__released_quantity,
+            )
+
+    def log_stats(self) -> None:
+        stats = self.get_stats()
+        logger.info(
+            'Cart reservations sweeper stats',
+            sweeps_count=stats.sweeps_count,
+            released_cart_products_count=stats.released_cart_products_count,
+            released_quantity=stats.released_quantity,
+        )
@@ -0,0 +1,5 @@
+class CategoryDoesNotExistError(Exception):
+
+    def __init__(self, *args, category_id: int):
+        super().__init__(*args)
+        self.category_id = category_id
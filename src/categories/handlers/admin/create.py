@@ -16,7 +16,6 @@ from categories.states import CategoryCreateStates
 from categories.views import CategoryListView, CategoryDetailView
 from common.filters import AdminFilter
 from common.views import answer_view
-from database.session import session_factory
 
 __all__ = ('register_handlers',)
 
@@ -128,6 +127,7 @@ async def on_hidden_option_choice(
 async def on_can_be_seen_option_choice(
         callback_query: CallbackQuery,
         state: FSMContext,
+        category_repository: CategoryRepository,
 ) -> None:
     can_be_seen = callback_query.data == 'category-can-be-seen'
     state_data = await state.get_data()
@@ -139,8 +139,7 @@ async def on_can_be_seen_option_choice(
 
     parent_id: int | None = state_data['parent_id']
 
-    category_repository = CategoryRepository(session_factory)
-    category_repository.create(
+    await category_repository.create(
         name=state_data['name'],
         icon=state_data['icon'],
         priority=state_data['priority'],
@@ -151,11 +150,11 @@ async def on_can_be_seen_option_choice(
     )
 
     if parent_id is None:
-        categories = category_repository.get_categories()
+        categories = await category_repository.get_categories()
         view = CategoryListView(categories)
     else:
-        parent_category = category_repository.get_by_id(parent_id)
-        subcategories = category_repository.get_subcategories(parent_id)
+        parent_category = await category_repository.get_by_id(parent_id)
+        subcategories = await category_repository.get_subcategories(parent_id)
         view = CategoryDetailView(
             category=parent_category,
             subcategories=subcategories,
@@ -9,7 +9,6 @@ from categories.states import CategoryDeleteStates
 from categories.views import CategoryAskDeleteConfirmationView
 from common.filters import AdminFilter
 from common.views import edit_message_by_view
-from database.session import session_factory
 
 __all__ = ('register_handlers',)
 
@@ -27,10 +26,12 @@ async def on_ask_delete_category_confirmation(
     await CategoryDeleteStates.confirm.set()
     await state.update_data(category_id=category_id)
 
-    category = category_repository.get_by_id(category_id)
-    subcategory_ids = category_repository.get_subcategory_ids(category_id)
+    category = await category_repository.get_by_id(category_id)
+    subcategory_ids = await category_repository.get_subcategory_ids(
+        category_id,
+    )
     subcategory_ids.append(category_id)
-    products_count = product_repository.count_products(subcategory_ids)
+    products_count = await product_repository.count_products(subcategory_ids)
 
     subcategories_count = len(subcategory_ids)
     is_subcategory = category.parent_id is not None
@@ -47,12 +48,12 @@ async def on_ask_delete_category_confirmation(
 async def on_delete_category_confirm(
         callback_query: CallbackQuery,
         state: FSMContext,
+        category_repository: CategoryRepository,
 ) -> None:
     state_data = await state.get_data()
     category_id: int = state_data['category_id']
     await state.finish()
-    category_repository = CategoryRepository(session_factory)
-    category_repository.delete_by_id(category_id)
+    await category_repository.delete_by_id(category_id)
     await callback_query.message.edit_text('Category has been deleted')
 
 
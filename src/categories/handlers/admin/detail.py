@@ -16,8 +16,10 @@ async def on_show_category_detail(
         category_repository: CategoryRepository,
 ) -> None:
     category_id: int = callback_data['category_id']
-    category = category_repository.get_by_id(category_id)
-    subcategories = category_repository.get_subcategories(parent_id=category.id)
+    category = await category_repository.get_by_id(category_id)
+    subcategories = await category_repository.get_subcategories(
+        parent_id=category.id,
+    )
     view = CategoryDetailView(category=category, subcategories=subcategories)
     await edit_message_by_view(message=callback_query.message, view=view)
 
@@ -16,7 +16,7 @@ async def on_show_categories_list(
         message: Message,
         category_repository: CategoryRepository,
 ) -> None:
-    categories = category_repository.get_categories()
+    categories = await category_repository.get_categories()
     view = CategoryListView(categories)
     await answer_view(message=message, view=view)
 
@@ -27,7 +27,7 @@ async def on_show_subcategories_list(
         category_repository: CategoryRepository,
 ) -> None:
     category_id: int = callback_data['category_id']
-    subcategories = category_repository.get_subcategories(category_id)
+    subcategories = await category_repository.get_subcategories(category_id)
     view = CategoryListView(
         categories=subcategories,
         parent_id=category_id,
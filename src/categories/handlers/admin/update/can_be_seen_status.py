@@ -15,13 +15,15 @@ async def on_start_can_be_seen_status_update_flow(
         category_repository: CategoryRepository,
 ):
     category_id: int = callback_data['category_id']
-    category = category_repository.get_by_id(category_id)
-    category_repository.update_can_be_seen_status(
+    category = await category_repository.get_by_id(category_id)
+    await category_repository.update_can_be_seen_status(
         category_id=category_id,
         can_be_seen=not category.can_be_seen,
     )
-    category = category_repository.get_by_id(category_id)
-    subcategories = category_repository.get_subcategories(parent_id=category_id)
+    category = await category_repository.get_by_id(category_id)
+    subcategories = await category_repository.get_subcategories(
+        parent_id=category_id,
+    )
     view = CategoryDetailView(category=category, subcategories=subcategories)
     await edit_message_by_view(message=callback_query.message, view=view)
 
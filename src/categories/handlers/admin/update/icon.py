@@ -36,12 +36,14 @@ async def on_category_icon_input(
     category_id: int = state_data['category_id']
     category_icon = message.text if is_emoji(message.text) else None
 
-    category_repository.update_icon(
+    await category_repository.update_icon(
         category_id=category_id,
         category_icon=category_icon,
     )
-    category = category_repository.get_by_id(category_id)
-    subcategories = category_repository.get_subcategories(parent_id=category_id)
+    category = await category_repository.get_by_id(category_id)
+    subcategories = await category_repository.get_subcategories(
+        parent_id=category_id,
+    )
 
     view = CategoryDetailView(category=category, subcategories=subcategories)
     await answer_view(message=message, view=view)
@@ -37,12 +37,12 @@ async def on_category_max_displayed_stock_input(
     category_id: int = state_data['category_id']
     max_displayed_stock_count = int(message.text)
 
-    category_repository.update_max_displayed_stock_count(
+    await category_repository.update_max_displayed_stock_count(
         category_id=category_id,
         max_displayed_stock_count=max_displayed_stock_count,
     )
-    category = category_repository.get_by_id(category_id)
-    subcategories = category_repository.get_subcategories(category_id)
+    category = await category_repository.get_by_id(category_id)
+    subcategories = await category_repository.get_subcategories(category_id)
 
     view = CategoryDetailView(category=category, subcategories=subcategories)
     await answer_view(message=message, view=view)
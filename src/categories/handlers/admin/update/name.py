@@ -33,12 +33,14 @@ async def on_category_name_input(
     category_id: int = state_data['category_id']
     category_name = message.text
 
-    category_repository.update_name(
+    await category_repository.update_name(
         category_id=category_id,
         category_name=category_name,
     )
-    category = category_repository.get_by_id(category_id)
-    subcategories = category_repository.get_subcategories(parent_id=category_id)
+    category = await category_repository.get_by_id(category_id)
+    subcategories = await category_repository.get_subcategories(
+        parent_id=category_id,
+    )
 
     view = CategoryDetailView(category=category, subcategories=subcategories)
     await answer_view(message=message, view=view)
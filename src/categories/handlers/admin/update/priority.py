@@ -37,12 +37,14 @@ async def on_category_priority_input(
     category_id: int = state_data['category_id']
     priority = int(message.text)
 
-    category_repository.update_priority(
+    await category_repository.update_priority(
         category_id=category_id,
         category_priority=priority,
     )
-    category = category_repository.get_by_id(category_id)
-    subcategories = category_repository.get_subcategories(parent_id=category_id)
+    category = await category_repository.get_by_id(category_id)
+    subcategories = await category_repository.get_subcategories(
+        parent_id=category_id,
+    )
 
     view = CategoryDetailView(category=category, subcategories=subcategories)
     await answer_view(message=message, view=view)
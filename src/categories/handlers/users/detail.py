@@ -3,6 +3,7 @@ from aiogram.dispatcher import FSMContext
 from aiogram.types import CallbackQuery
 
 from categories.callback_data import UserCategoryDetailCallbackData
+from categories.exceptions import CategoryDoesNotExistError
 from categories.repositories import CategoryRepository
 from categories.views import UserCategoryDetailView
 from common.views import edit_message_by_view
@@ -18,14 +19,19 @@ async def on_show_category_detail(
 ) -> None:
     await state.finish()
     category_id: int = callback_data['category_id']
-    category = category_repository.get_by_id(category_id)
+    category_tree = await category_repository.get_category_tree()
+    try:
+        category = category_tree.get_by_id(category_id)
+    except CategoryDoesNotExistError:
+        await callback_query.answer('Category is not found', show_alert=True)
+        return
 
     if not category.can_be_seen:
         await callback_query.answer('Coming soon...', show_alert=True)
         return
 
-    subcategories = category_repository.get_subcategories(category_id)
-    products = product_repository.get_by_category_id(category_id)
+    subcategories = category_tree.get_subcategories(category_id)
+    products = await product_repository.get_by_category_id(category_id)
     view = UserCategoryDetailView(
         subcategories=subcategories,
         products=products,
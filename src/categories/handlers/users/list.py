@@ -14,7 +14,8 @@ async def on_show_categories_list(
         category_repository: CategoryRepository,
 ) -> None:
     await state.finish()
-    categories = category_repository.get_categories()
+    category_tree = await category_repository.get_category_tree()
+    categories = category_tree.get_categories()
     view = UserCategoryListView(categories)
     if isinstance(message_or_query, CallbackQuery):
         await edit_message_by_view(message=message_or_query.message, view=view)
@@ -1,6 +1,9 @@
+from collections.abc import Iterable
 from dataclasses import dataclass
 
-__all__ = ('Category',)
+from categories.exceptions import CategoryDoesNotExistError
+
+__all__ = ('Category', 'CategoryTree')
 
 
 @dataclass(frozen=True, slots=True)
@@ -17,3 +20,34 @@ class Category:
     @property
     def name_display(self) -> str:
         return self.name if self.icon is None else f'{self.icon} {self.name}'
+
+
+class CategoryTree:
+    """Snapshot of all categories with lookups by ID and by parent ID."""
+
+    def __init__(self, *, version: int, categories: Iterable[Category]):
+        self.__version = version
+        self.__category_by_id: dict[int, Category] = {}
+        self.__children_by_parent_id: dict[int | None, list[Category]] = {}
+        for category in categories:
+            self.__category_by_id[category.id] = category
+            self.__children_by_parent_id.setdefault(
+                category.parent_id,
+                [],
+            ).append(category)
+
+    @property
+    def version(self) -> int:
+        return self.__version
+
+    def get_by_id(self, category_id: int) -> Category:
+        try:
+            return self.__category_by_id[category_id]
+        except KeyError:
+            raise CategoryDoesNotExistError(category_id=category_id)
+
+    def get_categories(self) -> list[Category]:
+        return list(self.__children_by_parent_id.get(None, ()))
+
+    def get_subcategories(self, parent_id: int) -> list[Category]:
+        return list(self.__children_by_parent_id.get(parent_id, ()))
@@ -1,10 +1,17 @@
+import asyncio
+import threading
+
 import structlog
 from sqlalchemy import update, select, exists, delete
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, sessionmaker
 from structlog.contextvars import bound_contextvars
 
 from categories import models as category_models
-from common.repositories import BaseRepository
+from common.repositories import (
+    BaseRepository,
+    RepositoryThreadPool,
+    run_in_thread_pool,
+)
 from database.schemas import Category
 
 __all__ = ('CategoryRepository',)
@@ -13,7 +20,74 @@ logger = structlog.get_logger('app')
 
 
 class CategoryRepository(BaseRepository):
+    """Categories storage.
+
+    Every method that changes categories bumps the category tree version,
+    so the in-memory category tree returned by `get_category_tree`
+    is reloaded on the next call.
+    """
 
+    def __init__(
+            self,
+            session_factory: sessionmaker,
+            thread_pool: RepositoryThreadPool | None = None,
+    ):
+        super().__init__(session_factory, thread_pool)
+        self.__category_tree_version = 0
+        self.__category_tree_version_lock = threading.Lock()
+        self.__category_tree: category_models.CategoryTree | None = None
+        self.__category_tree_load_lock = asyncio.Lock()
+
+    def __bump_category_tree_version(self) -> None:
+        with self.__category_tree_version_lock:
+            self.__category_tree_version += 1
+
+    @run_in_thread_pool
+    def __load_category_tree(self) -> category_models.CategoryTree:
+        version = self.__category_tree_version
+        statement = select(Category).order_by(Category.id)
+        with self._session_factory() as session:
+            categories = session.scalars(statement).all()
+        logger.debug(
+            'Category repository: category tree loaded',
+            version=version,
+            categories_count=len(categories),
+        )
+        return category_models.CategoryTree(
+            version=version,
+            categories=[
+                category_models.Category(
+                    id=category.id,
+                    name=category.name,
+                    icon=category.icon,
+                    priority=category.priority,
+                    max_displayed_stock_count=(
+                        category.max_displayed_stock_count
+                    ),
+                    is_hidden=category.is_hidden,
+                    can_be_seen=category.can_be_seen,
+                    parent_id=category.parent_id,
+                ) for category in categories
+            ],
+        )
+
+    async def get_category_tree(self) -> category_models.CategoryTree:
+        """Get all categories from memory, loading them if they changed.
+
+        Returns:
+            Category tree of the current version.
+        """
+        async with self.__category_tree_load_lock:
+            category_tree = self.__category_tree
+            if (
+                    category_tree is None
+                    or category_tree.version != self.__category_tree_version
+            ):
+                category_tree = await self.__load_category_tree()
+                self.__category_tree = category_tree
+        return category_tree
+
+    @run_in_thread_pool
     def get_categories(self) -> list[category_models.Category]:
         statement = (
             select(Category)
@@ -43,6 +117,7 @@ class CategoryRepository(BaseRepository):
             ) for category in categories
         ]
 
+    @run_in_thread_pool
     def get_subcategories(
             self,
             parent_id: int,
@@ -77,6 +152,7 @@ class CategoryRepository(BaseRepository):
                 ) for category in subcategories
             ]
 
+    @run_in_thread_pool
     def get_by_id(self, category_id: int) -> category_models.Category:
         """
         Retrieve a category object by its ID.
@@ -106,6 +182,7 @@ class CategoryRepository(BaseRepository):
             parent_id=result.parent_id,
         )
 
+    @run_in_thread_pool
     def delete_by_id(self, category_id: int) -> bool:
         statement_to_delete_category = (
             delete(Category)
@@ -132,6 +209,7 @@ class CategoryRepository(BaseRepository):
                 logger.debug('Category repository: deleted category')
             else:
                 logger.debug('Ccategory repository: could not delete category')
+        self.__bump_category_tree_version()
         return is_deleted
 
     def __shift_category_priorities(
@@ -147,6 +225,7 @@ class CategoryRepository(BaseRepository):
         )
         session.execute(statement)
 
+    @run_in_thread_pool
     def create(
             self,
             *,
@@ -184,6 +263,7 @@ class CategoryRepository(BaseRepository):
                 session.add(category)
                 session.flush()
                 session.refresh(category)
+        self.__bump_category_tree_version()
         return category_models.Category(
             id=category.id,
             name=category.name,
@@ -195,6 +275,7 @@ class CategoryRepository(BaseRepository):
             parent_id=category.parent_id
         )
 
+    @run_in_thread_pool
     def update_name(self, *, category_id: int, category_name: str) -> bool:
         """
         Update the name of a category with the given ID.
@@ -215,6 +296,7 @@ class CategoryRepository(BaseRepository):
             with session.begin():
                 result = session.execute(statement)
         is_updated = bool(result.rowcount)
+        self.__bump_category_tree_version()
 
         with bound_contextvars(
                 category_id=category_id,
@@ -226,6 +308,7 @@ class CategoryRepository(BaseRepository):
                 logger.debug('Category repository: could not update name')
         return is_updated
 
+    @run_in_thread_pool
     def update_icon(
             self,
             *,
@@ -251,6 +334,7 @@ class CategoryRepository(BaseRepository):
             with session.begin():
                 result = session.execute(statement)
         is_updated = bool(result.rowcount)
+        self.__bump_category_tree_version()
 
         with bound_contextvars(
                 category_id=category_id,
@@ -262,6 +346,7 @@ class CategoryRepository(BaseRepository):
                 logger.debug('Category repository: could not update icon')
         return is_updated
 
+    @run_in_thread_pool
     def update_max_displayed_stock_count(
             self,
             *,
@@ -288,6 +373,7 @@ class CategoryRepository(BaseRepository):
             with session.begin():
                 result = session.execute(statement)
         is_updated = bool(result.rowcount)
+        self.__bump_category_tree_version()
 
         with bound_contextvars(
                 category_id=category_id,
@@ -305,6 +391,7 @@ class CategoryRepository(BaseRepository):
                 )
         return is_updated
 
+    @run_in_thread_pool
     def update_priority(
             self,
             *,
@@ -331,6 +418,7 @@ class CategoryRepository(BaseRepository):
             with session.begin():
                 result = session.execute(statement)
         is_updated = bool(result.rowcount)
+        self.__bump_category_tree_version()
 
         with bound_contextvars(
                 category_id=category_id,
@@ -346,6 +434,7 @@ class CategoryRepository(BaseRepository):
                 )
         return is_updated
 
+    @run_in_thread_pool
     def update_hidden_status(
             self,
             *,
@@ -372,6 +461,7 @@ class CategoryRepository(BaseRepository):
             with session.begin():
                 result = session.execute(statement)
         is_updated = bool(result.rowcount)
+        self.__bump_category_tree_version()
 
         with bound_contextvars(
                 category_id=category_id,
@@ -387,6 +477,7 @@ class CategoryRepository(BaseRepository):
                 )
         return is_updated
 
+    @run_in_thread_pool
     def update_can_be_seen_status(
             self,
             *,
@@ -413,6 +504,7 @@ class CategoryRepository(BaseRepository):
             with session.begin():
                 result = session.execute(statement)
         is_updated = bool(result.rowcount)
+        self.__bump_category_tree_version()
 
         with bound_contextvars(
                 category_id=category_id,
@@ -429,6 +521,7 @@ class CategoryRepository(BaseRepository):
                 )
         return is_updated
 
+    @run_in_thread_pool
     def get_subcategory_ids(self, parent_id: int) -> list[int]:
         statement = select(Category.id).where(Category.parent_id == parent_id)
         with self._session_factory() as session:
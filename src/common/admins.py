@@ -0,0 +1,26 @@
+from collections.abc import Iterable, Iterator
+
+__all__ = ('AdminTelegramIds',)
+
+
+class AdminTelegramIds:
+    """Telegram IDs of admins.
+
+    One instance is shared by everything that checks or notifies admins,
+    so `reload` replaces the admin set for all of them at once.
+    """
+
+    def __init__(self, telegram_ids: Iterable[int]):
+        self.__telegram_ids = frozenset(telegram_ids)
+
+    def __contains__(self, telegram_id: object) -> bool:
+        return telegram_id in self.__telegram_ids
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.__telegram_ids)
+
+    def __len__(self) -> int:
+        return len(self.__telegram_ids)
+
+    def reload(self, telegram_ids: Iterable[int]) -> None:
+        self.__telegram_ids = frozenset(telegram_ids)
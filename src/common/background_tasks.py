@@ -0,0 +1,84 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+
+import structlog
+from structlog.stdlib import BoundLogger
+
+__all__ = ('BackgroundTaskQueue',)
+
+logger: BoundLogger = structlog.get_logger('app')
+
+
+class BackgroundTaskQueue:
+    """Runs coroutines detached from handlers by fixed number of workers.
+
+    Handlers submit work (e.g. notifications) and return right away.
+    Failures are logged, so they never reach the user.
+    """
+
+    def __init__(self, *, workers_count: int = 4, max_size: int = 1000):
+        self.__workers_count = workers_count
+        self.__queue: asyncio.Queue[
+            tuple[Callable[..., Awaitable[object]], tuple, dict] | None
+        ] = asyncio.Queue(maxsize=max_size)
+        self.__workers: list[asyncio.Task] = []
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of submitted tasks that have not started yet."""
+        return self.__queue.qsize()
+
+    def start(self) -> None:
+        self.__workers = [
+            asyncio.create_task(self.__work())
+            for _ in range(self.__workers_count)
+        ]
+
+    def submit(
+            self,
+            function: Callable[..., Awaitable[object]],
+            /,
+            *args,
+            **kwargs,
+    ) -> bool:
+        """Schedule `function(*args, **kwargs)` to be awaited in background.
+
+        Returns:
+            False if queue is full and the task has been dropped.
+        """
+        try:
+            self.__queue.put_nowait((function, args, kwargs))
+        except asyncio.QueueFull:
+            logger.error(
+                'Background task dropped: queue is full',
+                task=getattr(function, '__qualname__', repr(function)),
+            )
+            return False
+        return True
+
+    async def __work(self) -> None:
+        while (task := await self.__queue.get()) is not None:
+            function, args, kwargs = task
+            try:
+                await function(*args, **kwargs)
+            except Exception:
+                logger.exception(
+                    'Background task failed',
+                    task=getattr(function, '__qualname__', repr(function)),
+                )
+            finally:
+                self.__queue.task_done()
+
+    async def shutdown(self, timeout: float = 10) -> None:
+        """Finish submitted tasks, waiting at most `timeout` seconds."""
+        for _ in self.__workers:
+            await self.__queue.put(None)
+        done, pending = await asyncio.wait(self.__workers, timeout=timeout)
+        for worker in pending:
+            worker.cancel()
+        if pending:
+            logger.warning(
+                'Background tasks cancelled on shutdown',
+                queue_depth=self.queue_depth,
+            )
+        self.__workers = []
@@ -1,16 +1,21 @@
 from aiogram.dispatcher.filters import BoundFilter
+from aiogram.dispatcher.handler import ctx_data
 from aiogram.types import Message, CallbackQuery
 
-import config
-
 __all__ = ('AdminFilter',)
 
 
 class AdminFilter(BoundFilter):
+    """Pass updates from admins only.
+
+    Admin status is looked up once per update by `UserContextMiddleware`
+    in its admin set and is read here from handler data, so dozens
+    of admin handlers do not repeat the lookup. Updates that skipped
+    the middleware are never treated as coming from admins.
+    """
+
     async def check(
             self,
             message_or_callback_query: Message | CallbackQuery,
     ) -> bool:
-        user_telegram_id = message_or_callback_query.from_user.id
-        if isinstance(message_or_callback_query, (Message, CallbackQuery)):
-            return user_telegram_id in config.AppSettings().admins_id
+        return ctx_data.get({}).get('is_admin', False)
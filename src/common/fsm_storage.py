@@ -0,0 +1,417 @@
+import asyncio
+import copy
+import pathlib
+import pickle
+import sqlite3
+import threading
+import time
+import typing
+import zlib
+from dataclasses import dataclass, field
+
+import structlog
+from aiogram.dispatcher.storage import BaseStorage
+from structlog.stdlib import BoundLogger
+
+from common.models import FSMStorageStats
+
+__all__ = ('SQLiteStorage', 'serialize_state_data', 'deserialize_state_data')
+
+logger: BoundLogger = structlog.get_logger('app')
+
+Address: typing.TypeAlias = tuple[str, str]
+
+PICKLE_PREFIX = b'p'
+ZLIB_PREFIX = b'z'
+
+
+def serialize_state_data(
+        value: dict,
+        *,
+        compression_threshold: int = 512,
+) -> bytes | None:
+    """Serialize state data or bucket into compact bytes.
+
+    Pickle keeps types used in state data, such as `Decimal`,
+    `datetime`, sets and enums. Large payloads, like lists of product
+    units, are compressed. Empty dictionaries are stored as NULL.
+    """
+    if not value:
+        return None
+    payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(payload) >= compression_threshold:
+        return ZLIB_PREFIX + zlib.compress(payload)
+    return PICKLE_PREFIX + payload
+
+
+def deserialize_state_data(value: bytes | None) -> dict:
+    if value is None:
+        return {}
+    prefix, payload = value[:1], value[1:]
+    if prefix == ZLIB_PREFIX:
+        payload = zlib.decompress(payload)
+    return pickle.loads(payload)
+
+
+@dataclass(slots=True)
+class _Record:
+    state: str | None = None
+    data: dict = field(default_factory=dict)
+    bucket: dict = field(default_factory=dict)
+    updated_at: float = 0
+    accessed_at: float = 0
+
+    @property
+    def is_empty(self) -> bool:
+        return self.state is None and not self.data and not self.bucket
+
+
+class SQLiteStorage(BaseStorage):
+    """FSM storage in a local SQLite file with write-behind cache.
+
+    Changes are applied to the in-memory cache and written to the
+    database in one transaction every `flush_interval` seconds,
+    so a flow step never waits for disk. States that have not
+    changed for `state_ttl` seconds are treated as abandoned and
+    deleted. Clean records not accessed for `cache_ttl` seconds
+    are evicted from the cache and read from the database on demand.
+
+    The database file is written only by the bot itself,
+    so state data is serialized with pickle.
+    """
+
+    def __init__(
+            self,
+            path: pathlib.Path | str,
+            *,
+            state_ttl: float = 24 * 60 * 60,
+            cache_ttl: float = 10 * 60,
+            flush_interval: float = 1,
+            compression_threshold: int = 512,
+    ):
+        self.__path = str(path)
+        self.__state_ttl = state_ttl
+        self.__cache_ttl = cache_ttl
+        self.__flush_interval = flush_interval
+        self.__compression_threshold = compression_threshold
+        self.__connection: sqlite3.Connection | None = None
+        self.__connection_lock = threading.Lock()
+        self.__records: dict[Address, _Record] = {}
+        self.__dirty_addresses: set[Address] = set()
+        self.__flush_lock = asyncio.Lock()
+        self.__flush_task: asyncio.Task | None = None
+        self.__hits_count = 0
+        self.__misses_count = 0
+        self.__flushed_records_count = 0
+        self.__expired_records_count = 0
+
+    def __get_connection(self) -> sqlite3.Connection:
+        if self.__connection is None:
+            connection = sqlite3.connect(
+                self.__path,
+                check_same_thread=False,
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS fsm_states ('
+                ' chat TEXT NOT NULL,'
+                ' user TEXT NOT NULL,'
+                ' state TEXT,'
+                ' data BLOB,'
+                ' bucket BLOB,'
+                ' updated_at REAL NOT NULL,'
+                ' PRIMARY KEY (chat, user)'
+                ') WITHOUT ROWID'
+            )
+            connection.execute(
+                'CREATE INDEX IF NOT EXISTS ix_fsm_states_updated_at'
+                ' ON fsm_states (updated_at)'
+            )
+            connection.commit()
+            self.__connection = connection
+        return self.__connection
+
+    def __read_row(self, address: Address) -> tuple | None:
+        with self.__connection_lock:
+            return self.__get_connection().execute(
+                'SELECT state, data, bucket, updated_at FROM fsm_states'
+                ' WHERE chat = ? AND user = ?',
+                address,
+            ).fetchone()
+
+    def __write_rows(
+            self,
+            *,
+            rows: list[tuple],
+            deleted_addresses: list[Address],
+            expired_before: float,
+    ) -> int:
+        with self.__connection_lock:
+            connection = self.__get_connection()
+            with connection:
+                connection.executemany(
+                    'INSERT INTO fsm_states'
+                    ' (chat, user, state, data, bucket, updated_at)'
+                    ' VALUES (?, ?, ?, ?, ?, ?)'
+                    ' ON CONFLICT (chat, user) DO UPDATE SET'
+                    ' state = excluded.state,'
+                    ' data = excluded.data,'
+                    ' bucket = excluded.bucket,'
+                    ' updated_at = excluded.updated_at',
+                    rows,
+                )
+                connection.executemany(
+                    'DELETE FROM fsm_states WHERE chat = ? AND user = ?',
+                    deleted_addresses,
+                )
+                return connection.execute(
+                    'DELETE FROM fsm_states WHERE updated_at < ?',
+                    (expired_before,),
+                ).rowcount
+
+    def __close_connection(self) -> None:
+        with self.__connection_lock:
+            if self.__connection is not None:
+                self.__connection.close()
+                self.__connection = None
+
+    def __is_expired(self, record: _Record, now: float) -> bool:
+        return record.updated_at < now - self.__state_ttl
+
+    async def __get_record(self, *, chat, user) -> tuple[Address, _Record]:
+        address = tuple(map(str, self.check_address(chat=chat, user=user)))
+        record = self.__records.get(address)
+        if record is not None:
+            self.__hits_count += 1
+        else:
+            self.__misses_count += 1
+            row = await asyncio.to_thread(self.__read_row, address)
+            # record could be created while the row was being read
+            record = self.__records.get(address)
+            if record is None:
+                record = _Record()
+                if row is not None:
+                    state, data, bucket, updated_at = row
+                    record = _Record(
+                        state=state,
+                        data=deserialize_state_data(data),
+                        bucket=deserialize_state_data(bucket),
+                        updated_at=updated_at,
+                    )
+                self.__records[address] = record
+
+        now = time.time()
+        if not record.is_empty and self.__is_expired(record, now):
+            self.__expired_records_count += 1
+            record = _Record()
+            self.__records[address] = record
+        record.accessed_at = now
+        return address, record
+
+    def __mark_dirty(self, address: Address, record: _Record) -> None:
+        record.updated_at = time.time()
+        self.__dirty_addresses.add(address)
+        if self.__flush_task is None or self.__flush_task.done():
+            self.__flush_task = asyncio.create_task(self.__run_flushing())
+
+    async def __run_flushing(self) -> None:
+        while True:
+            await asyncio.sleep(self.__flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception('Could not flush FSM states')
+
+    async def flush(self) -> None:
+        """Write changed records and delete expired ones."""
+        async with self.__flush_lock:
+            now = time.time()
+            dirty_addresses = self.__dirty_addresses
+            self.__dirty_addresses = set()
+            rows: list[tuple] = []
+            deleted_addresses: list[Address] = []
+            for address in dirty_addresses:
+                record = self.__records[address]
+                if record.is_empty:
+                    deleted_addresses.append(address)
+                    continue
+                rows.append((
+                    *address,
+                    record.state,
+                    serialize_state_data(
+                        record.data,
+                        compression_threshold=self.__compression_threshold,
+                    ),
+                    serialize_state_data(
+                        record.bucket,
+                        compression_threshold=self.__compression_threshold,
+                    ),
+                    record.updated_at,
+                ))
+
+            try:
+                expired_rows_count = await asyncio.to_thread(
+                    self.__write_rows,
+                    rows=rows,
+                    deleted_addresses=deleted_addresses,
+                    expired_before=now - self.__state_ttl,
+                )
+            except BaseException:
+                self.__dirty_addresses |= dirty_addresses
+                raise
+            self.__flushed_records_count += len(dirty_addresses)
+            self.__expired_records_count += expired_rows_count
+
+            evicted_addresses = [
+                address for address, record in self.__records.items()
+                if address not in self.__dirty_addresses and (
+                        record.accessed_at < now - self.__cache_ttl
+                        or record.is_empty
+                        or self.__is_expired(record, now)
+                )
+            ]
+            for address in evicted_addresses:
+                del self.__records[address]
+
+    def get_stats(self) -> FSMStorageStats:
+        return FSMStorageStats(
+            hits_count=self.__hits_count,
+            misses_count=self.__misses_count,
+            cached_records_count=len(self.__records),
+            dirty_records_count=len(self.__dirty_addresses),
+            flushed_records_count=self.__flushed_records_count,
+            expired_records_count=self.__expired_records_count,
+        )
+
+    def log_stats(self) -> None:
+        stats = self.get_stats()
+        logger.info(
+            'FSM storage stats',
+            hits_count=stats.hits_count,
+            misses_count=stats.misses_count,
+            cached_records_count=stats.cached_records_count,
+            dirty_records_count=stats.dirty_records_count,
+            flushed_records_count=stats.flushed_records_count,
+            expired_records_count=stats.expired_records_count,
+        )
+
+    async def close(self):
+        if self.__flush_task is not None:
+            self.__flush_task.cancel()
+            try:
+                await self.__flush_task
+            except asyncio.CancelledError:
+                pass
+            self.__flush_task = None
+        await self.flush()
+        self.__records.clear()
+        self.__close_connection()
+
+    async def wait_closed(self):
+        pass
+
+    async def get_state(
+            self,
+            *,
+            chat: str | int | None = None,
+            user: str | int | None = None,
+            default: str | None = None,
+    ) -> str | None:
+        _, record = await self.__get_record(chat=chat, user=user)
+        if record.state is None:
+            return self.resolve_state(default)
+        return record.state
+
+    async def get_data(
+            self,
+            *,
+            chat: str | int | None = None,
+            user: str | int | None = None,
+            default: dict | None = None,
+    ) -> dict:
+        _, record = await self.__get_record(chat=chat, user=user)
+        return copy.deepcopy(record.data)
+
+    async def set_state(
+            self,
+            *,
+            chat: str | int | None = None,
+            user: str | int | None = None,
+            state: str | None = None,
+    ):
+        address, record = await self.__get_record(chat=chat, user=user)
+        record.state = self.resolve_state(state)
+        self.__mark_dirty(address, record)
+
+    async def set_data(
+            self,
+            *,
+            chat: str | int | None = None,
+            user: str | int | None = None,
+            data: dict | None = None,
+    ):
+        address, record = await self.__get_record(chat=chat, user=user)
+        record.data = copy.deepcopy(data) if data else {}
+        self.__mark_dirty(address, record)
+
+    async def update_data(
+            self,
+            *,
+            chat: str | int | None = None,
+            user: str | int | None = None,
+            data: dict | None = None,
+            **kwargs,
+    ):
+        address, record = await self.__get_record(chat=chat, user=user)
+        record.data.update(copy.deepcopy({**(data or {}), **kwargs}))
+        self.__mark_dirty(address, record)
+
+    async def reset_state(
+            self,
+            *,
+            chat: str | int | None = None,
+            user: str | int | None = None,
+            with_data: bool | None = True,
+    ):
+        address, record = await self.__get_record(chat=chat, user=user)
+        record.state = None
+        if with_data:
+            record.data = {}
+        self.__mark_dirty(address, record)
+
+    def has_bucket(self):
+        return True
+
+    async def get_bucket(
+            self,
+            *,
+            chat: str | int | None = None,
+            user: str | int | None = None,
+            default: dict | None = None,
+    ) -> dict:
+        _, record = await self.__get_record(chat=chat, user=user)
+        return copy.deepcopy(record.bucket)
+
+    async def set_bucket(
+            self,
+            *,
+            chat: str | int | None = None,
+            user: str | int | None = None,
+            bucket: dict | None = None,
+    ):
+        address, record = await self.__get_record(chat=chat, user=user)
+        record.bucket = copy.deepcopy(bucket) if bucket else {}
+        self.__mark_dirty(address, record)
+
+    async def update_bucket(
+            self,
+            *,
+            chat: str | int | None = None,
+            user: str | int | None = None,
+            bucket: dict | None = None,
+            **kwargs,
+    ):
+        address, record = await self.__get_record(chat=chat, user=user)
+        record.bucket.update(copy.deepcopy({**(bucket or {}), **kwargs}))
+        self.__mark_dirty(address, record)
@@ -1,7 +1,7 @@
 import shutil
 
 import structlog
-from aiogram import Dispatcher, Bot
+from aiogram import Dispatcher
 from aiogram.dispatcher import FSMContext
 from aiogram.dispatcher.filters import Command, CommandStart
 from aiogram.dispatcher.filters import Text
@@ -10,8 +10,9 @@ from aiogram.types import Message
 
 import config
 from common.filters import AdminFilter
-from common.views import answer_view, send_views
-from users.exceptions import UserNotInDatabase
+from common.services import AdminsNotificator
+from common.views import answer_view
+from users.models import User
 from users.repositories import UserRepository
 from users.views import (
     AdminMenuView, UserGreetingsView,
@@ -25,10 +26,10 @@ logger = structlog.get_logger('app')
 async def on_accept_rules(
         message: Message,
         user_repository: UserRepository,
-        bot: Bot,
         is_admin: bool,
+        admins_notificator: AdminsNotificator,
 ) -> None:
-    user_repository.create(
+    await user_repository.create(
         telegram_id=message.from_user.id,
         username=message.from_user.username,
     )
@@ -43,23 +44,20 @@ async def on_accept_rules(
         telegram_id=message.from_user.id,
         username=message.from_user.username,
     )
-    await send_views(
-        bot=bot,
-        chat_ids=config.AppSettings().admins_id,
-        view=view
+    admins_notificator.notify_in_background(
+        text=view.get_text(),
+        reply_markup=view.get_reply_markup(),
     )
 
 
 async def on_start(
         message: Message,
         state: FSMContext,
-        user_repository: UserRepository,
+        user: User | None,
         is_admin: bool,
 ) -> None:
     await state.finish()
-    try:
-        user = user_repository.get_by_telegram_id(message.from_user.id)
-    except UserNotInDatabase:
+    if user is None:
         await answer_view(message=message, view=RulesView())
         return
     view = AdminMenuView() if is_admin else UserMenuView()
@@ -14,3 +14,115 @@ class Buyer(typing.TypedDict):
 class Period:
     start: datetime
     end: datetime
+
+
+@dataclass(frozen=True, slots=True)
+class RepositoryMethodStats:
+    method_name: str
+    calls_count: int = 0
+    total_wait_time: float = 0
+    max_wait_time: float = 0
+    total_execution_time: float = 0
+    max_execution_time: float = 0
+
+    @property
+    def average_wait_time(self) -> float:
+        if not self.calls_count:
+            return 0
+        return self.total_wait_time / self.calls_count
+
+    @property
+    def average_execution_time(self) -> float:
+        if not self.calls_count:
+            return 0
+        return self.total_execution_time / self.calls_count
+
+    def add_call(
+            self,
+            *,
+            wait_time: float,
+            execution_time: float,
+    ) -> 'RepositoryMethodStats':
+        return RepositoryMethodStats(
+            method_name=self.method_name,
+            calls_count=self.calls_count + 1,
+            total_wait_time=self.total_wait_time + wait_time,
+            max_wait_time=max(self.max_wait_time, wait_time),
+            total_execution_time=self.total_execution_time + execution_time,
+            max_execution_time=max(self.max_execution_time, execution_time),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class CacheStats:
+    hits_count: int
+    misses_count: int
+    evictions_count: int
+    size: int
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups_count = self.hits_count + self.misses_count
+        if not lookups_count:
+            return 0
+        return self.hits_count / lookups_count
+
+
+@dataclass(frozen=True, slots=True)
+class FanOutResult:
+    """Outcome of sending to many chats.
+
+    Attributes:
+        results: Return values of successful sends by chat ID.
+        errors: Errors of failed sends by chat ID.
+    """
+
+    results: dict[int, object]
+    errors: dict[int, Exception]
+
+
+@dataclass(frozen=True, slots=True)
+class SendQueueStats:
+    """Statistics of outbound Telegram calls of one priority class.
+
+    Attributes:
+        priority_name: Name of the priority class.
+        queue_depth: Number of calls waiting for the global limit now.
+        calls_count: Number of calls that have been let through.
+        total_wait_time: Time spent waiting for rate limits by all calls.
+        max_wait_time: Longest time spent waiting by one call.
+    """
+
+    priority_name: str
+    queue_depth: int = 0
+    calls_count: int = 0
+    total_wait_time: float = 0
+    max_wait_time: float = 0
+
+    @property
+    def average_wait_time(self) -> float:
+        if not self.calls_count:
+            return 0
+        return self.total_wait_time / self.calls_count
+
+
+@dataclass(frozen=True, slots=True)
+class FSMStorageStats:
+    """Statistics of FSM storage with write-behind cache.
+
+    Attributes:
+        hits_count: Number of lookups served from the cache.
+        misses_count: Number of lookups that read the database.
+        cached_records_count: Number of records held in the cache now.
+        dirty_records_count: Number of changed records not flushed yet.
+        flushed_records_count: Number of records written or deleted
+            by flushes.
+        expired_records_count: Number of idle records dropped by TTL.
+    """
+
+    hits_count: int
+    misses_count: int
+    cached_records_count: int
+    dirty_records_count: int
+    flushed_records_count: int
+    expired_records_count: int
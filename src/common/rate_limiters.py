@@ -0,0 +1,53 @@
+import asyncio
+import time
+
+__all__ = ('TokenBucket',)
+
+
+class TokenBucket:
+    """Token bucket rate limiter shared by concurrent coroutines.
+
+    Tokens are refilled continuously at `rate` tokens per second
+    up to `capacity`, so short bursts are allowed while the average
+    rate never exceeds the limit. Waiters are served in FIFO order.
+    """
+
+    def __init__(self, *, rate: float, capacity: float | None = None):
+        self.__rate = rate
+        self.__capacity = rate if capacity is None else capacity
+        self.__tokens = self.__capacity
+        self.__updated_at = time.monotonic()
+        self.__paused_until = 0.0
+        self.__lock = asyncio.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self.__rate
+
+    def __refill(self, now: float) -> None:
+        elapsed_time = now - self.__updated_at
+        self.__tokens = min(
+            self.__capacity,
+            self.__tokens + elapsed_time * self.__rate,
+        )
+        self.__updated_at = now
+
+    async def acquire(self) -> None:
+        async with self.__lock:
+            while True:
+                now = time.monotonic()
+                if now < self.__paused_until:
+                    await asyncio.sleep(self.__paused_until - now)
+                    continue
+                self.__refill(now)
+                if self.__tokens >= 1:
+                    self.__tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.__tokens) / self.__rate)
+
+    def pause(self, seconds: float) -> None:
+        """Stop giving out tokens for given time, e.g. on flood control."""
+        now = time.monotonic()
+        self.__paused_until = max(self.__paused_until, now + seconds)
+        self.__tokens = 0
+        self.__updated_at = max(now, self.__paused_until)
@@ -1,9 +1,179 @@
-from sqlalchemy.orm import sessionmaker
+import asyncio
+import functools
+import threading
+import time
+from collections.abc import Callable, Awaitable
+from concurrent.futures import ThreadPoolExecutor
+from typing import ParamSpec, TypeVar, Concatenate
 
-__all__ = ('BaseRepository',)
+import structlog
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker, scoped_session
+from structlog.stdlib import BoundLogger
+
+from common.models import RepositoryMethodStats
+
+__all__ = (
+    'BaseRepository',
+    'AsyncBaseRepository',
+    'RepositoryThreadPool',
+    'run_in_thread_pool',
+)
+
+logger: BoundLogger = structlog.get_logger('app')
+
+P = ParamSpec('P')
+R = TypeVar('R')
+RepositoryT = TypeVar('RepositoryT', bound='BaseRepository')
+
+
+class RepositoryThreadPool:
+    """Size-limited thread pool that runs sync repository methods.
+
+    Keeps per-method statistics of time spent waiting in the queue
+    and time spent executing, so the pool size can be tuned.
+    """
+
+    def __init__(self, *, max_workers: int):
+        self.__executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='repository',
+        )
+        self.__max_workers = max_workers
+        self.__lock = threading.Lock()
+        self.__queue_depth = 0
+        self.__stats: dict[str, RepositoryMethodStats] = {}
+
+    @property
+    def max_workers(self) -> int:
+        return self.__max_workers
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of submitted calls that have not started executing yet."""
+        return self.__queue_depth
+
+    def get_stats(self) -> list[RepositoryMethodStats]:
+        with self.__lock:
+            return list(self.__stats.values())
+
+    def log_stats(self) -> None:
+        logger.info(
+            'Repository thread pool stats',
+            max_workers=self.__max_workers,
+            queue_depth=self.__queue_depth,
+            methods=[
+                {
+                    'method': stats.method_name,
+                    'calls_count': stats.calls_count,
+                    'average_wait_time': stats.average_wait_time,
+                    'max_wait_time': stats.max_wait_time,
+                    'average_execution_time': stats.average_execution_time,
+                    'max_execution_time': stats.max_execution_time,
+                } for stats in self.get_stats()
+            ],
+        )
+
+    def __record(
+            self,
+            *,
+            method_name: str,
+            wait_time: float,
+            execution_time: float,
+    ) -> None:
+        with self.__lock:
+            stats = self.__stats.get(method_name)
+            if stats is None:
+                stats = RepositoryMethodStats(method_name=method_name)
+            self.__stats[method_name] = stats.add_call(
+                wait_time=wait_time,
+                execution_time=execution_time,
+            )
+
+    async def run(
+            self,
+            method_name: str,
+            function: Callable[P, R],
+            *args: P.args,
+            **kwargs: P.kwargs,
+    ) -> R:
+        submitted_at = time.perf_counter()
+        with self.__lock:
+            self.__queue_depth += 1
+
+        def call() -> R:
+            started_at = time.perf_counter()
+            with self.__lock:
+                self.__queue_depth -= 1
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.__record(
+                    method_name=method_name,
+                    wait_time=started_at - submitted_at,
+                    execution_time=time.perf_counter() - started_at,
+                )
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.__executor, call)
+
+    def shutdown(self) -> None:
+        self.__executor.shutdown(wait=True)
 
 
 class BaseRepository:
+    """Base class for repositories built on sync sessions.
+
+    If thread pool is provided, methods decorated with
+    `run_in_thread_pool` are executed in it and every worker thread
+    gets its own session from the session factory.
+    """
+
+    def __init__(
+            self,
+            session_factory: sessionmaker,
+            thread_pool: RepositoryThreadPool | None = None,
+    ):
+        if thread_pool is not None:
+            session_factory = scoped_session(session_factory)
+        self._session_factory = session_factory
+        self._thread_pool = thread_pool
+
+
+def run_in_thread_pool(
+        method: Callable[Concatenate[RepositoryT, P], R],
+) -> Callable[Concatenate[RepositoryT, P], Awaitable[R]]:
+    """Make sync repository method awaitable.
+
+    The method is offloaded to the repository's thread pool,
+    or called in place if the repository has no thread pool.
+    """
+
+    @functools.wraps(method)
+    async def wrapper(
+            self: RepositoryT,
+            *args: P.args,
+            **kwargs: P.kwargs,
+    ) -> R:
+        if self._thread_pool is None:
+            return method(self, *args, **kwargs)
+        return await self._thread_pool.run(
+            method.__qualname__,
+            method,
+            self,
+            *args,
+            **kwargs,
+        )
+
+    return wrapper
+
+
+class AsyncBaseRepository:
+    """Base class for repositories whose methods must be awaited.
+
+    Sessions are created by the `sqlalchemy.ext.asyncio` session factory,
+    so database I/O does not block the event loop.
+    """
 
-    def __init__(self, session_factory: sessionmaker):
+    def __init__(self, session_factory: async_sessionmaker):
         self._session_factory = session_factory
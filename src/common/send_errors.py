@@ -0,0 +1,56 @@
+import asyncio
+import enum
+
+from aiogram.utils.exceptions import (
+    BotBlocked,
+    BotKicked,
+    CantInitiateConversation,
+    ChatNotFound,
+    NetworkError,
+    RestartingTelegram,
+    RetryAfter,
+    TelegramAPIError,
+    UserDeactivated,
+)
+
+__all__ = (
+    'SendFailureReason',
+    'classify_send_error',
+)
+
+
+class SendFailureReason(enum.Enum):
+    BLOCKED = 'blocked'
+    DEACTIVATED = 'deactivated'
+    TRANSIENT = 'transient'
+    OTHER = 'other'
+
+    @property
+    def is_chat_unreachable(self) -> bool:
+        return self in (
+            SendFailureReason.BLOCKED,
+            SendFailureReason.DEACTIVATED,
+        )
+
+
+def classify_send_error(
+        error: TelegramAPIError | asyncio.TimeoutError,
+) -> SendFailureReason:
+    if isinstance(error, (BotBlocked, BotKicked)):
+        return SendFailureReason.BLOCKED
+    if isinstance(
+            error,
+            (UserDeactivated, ChatNotFound, CantInitiateConversation),
+    ):
+        return SendFailureReason.DEACTIVATED
+    if isinstance(
+            error,
+            (
+                NetworkError,
+                RestartingTelegram,
+                RetryAfter,
+                asyncio.TimeoutError,
+            ),
+    ):
+        return SendFailureReason.TRANSIENT
+    return SendFailureReason.OTHER
@@ -0,0 +1,227 @@
+import asyncio
+import contextlib
+import enum
+import heapq
+import itertools
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextvars import ContextVar
+
+import structlog
+from aiogram import Bot
+from aiogram.utils.exceptions import RetryAfter
+from structlog.stdlib import BoundLogger
+
+from common.models import SendQueueStats
+from common.rate_limiters import TokenBucket
+
+__all__ = (
+    'SendPriority',
+    'current_send_priority',
+    'send_priority',
+    'OutboundSendQueue',
+    'QueuedBot',
+)
+
+logger: BoundLogger = structlog.get_logger('app')
+
+
+class SendPriority(enum.IntEnum):
+    INTERACTIVE = 0
+    ADMIN = 1
+    BULK = 2
+
+
+current_send_priority: ContextVar[SendPriority] = ContextVar(
+    'current_send_priority',
+    default=SendPriority.INTERACTIVE,
+)
+
+
+@contextlib.contextmanager
+def send_priority(priority: SendPriority) -> Iterator[None]:
+    """Send all Telegram calls made inside the block with given priority.
+
+    The priority is inherited by tasks created inside the block.
+    """
+    token = current_send_priority.set(priority)
+    try:
+        yield
+    finally:
+        current_send_priority.reset(token)
+
+
+class OutboundSendQueue:
+    """Coordinates outgoing Telegram calls of the whole bot.
+
+    Every call first waits for its chat's rate limit, then joins
+    the queue for the global rate limit. When a token of the global
+    limit is available, it is given to the waiting call of the highest
+    priority, so interactive replies overtake notifications and
+    notifications overtake bulk mailing.
+    """
+
+    def __init__(
+            self,
+            *,
+            global_rate: float = 30,
+            per_chat_rate: float = 1,
+            per_chat_burst: float = 3,
+            max_tracked_chats_count: int = 10000,
+    ):
+        self.__global_rate_limiter = TokenBucket(rate=global_rate)
+        self.__per_chat_rate = per_chat_rate
+        self.__per_chat_burst = per_chat_burst
+        self.__max_tracked_chats_count = max_tracked_chats_count
+        self.__chat_rate_limiters: OrderedDict[int | str, TokenBucket] = (
+            OrderedDict()
+        )
+        self.__waiters: list[tuple[int, int, asyncio.Future]] = []
+        self.__waiters_counter = itertools.count()
+        self.__has_waiters = asyncio.Event()
+        self.__scheduler: asyncio.Task | None = None
+        self.__stats: dict[SendPriority, SendQueueStats] = {
+            priority: SendQueueStats(priority_name=priority.name)
+            for priority in SendPriority
+        }
+
+    def get_queue_depth(self) -> dict[SendPriority, int]:
+        queue_depth = {priority: 0 for priority in SendPriority}
+        for priority, _, future in self.__waiters:
+            if not future.done():
+                queue_depth[SendPriority(priority)] += 1
+        return queue_depth
+
+    def get_stats(self) -> list[SendQueueStats]:
+        queue_depth = self.get_queue_depth()
+        return [
+            SendQueueStats(
+                priority_name=stats.priority_name,
+                queue_depth=queue_depth[priority],
+                calls_count=stats.calls_count,
+                total_wait_time=stats.total_wait_time,
+                max_wait_time=stats.max_wait_time,
+            ) for priority, stats in self.__stats.items()
+        ]
+
+    def log_stats(self) -> None:
+        logger.info(
+            'Outbound send queue stats',
+            priorities=[
+                {
+                    'priority': stats.priority_name,
+                    'queue_depth': stats.queue_depth,
+                    'calls_count': stats.calls_count,
+                    'average_wait_time': stats.average_wait_time,
+                    'max_wait_time': stats.max_wait_time,
+                } for stats in self.get_stats()
+            ],
+        )
+
+    def pause(self, seconds: float, chat_id: int | str | None = None) -> None:
+        """Stop letting calls through, e.g. on flood control.
+
+        If chat ID is given, only calls to that chat are stopped,
+        since Telegram's flood waits are usually per chat.
+        """
+        if chat_id is None:
+            self.__global_rate_limiter.pause(seconds)
+        else:
+            self.__get_chat_rate_limiter(chat_id).pause(seconds)
+
+    def __get_chat_rate_limiter(self, chat_id: int | str) -> TokenBucket:
+        chat_rate_limiter = self.__chat_rate_limiters.get(chat_id)
+        if chat_rate_limiter is None:
+            chat_rate_limiter = TokenBucket(
+                rate=self.__per_chat_rate,
+                capacity=self.__per_chat_burst,
+            )
+            self.__chat_rate_limiters[chat_id] = chat_rate_limiter
+            if (
+                    len(self.__chat_rate_limiters)
+                    > self.__max_tracked_chats_count
+            ):
+                self.__chat_rate_limiters.popitem(last=False)
+        else:
+            self.__chat_rate_limiters.move_to_end(chat_id)
+        return chat_rate_limiter
+
+    def __record(self, priority: SendPriority, wait_time: float) -> None:
+        stats = self.__stats[priority]
+        self.__stats[priority] = SendQueueStats(
+            priority_name=stats.priority_name,
+            calls_count=stats.calls_count + 1,
+            total_wait_time=stats.total_wait_time + wait_time,
+            max_wait_time=max(stats.max_wait_time, wait_time),
+        )
+
+    async def __schedule(self) -> None:
+        while True:
+            await self.__has_waiters.wait()
+            await self.__global_rate_limiter.acquire()
+            while self.__waiters:
+                *_, future = heapq.heappop(self.__waiters)
+                if not future.done():
+                    future.set_result(None)
+                    break
+            if not self.__waiters:
+                self.__has_waiters.clear()
+
+    async def acquire(self, chat_id: int | str | None = None) -> None:
+        """Wait until call to chat is allowed by per-chat and global limits.
+
+        Priority of the call is taken from `send_priority` context.
+        """
+        priority = current_send_priority.get()
+        started_at = time.monotonic()
+        if chat_id is not None:
+            await self.__get_chat_rate_limiter(chat_id).acquire()
+
+        if self.__scheduler is None or self.__scheduler.done():
+            self.__scheduler = asyncio.create_task(self.__schedule())
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self.__waiters,
+            (priority, next(self.__waiters_counter), future),
+        )
+        self.__has_waiters.set()
+        await future
+        self.__record(priority, time.monotonic() - started_at)
+
+    async def close(self) -> None:
+        if self.__scheduler is not None:
+            self.__scheduler.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.__scheduler
+            self.__scheduler = None
+
+
+class QueuedBot(Bot):
+    """Bot whose message sending calls go through outbound send queue."""
+
+    RATE_LIMITED_METHOD_PREFIXES = ('send', 'copy', 'forward', 'edit')
+
+    def __init__(self, *args, send_queue: OutboundSendQueue, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.__send_queue = send_queue
+
+    @property
+    def send_queue(self) -> OutboundSendQueue:
+        return self.__send_queue
+
+    async def request(self, method, data=None, files=None, **kwargs):
+        chat_id = None if data is None else data.get('chat_id')
+        if method.startswith(self.RATE_LIMITED_METHOD_PREFIXES):
+            await self.__send_queue.acquire(chat_id)
+        try:
+            return await super().request(method, data, files, **kwargs)
+        except RetryAfter as error:
+            logger.warning(
+                'Flood control exceeded',
+                method=method,
+                chat_id=chat_id,
+                retry_after=error.timeout,
+            )
+            self.__send_queue.pause(error.timeout, chat_id)
+            raise
@@ -1,6 +1,7 @@
-from collections.abc import Iterable
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable
 from datetime import datetime
-from typing import NewType
+from typing import NewType, Protocol, TypeVar
 from zoneinfo import ZoneInfo
 
 import structlog
@@ -9,14 +10,24 @@ from aiogram.types import InlineKeyboardMarkup
 from aiogram.utils.exceptions import TelegramAPIError
 from structlog.stdlib import BoundLogger
 
+from common.admins import AdminTelegramIds
+from common.background_tasks import BackgroundTaskQueue
+from common.models import FanOutResult
+from common.send_errors import classify_send_error
+from common.send_queue import SendPriority, send_priority
+
 __all__ = (
     'AdminsNotificator',
+    'HasMarkUnreachableMethod',
+    'fan_out',
     'get_now_datetime',
     'to_local_time',
 )
 
 logger: BoundLogger = structlog.get_logger('app')
 
+T = TypeVar('T')
+
   
 TIMEZONE = ZoneInfo('US/Eastern')
 UTC = ZoneInfo('UTC')
@@ -31,31 +42,103 @@ def to_local_time(dt: datetime) -> TZAware:
     return TZAware(dt.replace(tzinfo=UTC).astimezone(TIMEZONE))
 
 
+class HasMarkUnreachableMethod(Protocol):
+
+    async def mark_unreachable(self, telegram_ids: Iterable[int]) -> None: ...
+
+
+async def fan_out(
+        chat_ids: Iterable[int],
+        send: Callable[[int], Awaitable[T]],
+        *,
+        max_concurrency: int = 10,
+) -> FanOutResult:
+    """Send to every chat concurrently, at most `max_concurrency` at once.
+
+    Args:
+        chat_ids: IDs of chats to send to.
+        send: Sends to chat with given ID.
+        max_concurrency: Max number of sends in flight.
+
+    Returns:
+        Results and Telegram API errors by chat ID.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    results: dict[int, T] = {}
+    errors: dict[int, Exception] = {}
+
+    async def send_to_chat(chat_id: int) -> None:
+        async with semaphore:
+            try:
+                results[chat_id] = await send(chat_id)
+            except TelegramAPIError as error:
+                errors[chat_id] = error
+
+    await asyncio.gather(*(send_to_chat(chat_id) for chat_id in chat_ids))
+    return FanOutResult(results=results, errors=errors)
+
+
 class AdminsNotificator:
+    """Sends notifications to all admins concurrently.
+
+    Use `notify_in_background` from handlers, so the user does not
+    wait for admins' notifications to be delivered.
+    """
 
     def __init__(
             self,
             *,
-            admin_ids: Iterable[int],
+            admin_ids: AdminTelegramIds,
             bot: Bot,
+            user_repository: HasMarkUnreachableMethod | None = None,
+            background_task_queue: BackgroundTaskQueue | None = None,
+            max_concurrency: int = 10,
     ):
-        self.__admin_ids = set(admin_ids)
+        self.__admin_ids = admin_ids
         self.__bot = bot
+        self.__user_repository = user_repository
+        self.__background_task_queue = background_task_queue
+        self.__max_concurrency = max_concurrency
 
     async def notify(
             self,
             text: str,
             reply_markup: InlineKeyboardMarkup | None = None,
-    ):
-        for admin_id in self.__admin_ids:
-            try:
-                await self.__bot.send_message(
+    ) -> dict[int, Exception]:
+        """Send notification to every admin.
+
+        Returns:
+            Errors by admin's chat ID.
+        """
+        with send_priority(SendPriority.ADMIN):
+            result = await fan_out(
+                self.__admin_ids,
+                lambda admin_id: self.__bot.send_message(
                     text=text,
                     chat_id=admin_id,
                     reply_markup=reply_markup,
-                )
-            except TelegramAPIError:
-                logger.warning(
-                    'Could not send notification to admin',
-                    chat_id=admin_id,
-                )
\ No newline at end of file
+                ),
+                max_concurrency=self.__max_concurrency,
+            )
+        for admin_id, error in result.errors.items():
+            logger.warning(
+                'Could not send notification to admin',
+                chat_id=admin_id,
+                error=repr(error),
+            )
+        unreachable_chat_ids = [
+            admin_id for admin_id, error in result.errors.items()
+            if classify_send_error(error).is_chat_unreachable
+        ]
+        if unreachable_chat_ids and self.__user_repository is not None:
+            await self.__user_repository.mark_unreachable(unreachable_chat_ids)
+        return result.errors
+
+    def notify_in_background(
+            self,
+            text: str,
+            reply_markup: InlineKeyboardMarkup | None = None,
+    ) -> None:
+        if self.__background_task_queue is None:
+            raise RuntimeError('Background task queue is not set')
+        self.__background_task_queue.submit(self.notify, text, reply_markup)
@@ -1,8 +1,5 @@
-from collections.abc import Iterable
 from typing import TypeAlias
 
-import structlog
-from aiogram import Bot
 from aiogram.types import (
     Message,
     InlineKeyboardMarkup,
@@ -10,7 +7,6 @@ from aiogram.types import (
     ForceReply,
     ReplyKeyboardRemove,
 )
-from aiogram.utils.exceptions import TelegramAPIError
 
 __all__ = (
     'ErrorView',
@@ -19,8 +15,6 @@ __all__ = (
     'answer_view',
 )
 
-logger = structlog.get_logger('app')
-
 ReplyMarkup: TypeAlias = (
         InlineKeyboardMarkup
         | ReplyKeyboardMarkup
@@ -60,29 +54,6 @@ async def answer_view(
     return await message.answer(text=text, reply_markup=reply_markup)
 
 
-async def send_views(
-        *,
-        bot: Bot,
-        chat_ids: Iterable[int],
-        view: View,
-) -> list[Message]:
-    text = view.get_text()
-    reply_markup = view.get_reply_markup()
-    sent_messages: list[Message] = []
-    for chat_id in chat_ids:
-        try:
-            sent_message = await bot.send_message(
-                chat_id=chat_id,
-                text=text,
-                reply_markup=reply_markup,
-            )
-        except TelegramAPIError:
-            logger.error('Could not send view to user', chat_id=chat_id)
-        else:
-            sent_messages.append(sent_message)
-    return sent_messages
-
-
 class ErrorView(View):
     def __init__(self, exception: Exception):
         self.__exception = exception
@@ -0,0 +1,70 @@
+import asyncio
+import secrets
+
+import structlog
+from aiogram.dispatcher.webhook import WebhookRequestHandler
+from aiohttp import web
+from structlog.stdlib import BoundLogger
+
+__all__ = (
+    'SECRET_TOKEN_HEADER',
+    'SecretTokenWebhookRequestHandler',
+    'create_webhook_app',
+)
+
+logger: BoundLogger = structlog.get_logger('app')
+
+SECRET_TOKEN_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+
+SECRET_TOKEN_KEY = 'WEBHOOK_SECRET_TOKEN'
+UPDATES_SEMAPHORE_KEY = 'WEBHOOK_UPDATES_SEMAPHORE'
+
+
+def create_webhook_app(
+        *,
+        secret_token: str | None,
+        max_concurrent_updates: int,
+) -> web.Application:
+    """Create web application for `SecretTokenWebhookRequestHandler`.
+
+    The route and the dispatcher are added by aiogram's executor
+    when the application is passed to `Executor.set_webhook`.
+    """
+    app = web.Application()
+    # empty token would accept requests without the header
+    app[SECRET_TOKEN_KEY] = secret_token or None
+    app[UPDATES_SEMAPHORE_KEY] = asyncio.Semaphore(max_concurrent_updates)
+    return app
+
+
+class SecretTokenWebhookRequestHandler(WebhookRequestHandler):
+    """Webhook handler that accepts only requests sent by Telegram.
+
+    Telegram puts the secret token passed to `setWebhook` into
+    every request's header. Updates are processed concurrently,
+    but no more than the application's semaphore allows, the rest
+    wait for their turn without holding the dispatcher.
+    """
+
+    def validate_secret_token(self) -> None:
+        expected_secret_token: str | None = (
+            self.request.app[SECRET_TOKEN_KEY]
+        )
+        if expected_secret_token is None:
+            return
+        secret_token = self.request.headers.get(SECRET_TOKEN_HEADER, '')
+        if not secrets.compare_digest(secret_token, expected_secret_token):
+            logger.warning(
+                'Webhook request with invalid secret token',
+                remote=self.request.remote,
+            )
+            raise web.HTTPUnauthorized()
+
+    async def post(self) -> web.Response:
+        self.validate_secret_token()
+        return await super().post()
+
+    async def process_update(self, update):
+        semaphore: asyncio.Semaphore = self.request.app[UPDATES_SEMAPHORE_KEY]
+        async with semaphore:
+            return await super().process_update(update)
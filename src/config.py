@@ -4,7 +4,7 @@ from typing import Literal
 
 import dotenv
 import toml
-from pydantic import BaseSettings, Field
+from pydantic import BaseSettings, Field, validator
 
 ROOT_DIR = pathlib.Path(__file__).parent.parent
 
@@ -45,6 +45,51 @@ class AppSettings(BaseSettings):
     bot_token: str = Field(env='BOT_TOKEN')
     admins_id: list[int] = Field(env='ADMINS_ID', default_factory=list)
     debug: bool = Field(env='DEBUG', default=False)
+    # 0 disables the pool, so repository methods run in the event loop
+    repository_thread_pool_size: int = Field(
+        env='REPOSITORY_THREAD_POOL_SIZE',
+        default=4,
+    )
+    product_cache_max_size: int = Field(
+        env='PRODUCT_CACHE_MAX_SIZE',
+        default=1000,
+    )
+    # users changed outside of the bot process (e.g. by another
+    # instance) are seen by handlers after this many seconds at most
+    user_cache_ttl: float = Field(env='USER_CACHE_TTL', default=5)
+    user_cache_max_size: int = Field(
+        env='USER_CACHE_MAX_SIZE',
+        default=10000,
+    )
+    # products stay reserved in carts for this long after the last
+    # change, then expired reservations are returned to stock
+    cart_reservation_ttl_in_minutes: int = Field(
+        env='CART_RESERVATION_TTL_IN_MINUTES',
+        default=60,
+    )
+    # quantity changes in cart are applied once user stops tapping
+    # buttons for this many seconds
+    cart_quantity_change_delay: float = Field(
+        env='CART_QUANTITY_CHANGE_DELAY',
+        default=0.7,
+    )
+    # Telegram allows about 30 messages per second to different chats
+    # and about 1 message per second to the same chat
+    telegram_global_rate_limit: float = Field(
+        env='TELEGRAM_GLOBAL_RATE_LIMIT',
+        default=30,
+    )
+    telegram_per_chat_rate_limit: float = Field(
+        env='TELEGRAM_PER_CHAT_RATE_LIMIT',
+        default=1,
+    )
+    # states untouched for this many seconds are deleted as abandoned
+    fsm_state_ttl: int = Field(env='FSM_STATE_TTL', default=24 * 60 * 60)
+    mailing_rate_limit: float = Field(env='MAILING_RATE_LIMIT', default=25)
+    mailing_workers_count: int = Field(
+        env='MAILING_WORKERS_COUNT',
+        default=10,
+    )
 
 
 class PaymentsSettings(BaseSettings):
@@ -96,6 +141,34 @@ class BackupSettings(BaseSettings):
     admin_id: int = Field(None, env='ADMIN_ID_FOR_BACKUP_SENDING')
 
 
+class WebhookSettings(BaseSettings):
+    __slots__ = ()
+    is_enabled: bool = TOMLSettings()['webhook']['is_enabled']
+    path: str = TOMLSettings()['webhook']['path']
+    host: str = TOMLSettings()['webhook']['host']
+    port: int = TOMLSettings()['webhook']['port']
+    # Telegram keeps no more than 100 connections to webhook
+    max_concurrent_updates: int = (
+        TOMLSettings()['webhook']['max_concurrent_updates']
+    )
+    # public HTTPS address Telegram sends updates to, without the path
+    url: str = Field(None, env='WEBHOOK_URL')
+    secret_token: str | None = Field(None, env='WEBHOOK_SECRET_TOKEN')
+
+    @validator('secret_token')
+    def empty_secret_token_to_none(cls, value: str | None) -> str | None:
+        # `WEBHOOK_SECRET_TOKEN=` in .env means no secret token,
+        # Telegram rejects empty one
+        return value or None
+
+
+class DatabaseSettings(BaseSettings):
+    __slots__ = ()
+    engine_profile: Literal['default', 'tuned'] = (
+        TOMLSettings()['database']['engine_profile']
+    )
+
+
 # used for extra text on certain categories, do NOT remove
 class CustomCategoryMessages(BaseSettings):
     __slots__ = ()
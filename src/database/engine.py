@@ -1,4 +1,78 @@
+import dataclasses
+from dataclasses import dataclass
+
 import sqlalchemy
+from sqlalchemy import event, Engine
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import config
+
+__all__ = (
+    'engine',
+    'async_engine',
+    'SQLiteEngineProfile',
+    'ENGINE_PROFILES',
+    'apply_engine_profile',
+)
+
+
+@dataclass(frozen=True, slots=True)
+class SQLiteEngineProfile:
+    """PRAGMA values applied to every new SQLite connection.
+
+    Pragmas set to None are left at SQLite defaults.
+    """
+    journal_mode: str | None = None
+    synchronous: str | None = None
+    mmap_size: int | None = None
+    cache_size: int | None = None
+    temp_store: str | None = None
+    busy_timeout: int | None = None
+
+    def get_pragmas(self) -> dict[str, str | int]:
+        return {
+            field.name: getattr(self, field.name)
+            for field in dataclasses.fields(self)
+            if getattr(self, field.name) is not None
+        }
 
 
+ENGINE_PROFILES: dict[str, SQLiteEngineProfile] = {
+    'default': SQLiteEngineProfile(),
+    'tuned': SQLiteEngineProfile(
+        # readers don't block behind writers and vice versa
+        journal_mode='WAL',
+        # safe in WAL mode, fsync only on checkpoints
+        synchronous='NORMAL',
+        mmap_size=256 * 1024 * 1024,
+        # negative value is size in KiB, i.e. 64 MiB
+        cache_size=-64 * 1024,
+        temp_store='MEMORY',
+        busy_timeout=5000,
+    ),
+}
+
+
+def apply_engine_profile(
+        engine_to_configure: Engine,
+        profile: SQLiteEngineProfile,
+) -> None:
+    pragmas = profile.get_pragmas()
+    if not pragmas:
+        return
+
+    @event.listens_for(engine_to_configure, 'connect')
+    def on_connect(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+
+engine_profile = ENGINE_PROFILES[config.DatabaseSettings().engine_profile]
+
 engine = sqlalchemy.create_engine('sqlite:///../data/database.db')
+apply_engine_profile(engine, engine_profile)
+
+async_engine = create_async_engine('sqlite+aiosqlite:///../data/database.db')
+apply_engine_profile(async_engine.sync_engine, engine_profile)
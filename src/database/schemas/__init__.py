@@ -1,7 +1,9 @@
 from .cart import *
 from .categories import *
 from .discounts import *
+from .mailing_jobs import *
 from .payment_methods import *
+from .pending_charges import *
 from .products import *
 from .sales import *
 from .shop_info import *
@@ -1,4 +1,6 @@
-from sqlalchemy import ForeignKey, CheckConstraint
+from datetime import datetime
+
+from sqlalchemy import TIMESTAMP, ForeignKey, CheckConstraint
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
 from database.schemas.base import BaseModel
@@ -11,11 +13,18 @@ class CartProduct(BaseModel):
 
     user_id: Mapped[int] = mapped_column(
         ForeignKey('users.id', ondelete='CASCADE'),
+        index=True,
     )
     product_id: Mapped[int] = mapped_column(
         ForeignKey('products.id', ondelete='CASCADE'),
     )
     quantity: Mapped[int]
+    # stock is returned to the product once reservation expires,
+    # rows created before expiry was introduced have no expiry time
+    expires_at: Mapped[datetime | None] = mapped_column(
+        TIMESTAMP,
+        index=True,
+    )
 
     product: Mapped['Product'] = relationship(
         'Product',
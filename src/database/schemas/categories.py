@@ -20,6 +20,7 @@ class Category(BaseModel):
         Integer,
         ForeignKey('categories.id', ondelete='CASCADE'),
         nullable=True,
+        index=True,
     )
 
     parent: Mapped['Category'] = relationship(
@@ -0,0 +1,55 @@
+import enum
+from datetime import datetime
+
+from sqlalchemy import BigInteger, TIMESTAMP
+from sqlalchemy.orm import Mapped, mapped_column
+
+from database.schemas.base import BaseModel
+
+__all__ = ('MailingJob', 'MailingJobStatus', 'MailingSegment')
+
+
+class MailingJobStatus(enum.Enum):
+    RUNNING = 'Running'
+    PAUSED = 'Paused'
+    CANCELLED = 'Cancelled'
+    COMPLETED = 'Completed'
+    FAILED = 'Failed'
+
+
+class MailingSegment(enum.Enum):
+    ALL = 'All users'
+    BUYERS = 'Buyers'
+    WITH_BALANCE = 'Users with balance'
+    WITH_CART = 'Users with cart'
+    REGISTERED_AFTER = 'Users registered after date'
+
+
+class MailingJob(BaseModel):
+    """Broadcast of admin's message to users.
+
+    Users are processed in order of their IDs, `last_user_id` is the
+    checkpoint the job is resumed from after pause or restart.
+    """
+    __tablename__ = 'mailing_jobs'
+
+    from_chat_id: Mapped[int] = mapped_column(BigInteger)
+    message_id: Mapped[int]
+    progress_chat_id: Mapped[int] = mapped_column(BigInteger)
+    progress_message_id: Mapped[int]
+    segment: Mapped[MailingSegment] = mapped_column(
+        default=MailingSegment.ALL,
+    )
+    registered_after: Mapped[datetime | None] = mapped_column(TIMESTAMP)
+    status: Mapped[MailingJobStatus] = mapped_column(
+        default=MailingJobStatus.RUNNING,
+        index=True,
+    )
+    last_user_id: Mapped[int] = mapped_column(default=0)
+    sent_count: Mapped[int] = mapped_column(default=0)
+    blocked_count: Mapped[int] = mapped_column(default=0)
+    deactivated_count: Mapped[int] = mapped_column(default=0)
+    transient_failed_count: Mapped[int] = mapped_column(default=0)
+    other_failed_count: Mapped[int] = mapped_column(default=0)
+    retry_after_count: Mapped[int] = mapped_column(default=0)
+    elapsed_time: Mapped[float] = mapped_column(default=0)
@@ -5,5 +5,6 @@ __all__ = ('PaymentMethod',)
 
 class PaymentMethod(enum.Enum):
     COINBASE = 'Coinbase'
+    COINPAYMENTS = 'CoinPayments'
     FROM_ADMIN = 'From Admin'
     BALANCE = 'Balance'
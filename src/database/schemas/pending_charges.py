@@ -0,0 +1,37 @@
+import enum
+from decimal import Decimal
+
+from sqlalchemy import ForeignKey, String, UniqueConstraint, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from database.schemas.base import BaseModel
+from database.schemas.payment_methods import PaymentMethod
+
+__all__ = ('PendingCharge', 'PendingChargeStatus')
+
+
+class PendingChargeStatus(enum.Enum):
+    PENDING = 'Pending'
+    CREDITED = 'Credited'
+    FAILED = 'Failed'
+
+
+class PendingCharge(BaseModel):
+    """Balance top up charge created in payment gateway."""
+    __tablename__ = 'pending_charges'
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey('users.id', ondelete='CASCADE'),
+    )
+    payment_method: Mapped[PaymentMethod]
+    charge_id: Mapped[str] = mapped_column(String(255))
+    amount: Mapped[Decimal]
+    credited_amount: Mapped[Decimal | None]
+    status: Mapped[PendingChargeStatus] = mapped_column(
+        default=PendingChargeStatus.PENDING,
+    )
+
+    __table_args__ = (
+        UniqueConstraint('payment_method', 'charge_id'),
+        Index('ix_pending_charges_status_id', 'status', 'id'),
+    )
@@ -2,7 +2,7 @@ import enum
 from decimal import Decimal
 from uuid import UUID
 
-from sqlalchemy import String, ForeignKey, CheckConstraint
+from sqlalchemy import String, ForeignKey, CheckConstraint, Index
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
 from database.schemas.base import BaseModel, Base
@@ -10,6 +10,7 @@ from database.schemas.payment_methods import PaymentMethod
 
 __all__ = (
     'ProductMedia',
+    'ProductMediaTelegramFile',
     'MediaType',
     'Product',
     'ProductUnit',
@@ -54,6 +55,23 @@ class ProductMedia(Base):
         back_populates='media',
         cascade='all, delete',
     )
+    telegram_file: Mapped['ProductMediaTelegramFile | None'] = relationship(
+        'ProductMediaTelegramFile',
+        back_populates='media',
+    )
+
+
+class ProductMediaTelegramFile(Base):
+    """Telegram file ID of product media uploaded to Telegram already."""
+    __tablename__ = 'product_media_telegram_files'
+
+    media_uuid: Mapped[UUID] = mapped_column(
+        ForeignKey('product_media.uuid', ondelete='CASCADE'),
+        primary_key=True,
+    )
+    file_id: Mapped[str]
+
+    media = relationship('ProductMedia', back_populates='telegram_file')
 
 
 class Product(BaseModel):
@@ -109,6 +127,14 @@ class ProductUnit(BaseModel):
     product_id: Mapped[int] = mapped_column(ForeignKey('products.id'))
     content: Mapped[str]
     type: Mapped[str]
-    sale_id: Mapped[int] = mapped_column(ForeignKey('sales.id'))
+    # units that are not sold yet have no sale
+    sale_id: Mapped[int | None] = mapped_column(ForeignKey('sales.id'))
+    # units imported from one document share ID of the import
+    import_id: Mapped[str | None]
 
     product: Mapped[Product] = relationship('Product', back_populates='units')
+
+    __table_args__ = (
+        Index('ix_product_units_product_id_sale_id', 'product_id', 'sale_id'),
+        Index('ix_product_units_import_id', 'import_id'),
+    )
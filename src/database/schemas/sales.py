@@ -1,6 +1,6 @@
 from decimal import Decimal
 
-from sqlalchemy import ForeignKey, CheckConstraint
+from sqlalchemy import ForeignKey, CheckConstraint, Index
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
 from database.schemas.base import BaseModel, Base
@@ -17,6 +17,10 @@ class Sale(BaseModel):
 
     products = relationship('SoldProduct', back_populates='sale')
 
+    __table_args__ = (
+        Index('ix_sales_user_id_created_at', 'user_id', 'created_at'),
+    )
+
 
 class SoldProduct(Base):
     __tablename__ = 'sold_products'
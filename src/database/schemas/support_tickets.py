@@ -1,6 +1,6 @@
 import enum
 
-from sqlalchemy import String, ForeignKey
+from sqlalchemy import String, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from database.schemas.base import BaseModel
@@ -29,6 +29,7 @@ class SupportTicket(BaseModel):
     answer: Mapped[str | None]
     status: Mapped[SupportTicketStatus] = mapped_column(
         default=SupportTicketStatus.OPEN,
+        index=True,
     )
 
     replies = relationship(
@@ -37,6 +38,14 @@ class SupportTicket(BaseModel):
         cascade='all, delete',
     )
 
+    __table_args__ = (
+        Index(
+            'ix_support_tickets_user_id_created_at',
+            'user_id',
+            'created_at',
+        ),
+    )
+
 
 class SupportTicketReplySource(enum.Enum):
     USER = 'User'
@@ -1,6 +1,6 @@
 from decimal import Decimal
 
-from sqlalchemy import BigInteger, String, CheckConstraint
+from sqlalchemy import BigInteger, String, CheckConstraint, Index, true
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
 from database.schemas.base import BaseModel
@@ -15,6 +15,12 @@ class User(BaseModel):
     username: Mapped[str | None] = mapped_column(String(32))
     balance: Mapped[Decimal] = mapped_column(default=0)
     is_banned: Mapped[bool] = mapped_column(default=False)
+    # False once Telegram reports that user blocked the bot or
+    # deleted the account, until the user writes to the bot again
+    is_reachable: Mapped[bool] = mapped_column(
+        default=True,
+        server_default=true(),
+    )
     max_cart_cost: Mapped[Decimal | None]
     permanent_discount: Mapped[int] = mapped_column(default=0)
 
@@ -25,4 +31,5 @@ class User(BaseModel):
             'permanent_discount BETWEEN 0 AND 99',
             name='check_permanent_discount',
         ),
+        Index('ix_users_created_at', 'created_at'),
     )
@@ -1,11 +1,13 @@
 import contextlib
 
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.orm import sessionmaker, Session
 
-from database.engine import engine
+from database.engine import engine, async_engine
 
 __all__ = (
     'session_factory',
+    'async_session_factory',
     'create_session',
     'RawSession',
 )
@@ -16,6 +18,11 @@ RawSession = sessionmaker(bind=engine.engine)
 
 session_factory = sessionmaker(bind=engine, expire_on_commit=False)
 
+async_session_factory = async_sessionmaker(
+    bind=async_engine,
+    expire_on_commit=False,
+)
+
 
 @contextlib.contextmanager
 def create_session() -> Session:
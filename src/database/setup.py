@@ -1,13 +1,138 @@
+import sqlalchemy
 import structlog
+from sqlalchemy import Engine
+from sqlalchemy.schema import CreateColumn, CreateTable
 
 from database.engine import engine
 from database.schemas.base import Base
 
-__all__ = ('init_tables',)
+__all__ = (
+    'init_tables',
+    'create_missing_columns',
+    'create_missing_indexes',
+    'relax_not_null_columns',
+)
 
 logger = structlog.get_logger('database')
 
 
+def create_missing_columns(bind: Engine = engine) -> None:
+    """Add columns declared on models but missing in the database.
+
+    Only columns that are nullable or have server default can be added
+    to the table with existing rows, others are reported and skipped.
+    """
+    with bind.begin() as connection:
+        inspector = sqlalchemy.inspect(connection)
+        existing_table_names = set(inspector.get_table_names())
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_table_names:
+                continue
+            existing_column_names = {
+                column['name'] for column in inspector.get_columns(table.name)
+            }
+            for column in table.columns:
+                if column.name in existing_column_names:
+                    continue
+                if not column.nullable and column.server_default is None:
+                    logger.warning(
+                        'Database column can not be added',
+                        table=table.name,
+                        column=column.name,
+                    )
+                    continue
+                column_definition = CreateColumn(column).compile(
+                    dialect=connection.dialect,
+                )
+                connection.exec_driver_sql(
+                    f'ALTER TABLE {table.name} ADD COLUMN {column_definition}'
+                )
+                logger.info(
+                    'Database column created',
+                    table=table.name,
+                    column=column.name,
+                )
+
+
+def relax_not_null_columns(bind: Engine = engine) -> None:
+    """Rebuild tables having NOT NULL columns that models declare nullable.
+
+    SQLite can not change constraints of existing columns, so the table
+    is created once again from the model under temporary name, rows are
+    copied to it, then the old table is dropped and the new one takes
+    its name. Indexes are dropped together with the old table and have
+    to be created by `create_missing_indexes` afterwards.
+    """
+    with bind.begin() as connection:
+        inspector = sqlalchemy.inspect(connection)
+        existing_table_names = set(inspector.get_table_names())
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_table_names:
+                continue
+            existing_columns = {
+                column['name']: column
+                for column in inspector.get_columns(table.name)
+            }
+            relaxed_column_names = [
+                column.name for column in table.columns
+                if column.nullable
+                and column.name in existing_columns
+                and not existing_columns[column.name]['nullable']
+            ]
+            if not relaxed_column_names:
+                continue
+
+            new_table_name = f'_new_{table.name}'
+            create_table_statement = str(
+                CreateTable(table).compile(dialect=connection.dialect)
+            ).replace(
+                f'CREATE TABLE {table.name} ',
+                f'CREATE TABLE {new_table_name} ',
+                1,
+            )
+            copied_column_names = ', '.join(
+                column.name for column in table.columns
+                if column.name in existing_columns
+            )
+            connection.exec_driver_sql(create_table_statement)
+            connection.exec_driver_sql(
+                f'INSERT INTO {new_table_name} ({copied_column_names})'
+                f' SELECT {copied_column_names} FROM {table.name}'
+            )
+            connection.exec_driver_sql(f'DROP TABLE {table.name}')
+            connection.exec_driver_sql(
+                f'ALTER TABLE {new_table_name} RENAME TO {table.name}'
+            )
+            logger.info(
+                'Database table rebuilt with nullable columns',
+                table=table.name,
+                columns=relaxed_column_names,
+            )
+
+
+def create_missing_indexes(bind: Engine = engine) -> None:
+    """Create indexes declared on models but missing in the database.
+
+    `create_all` skips tables that already exist together with their
+    indexes, so indexes added to models later are created here in place,
+    without rebuilding the tables.
+    """
+    with bind.begin() as connection:
+        inspector = sqlalchemy.inspect(connection)
+        for table in Base.metadata.sorted_tables:
+            existing_index_names = {
+                index['name'] for index in inspector.get_indexes(table.name)
+            }
+            for index in table.indexes:
+                if index.name in existing_index_names:
+                    continue
+                index.create(connection)
+                logger.info('Database index created', index=index.name)
+
+
 def init_tables():
     Base.metadata.create_all(engine)
+    relax_not_null_columns()
+    create_missing_columns()
+    create_missing_indexes()
     logger.debug('Database tables init')
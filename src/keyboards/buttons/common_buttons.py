@@ -0,0 +1,6 @@
+from aiogram.types import InlineKeyboardButton
+
+
+class CloseButton(InlineKeyboardButton):
+    def __init__(self):
+        super().__init__(text='🚫 Close', callback_data='close')
@@ -1,34 +1,6 @@
 import aiogram.utils.callback_data
 
 from keyboards.buttons import payments_buttons
-from payments.services import PaymentsAPIsRepository
-
-
-class PaymentMethodsKeyboard(aiogram.types.InlineKeyboardMarkup):
-    def __init__(self, callback_data: dict[str: str],
-                 callback_factory: aiogram.utils.callback_data.CallbackData,
-                 is_balance: bool = False, crypto_payments: str = None):
-        super().__init__(row_width=1)
-        buttons = {
-            'qiwi': payments_buttons.QiwiButton(callback_data,
-                                                callback_factory),
-            'yoomoney': payments_buttons.YooMoneyButton(callback_data,
-                                                        callback_factory),
-            'minerlock': payments_buttons.MinerlockButton(callback_data,
-                                                          callback_factory),
-            'coinpayments': payments_buttons.CoinPaymentsButton(callback_data,
-                                                                callback_factory),
-            'coinbase': payments_buttons.CoinBaseButton(callback_data,
-                                                        callback_factory),
-            'crypto_payments': payments_buttons.CryptoPaymentButton(
-                callback_data, crypto_payments, callback_factory)
-        }
-        apis_repository = PaymentsAPIsRepository(crypto_payments)
-        for name, api in apis_repository.get_valid_apis():
-            self.add(buttons[name])
-        if is_balance:
-            self.add(
-                payments_buttons.BalanceButton(callback_data, callback_factory))
 
 
 class CoinbasePaymentKeyboard(aiogram.types.InlineKeyboardMarkup):
@@ -0,0 +1,37 @@
+from aiogram.utils.callback_data import CallbackData
+
+from mailing.models import MailingSegment
+
+__all__ = (
+    'MailingSegmentChooseCallbackData',
+    'MailingJobControlCallbackData',
+)
+
+
+class MailingSegmentChooseCallbackData(CallbackData):
+
+    def __init__(self):
+        super().__init__('mailing-segment-choose', 'segment')
+
+    def parse(self, callback_data: str) -> dict:
+        callback_data = super().parse(callback_data)
+        return callback_data | {
+            'segment': MailingSegment[callback_data['segment']],
+        }
+
+
+class MailingJobControlCallbackData(CallbackData):
+
+    def __init__(self):
+        super().__init__('mailing-job-control', 'mailing_job_id', 'action')
+
+    def parse(self, callback_data: str) -> dict:
+        callback_data = super().parse(callback_data)
+        action = callback_data['action']
+
+        if action not in ('pause', 'resume', 'cancel'):
+            raise ValueError(f'Invalid action: {action}')
+
+        return callback_data | {
+            'mailing_job_id': int(callback_data['mailing_job_id']),
+        }
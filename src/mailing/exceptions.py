@@ -0,0 +1,9 @@
+class MailingJobDoesNotExistError(Exception):
+
+    def __init__(self, *args, mailing_job_id: int):
+        super().__init__(*args)
+        self.mailing_job_id = mailing_job_id
+
+
+class RegistrationDateValidationError(Exception):
+    pass
@@ -1,15 +1,22 @@
+from datetime import datetime
+
 import structlog
 from aiogram import Dispatcher
 from aiogram.dispatcher import FSMContext
 from aiogram.dispatcher.filters import Text
-from aiogram.types import ContentType, Message
+from aiogram.types import CallbackQuery, ContentType, Message
 
 from common.filters import AdminFilter
 from common.views import answer_view
-from mailing.services import send_mailing
+from mailing.callback_data import (
+    MailingJobControlCallbackData,
+    MailingSegmentChooseCallbackData,
+)
+from mailing.exceptions import RegistrationDateValidationError
+from mailing.models import MailingSegment
+from mailing.services import MailingJobManager, parse_registration_date
 from mailing.states import MailingStates
-from mailing.views import MailingView, MailingFinishView
-from users.repositories import UserRepository
+from mailing.views import MailingSegmentsView, MailingView
 from users.views import AdminMenuView
 
 logger = structlog.get_logger('app')
@@ -19,7 +26,12 @@ async def on_show_newsletter_menu(message: Message) -> None:
     await answer_view(message=message, view=MailingView())
 
 
-async def create_newsletter(message: Message) -> None:
+async def create_newsletter(message: Message, state: FSMContext) -> None:
+    await state.finish()
+    await answer_view(message=message, view=MailingSegmentsView())
+
+
+async def ask_for_newsletter(message: Message) -> None:
     await MailingStates.waiting_newsletter.set()
     await message.answer(
         '✏️ Enter the text of your newsletter in the usual telegram format'
@@ -28,26 +40,85 @@ async def create_newsletter(message: Message) -> None:
     )
 
 
-async def send_newsletter(
+async def on_choose_mailing_segment(
+        callback_query: CallbackQuery,
+        callback_data: dict,
+        state: FSMContext,
+) -> None:
+    segment: MailingSegment = callback_data['segment']
+    await state.update_data(segment=segment.name)
+    await callback_query.message.edit_text(f'👥 {segment.value}')
+    if segment == MailingSegment.REGISTERED_AFTER:
+        await MailingStates.registered_after.set()
+        await callback_query.message.answer(
+            '📅 Enter the registration date in MM/DD/YYYY format',
+        )
+    else:
+        await ask_for_newsletter(callback_query.message)
+    await callback_query.answer()
+
+
+async def on_registered_after_input(
         message: Message,
         state: FSMContext,
-        user_repository: UserRepository,
 ) -> None:
-    await state.finish()
-    telegram_ids = user_repository.get_all_telegram_ids()
-    await message.answer('✅ The mailing has started')
+    try:
+        registered_after = parse_registration_date(message.text)
+    except RegistrationDateValidationError:
+        await message.answer('❌ Enter the date in MM/DD/YYYY format')
+        return
+    await state.update_data(registered_after=registered_after.isoformat())
+    await ask_for_newsletter(message)
 
-    received_users_count = await send_mailing(message, telegram_ids)
-    failed_newsletters_count = len(telegram_ids) - received_users_count
 
-    view = MailingFinishView(
-        successful_newsletters=received_users_count,
-        unsuccessful_newsletters=failed_newsletters_count,
+async def send_newsletter(
+        message: Message,
+        state: FSMContext,
+        mailing_job_manager: MailingJobManager,
+) -> None:
+    state_data = await state.get_data()
+    await state.finish()
+    segment = MailingSegment[state_data.get('segment', 'ALL')]
+    registered_after = state_data.get('registered_after')
+    if registered_after is not None:
+        registered_after = datetime.fromisoformat(registered_after)
+    progress_message = await message.answer('⏳ The mailing is starting')
+    await mailing_job_manager.start(
+        message=message,
+        progress_message=progress_message,
+        segment=segment,
+        registered_after=registered_after,
     )
-    await answer_view(message=message, view=view)
     await answer_view(message=message, view=AdminMenuView())
 
 
+async def on_control_mailing_job(
+        callback_query: CallbackQuery,
+        callback_data: dict,
+        mailing_job_manager: MailingJobManager,
+) -> None:
+    mailing_job_id: int = callback_data['mailing_job_id']
+    action: str = callback_data['action']
+    action_to_method_and_text = {
+        'pause': (
+            mailing_job_manager.pause,
+            '⏸ The newsletter will be paused shortly',
+        ),
+        'resume': (
+            mailing_job_manager.resume,
+            '▶️ The newsletter is resumed',
+        ),
+        'cancel': (
+            mailing_job_manager.cancel,
+            '🚫 The newsletter is cancelled',
+        ),
+    }
+    method, text = action_to_method_and_text[action]
+    if not await method(mailing_job_id):
+        text = '❌ The newsletter can not be changed anymore'
+    await callback_query.answer(text)
+
+
 def register_handlers(dispatcher: Dispatcher) -> None:
     dispatcher.register_message_handler(
         on_show_newsletter_menu,
@@ -61,10 +132,27 @@ def register_handlers(dispatcher: Dispatcher) -> None:
         AdminFilter(),
         state='*',
     )
+    dispatcher.register_callback_query_handler(
+        on_choose_mailing_segment,
+        MailingSegmentChooseCallbackData().filter(),
+        AdminFilter(),
+        state='*',
+    )
+    dispatcher.register_message_handler(
+        on_registered_after_input,
+        AdminFilter(),
+        state=MailingStates.registered_after,
+    )
     dispatcher.register_message_handler(
         send_newsletter,
         AdminFilter(),
         content_types=ContentType.ANY,
         state=MailingStates.waiting_newsletter,
     )
+    dispatcher.register_callback_query_handler(
+        on_control_mailing_job,
+        MailingJobControlCallbackData().filter(),
+        AdminFilter(),
+        state='*',
+    )
     logger.debug('Registered mailing handlers')
@@ -0,0 +1,72 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+from common.send_errors import SendFailureReason
+from database.schemas import MailingJobStatus, MailingSegment
+
+__all__ = (
+    'MailingJobStatus',
+    'MailingSegment',
+    'SendFailureReason',
+    'MailingStats',
+    'MailingJob',
+)
+
+
+@dataclass(frozen=True, slots=True)
+class MailingStats:
+    sent_count: int = 0
+    blocked_count: int = 0
+    deactivated_count: int = 0
+    transient_failed_count: int = 0
+    other_failed_count: int = 0
+    retry_after_count: int = 0
+    elapsed_time: float = 0
+
+    @property
+    def failed_count(self) -> int:
+        return (
+                self.blocked_count
+                + self.deactivated_count
+                + self.transient_failed_count
+                + self.other_failed_count
+        )
+
+    @property
+    def processed_count(self) -> int:
+        return self.sent_count + self.failed_count
+
+    @property
+    def sent_per_second(self) -> float:
+        if not self.elapsed_time:
+            return 0
+        return self.sent_count / self.elapsed_time
+
+
+@dataclass(frozen=True, slots=True)
+class MailingJob:
+    """Persisted broadcast.
+
+    Attributes:
+        id: Mailing job ID.
+        from_chat_id: Chat of the message being broadcast.
+        message_id: ID of the message being broadcast.
+        progress_chat_id: Chat of the message with live progress.
+        progress_message_id: ID of the message with live progress.
+        segment: Users the message is broadcast to.
+        registered_after: Registration date for REGISTERED_AFTER segment.
+        status: Mailing job status.
+        last_user_id: ID of the last user processed before checkpoint.
+        stats: Statistics saved at checkpoint.
+    """
+
+    id: int
+    from_chat_id: int
+    message_id: int
+    progress_chat_id: int
+    progress_message_id: int
+    segment: MailingSegment
+    registered_after: datetime | None
+    status: MailingJobStatus
+    last_user_id: int
+    stats: MailingStats
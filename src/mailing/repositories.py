@@ -0,0 +1,160 @@
+from datetime import datetime
+
+from sqlalchemy import select, update
+
+from common.repositories import BaseRepository, run_in_thread_pool
+from database.schemas import MailingJob, MailingJobStatus, MailingSegment
+from mailing import models as mailing_models
+from mailing.exceptions import MailingJobDoesNotExistError
+
+__all__ = ('MailingJobRepository',)
+
+
+def map_mailing_job_to_dto(
+        mailing_job: MailingJob,
+) -> mailing_models.MailingJob:
+    return mailing_models.MailingJob(
+        id=mailing_job.id,
+        from_chat_id=mailing_job.from_chat_id,
+        message_id=mailing_job.message_id,
+        progress_chat_id=mailing_job.progress_chat_id,
+        progress_message_id=mailing_job.progress_message_id,
+        segment=mailing_job.segment,
+        registered_after=mailing_job.registered_after,
+        status=mailing_job.status,
+        last_user_id=mailing_job.last_user_id,
+        stats=mailing_models.MailingStats(
+            sent_count=mailing_job.sent_count,
+            blocked_count=mailing_job.blocked_count,
+            deactivated_count=mailing_job.deactivated_count,
+            transient_failed_count=mailing_job.transient_failed_count,
+            other_failed_count=mailing_job.other_failed_count,
+            retry_after_count=mailing_job.retry_after_count,
+            elapsed_time=mailing_job.elapsed_time,
+        ),
+    )
+
+
+class MailingJobRepository(BaseRepository):
+
+    @run_in_thread_pool
+    def create(
+            self,
+            *,
+            from_chat_id: int,
+            message_id: int,
+            progress_chat_id: int,
+            progress_message_id: int,
+            segment: MailingSegment = MailingSegment.ALL,
+            registered_after: datetime | None = None,
+    ) -> mailing_models.MailingJob:
+        mailing_job = MailingJob(
+            from_chat_id=from_chat_id,
+            message_id=message_id,
+            progress_chat_id=progress_chat_id,
+            progress_message_id=progress_message_id,
+            segment=segment,
+            registered_after=registered_after,
+            status=MailingJobStatus.RUNNING,
+            last_user_id=0,
+            sent_count=0,
+            blocked_count=0,
+            deactivated_count=0,
+            transient_failed_count=0,
+            other_failed_count=0,
+            retry_after_count=0,
+            elapsed_time=0,
+        )
+        with self._session_factory() as session:
+            with session.begin():
+                session.add(mailing_job)
+                session.flush()
+                return map_mailing_job_to_dto(mailing_job)
+
+    @run_in_thread_pool
+    def get_by_id(self, mailing_job_id: int) -> mailing_models.MailingJob:
+        with self._session_factory() as session:
+            mailing_job = session.get(MailingJob, mailing_job_id)
+            if mailing_job is None:
+                raise MailingJobDoesNotExistError(
+                    mailing_job_id=mailing_job_id,
+                )
+            return map_mailing_job_to_dto(mailing_job)
+
+    @run_in_thread_pool
+    def get_by_status(
+            self,
+            status: MailingJobStatus,
+    ) -> list[mailing_models.MailingJob]:
+        statement = (
+            select(MailingJob)
+            .where(MailingJob.status == status)
+            .order_by(MailingJob.id)
+        )
+        with self._session_factory() as session:
+            mailing_jobs = session.scalars(statement).all()
+            return [
+                map_mailing_job_to_dto(mailing_job)
+                for mailing_job in mailing_jobs
+            ]
+
+    @run_in_thread_pool
+    def save_checkpoint(
+            self,
+            *,
+            mailing_job_id: int,
+            last_user_id: int,
+            stats: mailing_models.MailingStats,
+    ) -> None:
+        statement = (
+            update(MailingJob)
+            .where(MailingJob.id == mailing_job_id)
+            .values(
+                last_user_id=last_user_id,
+                sent_count=stats.sent_count,
+                blocked_count=stats.blocked_count,
+                deactivated_count=stats.deactivated_count,
+                transient_failed_count=stats.transient_failed_count,
+                other_failed_count=stats.other_failed_count,
+                retry_after_count=stats.retry_after_count,
+                elapsed_time=stats.elapsed_time,
+            )
+        )
+        with self._session_factory() as session:
+            with session.begin():
+                session.execute(statement)
+
+    @run_in_thread_pool
+    def update_status(
+            self,
+            *,
+            mailing_job_id: int,
+            status: MailingJobStatus,
+            from_statuses: tuple[MailingJobStatus, ...] = (
+                    MailingJobStatus.RUNNING,
+                    MailingJobStatus.PAUSED,
+            ),
+    ) -> bool:
+        """Change status of mailing job.
+
+        Args:
+            mailing_job_id: Mailing job ID.
+            status: New status.
+            from_statuses: Status is changed only if job is in one of them,
+                           so finished jobs are never resurrected.
+
+        Returns:
+            True if status has been changed.
+        """
+        statement = (
+            update(MailingJob)
+            .where(
+                MailingJob.id == mailing_job_id,
+                MailingJob.status.in_(from_statuses),
+            )
+            .values(status=status)
+        )
+        with self._session_factory() as session:
+            with session.begin():
+                result = session.execute(statement)
+        return bool(result.rowcount)
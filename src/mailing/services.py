@@ -1,17 +1,523 @@
 import asyncio
 import contextlib
-from collections.abc import Iterable
+import time
+from collections.abc import AsyncIterable, Awaitable, Callable, Iterable
+from datetime import datetime
 
+import structlog
+from aiogram import Bot
 from aiogram.types import Message
-from aiogram.utils.exceptions import TelegramAPIError
-
-
-async def send_mailing(message: Message, chat_ids: Iterable[int]) -> int:
-    received_users_count = 0
-    for chat_id in chat_ids:
-        with contextlib.suppress(TelegramAPIError):
-            await message.copy_to(chat_id=chat_id)
-            # Otherwise Telegram will mute bot for some few hours
-            await asyncio.sleep(0.05)
-            received_users_count += 1
-    return received_users_count
+from aiogram.utils.exceptions import (
+    MessageNotModified,
+    RetryAfter,
+    TelegramAPIError,
+)
+from structlog.stdlib import BoundLogger
+
+from common.rate_limiters import TokenBucket
+from common.send_errors import SendFailureReason, classify_send_error
+from common.send_queue import SendPriority, current_send_priority
+from mailing.exceptions import RegistrationDateValidationError
+from mailing.models import (
+    MailingJob,
+    MailingJobStatus,
+    MailingSegment,
+    MailingStats,
+)
+from mailing.repositories import MailingJobRepository
+from mailing.views import MailingJobView
+from users.repositories import UserRepository
+
+__all__ = (
+    'parse_registration_date',
+    'MailingSender',
+    'UnreachableChatIdsCollector',
+    'MailingJobManager',
+)
+
+logger: BoundLogger = structlog.get_logger('app')
+
+SendResultCallback = Callable[[int, SendFailureReason | None], Awaitable[None]]
+
+
+def parse_registration_date(date_text: str) -> datetime:
+    try:
+        return datetime.strptime(date_text, '%m/%d/%Y')
+    except ValueError:
+        raise RegistrationDateValidationError
+
+
+class MailingSender:
+    """Sends message to many chats with bounded number of workers.
+
+    Every send takes a token from the rate limiter. On flood control
+    the rate limiter is paused for the time Telegram asks to wait,
+    so all workers back off together. Transient failures are retried
+    with exponential backoff, permanent ones are reported at once.
+    """
+
+    def __init__(
+            self,
+            *,
+            send: Callable[[int], Awaitable[object]],
+            rate_limiter: TokenBucket,
+            workers_count: int = 10,
+            max_attempts: int = 3,
+            max_retry_after_count: int = 5,
+            backoff_factor: float = 1,
+            report_interval: float = 10,
+            on_result: SendResultCallback | None = None,
+            stats: MailingStats | None = None,
+    ):
+        self.__send = send
+        self.__rate_limiter = rate_limiter
+        self.__workers_count = workers_count
+        self.__max_attempts = max_attempts
+        self.__max_retry_after_count = max_retry_after_count
+        self.__backoff_factor = backoff_factor
+        self.__report_interval = report_interval
+        self.__on_result = on_result
+        self.__stats = MailingStats() if stats is None else stats
+        self.__elapsed_time = self.__stats.elapsed_time
+        self.__started_at: float | None = None
+
+    def get_stats(self) -> MailingStats:
+        elapsed_time = self.__elapsed_time
+        if self.__started_at is not None:
+            elapsed_time += time.monotonic() - self.__started_at
+        return MailingStats(
+            sent_count=self.__stats.sent_count,
+            blocked_count=self.__stats.blocked_count,
+            deactivated_count=self.__stats.deactivated_count,
+            transient_failed_count=self.__stats.transient_failed_count,
+            other_failed_count=self.__stats.other_failed_count,
+            retry_after_count=self.__stats.retry_after_count,
+            elapsed_time=elapsed_time,
+        )
+
+    def log_stats(self) -> None:
+        stats = self.get_stats()
+        logger.info(
+            'Mailing stats',
+            sent_count=stats.sent_count,
+            blocked_count=stats.blocked_count,
+            deactivated_count=stats.deactivated_count,
+            transient_failed_count=stats.transient_failed_count,
+            other_failed_count=stats.other_failed_count,
+            retry_after_count=stats.retry_after_count,
+            elapsed_time=round(stats.elapsed_time, 2),
+            sent_per_second=round(stats.sent_per_second, 2),
+        )
+
+    def __count(self, **increments: int) -> None:
+        stats = self.__stats
+        self.__stats = MailingStats(
+            **{
+                field: getattr(stats, field) + increments.get(field, 0)
+                for field in (
+                    'sent_count',
+                    'blocked_count',
+                    'deactivated_count',
+                    'transient_failed_count',
+                    'other_failed_count',
+                    'retry_after_count',
+                )
+            }
+        )
+
+    async def __send_with_retries(
+            self,
+            chat_id: int,
+    ) -> SendFailureReason | None:
+        attempt = 1
+        retry_after_count = 0
+        while True:
+            await self.__rate_limiter.acquire()
+            try:
+                await self.__send(chat_id)
+            except RetryAfter as error:
+                self.__count(retry_after_count=1)
+                self.__rate_limiter.pause(error.timeout)
+                logger.warning(
+                    'Mailing: flood control exceeded',
+                    retry_after=error.timeout,
+                )
+                retry_after_count += 1
+                if retry_after_count > self.__max_retry_after_count:
+                    return SendFailureReason.TRANSIENT
+            except (TelegramAPIError, asyncio.TimeoutError) as error:
+                reason = classify_send_error(error)
+                if (
+                        reason != SendFailureReason.TRANSIENT
+                        or attempt >= self.__max_attempts
+                ):
+                    logger.debug(
+                        'Mailing: could not send message',
+                        chat_id=chat_id,
+                        reason=reason.value,
+                        error=repr(error),
+                    )
+                    return reason
+                await asyncio.sleep(self.__backoff_factor * 2 ** (attempt - 1))
+                attempt += 1
+            else:
+                return None
+
+    async def __handle(self, chat_id: int) -> None:
+        reason = await self.__send_with_retries(chat_id)
+        reason_to_counter = {
+            None: 'sent_count',
+            SendFailureReason.BLOCKED: 'blocked_count',
+            SendFailureReason.DEACTIVATED: 'deactivated_count',
+            SendFailureReason.TRANSIENT: 'transient_failed_count',
+            SendFailureReason.OTHER: 'other_failed_count',
+        }
+        self.__count(**{reason_to_counter[reason]: 1})
+        if self.__on_result is not None:
+            await self.__on_result(chat_id, reason)
+
+    async def __work(self, queue: asyncio.Queue) -> None:
+        while (chat_id := await queue.get()) is not None:
+            try:
+                await self.__handle(chat_id)
+            except Exception:
+                logger.exception('Mailing: worker failed', chat_id=chat_id)
+
+    async def __report(self) -> None:
+        while True:
+            await asyncio.sleep(self.__report_interval)
+            stats = self.get_stats()
+            logger.info(
+                'Mailing progress',
+                sent_count=stats.sent_count,
+                failed_count=stats.failed_count,
+                retry_after_count=stats.retry_after_count,
+                sent_per_second=round(stats.sent_per_second, 2),
+            )
+
+    async def run(
+            self,
+            chat_ids: Iterable[int] | AsyncIterable[int],
+    ) -> MailingStats:
+        """Send message to every chat.
+
+        May be called several times, e.g. for every page of recipients,
+        statistics are accumulated across calls.
+        """
+        self.__started_at = time.monotonic()
+        queue: asyncio.Queue[int | None] = asyncio.Queue(
+            maxsize=self.__workers_count * 2,
+        )
+        workers = [
+            asyncio.create_task(self.__work(queue))
+            for _ in range(self.__workers_count)
+        ]
+        reporter = asyncio.create_task(self.__report())
+        try:
+            if isinstance(chat_ids, AsyncIterable):
+                async for chat_id in chat_ids:
+                    await queue.put(chat_id)
+            else:
+                for chat_id in chat_ids:
+                    await queue.put(chat_id)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            reporter.cancel()
+            for worker in workers:
+                worker.cancel()
+            self.__elapsed_time += time.monotonic() - self.__started_at
+            self.__started_at = None
+
+        return self.get_stats()
+
+
+class UnreachableChatIdsCollector:
+    """Result callback of `MailingSender` that collects chats which
+    can't receive messages anymore, so they are marked in batches."""
+
+    def __init__(self):
+        self.__chat_ids: list[int] = []
+
+    async def __call__(
+            self,
+            chat_id: int,
+            reason: SendFailureReason | None,
+    ) -> None:
+        if reason is not None and reason.is_chat_unreachable:
+            self.__chat_ids.append(chat_id)
+
+    def pop_all(self) -> list[int]:
+        chat_ids, self.__chat_ids = self.__chat_ids, []
+        return chat_ids
+
+
+class MailingJobManager:
+    """Runs persisted mailing jobs.
+
+    Recipients are streamed page by page in order of user ID. After every
+    page the cursor and statistics are saved, so a job interrupted by
+    restart is resumed from its last checkpoint by `resume_running`.
+    Progress is shown in a single admin's message edited periodically.
+    """
+
+    def __init__(
+            self,
+            *,
+            bot: Bot,
+            mailing_job_repository: MailingJobRepository,
+            user_repository: UserRepository,
+            rate_limiter: TokenBucket,
+            workers_count: int = 10,
+            page_size: int = 100,
+            progress_update_interval: float = 5,
+    ):
+        self.__bot = bot
+        self.__mailing_job_repository = mailing_job_repository
+        self.__user_repository = user_repository
+        self.__rate_limiter = rate_limiter
+        self.__workers_count = workers_count
+        self.__page_size = page_size
+        self.__progress_update_interval = progress_update_interval
+        self.__tasks: dict[int, asyncio.Task] = {}
+        self.__requested_statuses: dict[int, MailingJobStatus] = {}
+
+    async def start(
+            self,
+            *,
+            message: Message,
+            progress_message: Message,
+            segment: MailingSegment = MailingSegment.ALL,
+            registered_after: datetime | None = None,
+    ) -> MailingJob:
+        """Start broadcasting message to users of segment.
+
+        Args:
+            message: Message to broadcast.
+            progress_message: Bot's message to show progress in.
+            segment: Users to broadcast message to.
+            registered_after: Registration date for REGISTERED_AFTER segment.
+
+        Returns:
+            Created mailing job.
+        """
+        mailing_job = await self.__mailing_job_repository.create(
+            from_chat_id=message.chat.id,
+            message_id=message.message_id,
+            progress_chat_id=progress_message.chat.id,
+            progress_message_id=progress_message.message_id,
+            segment=segment,
+            registered_after=registered_after,
+        )
+        self.__start_task(mailing_job)
+        return mailing_job
+
+    async def resume_running(self) -> None:
+        """Resume jobs that were running when the bot was stopped."""
+        mailing_jobs = await self.__mailing_job_repository.get_by_status(
+            MailingJobStatus.RUNNING,
+        )
+        for mailing_job in mailing_jobs:
+            logger.info(
+                'Resuming mailing job',
+                mailing_job_id=mailing_job.id,
+                last_user_id=mailing_job.last_user_id,
+            )
+            self.__start_task(mailing_job)
+
+    async def pause(self, mailing_job_id: int) -> bool:
+        """Pause job after the current page of recipients is processed."""
+        if mailing_job_id not in self.__tasks:
+            return False
+        self.__requested_statuses[mailing_job_id] = MailingJobStatus.PAUSED
+        return True
+
+    async def resume(self, mailing_job_id: int) -> bool:
+        if mailing_job_id in self.__tasks:
+            requested_status = self.__requested_statuses.pop(
+                mailing_job_id,
+                None,
+            )
+            return requested_status == MailingJobStatus.PAUSED
+        is_updated = await self.__mailing_job_repository.update_status(
+            mailing_job_id=mailing_job_id,
+            status=MailingJobStatus.RUNNING,
+            from_statuses=(MailingJobStatus.PAUSED,),
+        )
+        if not is_updated:
+            return False
+        mailing_job = await self.__mailing_job_repository.get_by_id(
+            mailing_job_id,
+        )
+        self.__start_task(mailing_job)
+        return True
+
+    async def cancel(self, mailing_job_id: int) -> bool:
+        task = self.__tasks.get(mailing_job_id)
+        if task is not None:
+            self.__requested_statuses[mailing_job_id] = (
+                MailingJobStatus.CANCELLED
+            )
+            task.cancel()
+            return True
+        is_updated = await self.__mailing_job_repository.update_status(
+            mailing_job_id=mailing_job_id,
+            status=MailingJobStatus.CANCELLED,
+            from_statuses=(MailingJobStatus.PAUSED,),
+        )
+        if is_updated:
+            mailing_job = await self.__mailing_job_repository.get_by_id(
+                mailing_job_id,
+            )
+            await self.__edit_progress_message(
+                mailing_job,
+                status=MailingJobStatus.CANCELLED,
+                stats=mailing_job.stats,
+            )
+        return is_updated
+
+    async def shutdown(self) -> None:
+        """Stop running jobs, they stay running in the database
+        and are resumed from their last checkpoints on next start."""
+        tasks = list(self.__tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def __start_task(self, mailing_job: MailingJob) -> None:
+        self.__tasks[mailing_job.id] = asyncio.create_task(
+            self.__run(mailing_job),
+        )
+
+    async def __edit_progress_message(
+            self,
+            mailing_job: MailingJob,
+            *,
+            status: MailingJobStatus,
+            stats: MailingStats,
+    ) -> None:
+        view = MailingJobView(
+            mailing_job_id=mailing_job.id,
+            status=status,
+            stats=stats,
+        )
+        try:
+            await self.__bot.edit_message_text(
+                text=view.get_text(),
+                chat_id=mailing_job.progress_chat_id,
+                message_id=mailing_job.progress_message_id,
+                reply_markup=view.get_reply_markup(),
+            )
+        except MessageNotModified:
+            pass
+        except TelegramAPIError:
+            logger.warning(
+                'Could not edit mailing progress message',
+                mailing_job_id=mailing_job.id,
+            )
+
+    async def __report_progress(
+            self,
+            mailing_job: MailingJob,
+            mailing_sender: MailingSender,
+    ) -> None:
+        while True:
+            await self.__edit_progress_message(
+                mailing_job,
+                status=MailingJobStatus.RUNNING,
+                stats=mailing_sender.get_stats(),
+            )
+            await asyncio.sleep(self.__progress_update_interval)
+
+    async def __run(self, mailing_job: MailingJob) -> None:
+        # Task has its own context, so the priority is not reset
+        current_send_priority.set(SendPriority.BULK)
+        unreachable_chat_ids_collector = UnreachableChatIdsCollector()
+        mailing_sender = MailingSender(
+            send=lambda chat_id: self.__bot.copy_message(
+                chat_id=chat_id,
+                from_chat_id=mailing_job.from_chat_id,
+                message_id=mailing_job.message_id,
+            ),
+            rate_limiter=self.__rate_limiter,
+            workers_count=self.__workers_count,
+            on_result=unreachable_chat_ids_collector,
+            stats=mailing_job.stats,
+        )
+        progress_reporter = asyncio.create_task(
+            self.__report_progress(mailing_job, mailing_sender),
+        )
+        last_user_id = mailing_job.last_user_id
+        recipient_pages = self.__user_repository.iter_mailing_recipients(
+            segment=mailing_job.segment,
+            registered_after=mailing_job.registered_after,
+            after_user_id=last_user_id,
+            page_size=self.__page_size,
+        )
+        try:
+            async with contextlib.aclosing(recipient_pages):
+                status = MailingJobStatus.COMPLETED
+                async for page in recipient_pages:
+                    requested_status = self.__requested_statuses.pop(
+                        mailing_job.id,
+                        None,
+                    )
+                    if requested_status is not None:
+                        status = requested_status
+                        break
+                    await mailing_sender.run(
+                        telegram_id for _, telegram_id in page
+                    )
+                    await self.__user_repository.mark_unreachable(
+                        unreachable_chat_ids_collector.pop_all(),
+                    )
+                    last_user_id = page[-1][0]
+                    await self.__mailing_job_repository.save_checkpoint(
+                        mailing_job_id=mailing_job.id,
+                        last_user_id=last_user_id,
+                        stats=mailing_sender.get_stats(),
+                    )
+        except asyncio.CancelledError:
+            status = self.__requested_statuses.pop(mailing_job.id, None)
+            if status != MailingJobStatus.CANCELLED:
+                raise
+        except Exception:
+            logger.exception(
+                'Mailing job failed',
+                mailing_job_id=mailing_job.id,
+            )
+            status = MailingJobStatus.FAILED
+        finally:
+            progress_reporter.cancel()
+            self.__requested_statuses.pop(mailing_job.id, None)
+            del self.__tasks[mailing_job.id]
+
+        stats = mailing_sender.get_stats()
+        # failed job keeps its last checkpoint,
+        # the step that failed may be the one saving it
+        if status != MailingJobStatus.FAILED:
+            await self.__user_repository.mark_unreachable(
+                unreachable_chat_ids_collector.pop_all(),
+            )
+            await self.__mailing_job_repository.save_checkpoint(
+                mailing_job_id=mailing_job.id,
+                last_user_id=last_user_id,
+                stats=stats,
+            )
+        await self.__mailing_job_repository.update_status(
+            mailing_job_id=mailing_job.id,
+            status=status,
+            from_statuses=(MailingJobStatus.RUNNING,),
+        )
+        await self.__edit_progress_message(
+            mailing_job,
+            status=status,
+            stats=stats,
+        )
+        logger.info(
+            'Mailing job stopped',
+            mailing_job_id=mailing_job.id,
+            status=status.value,
+        )
+        mailing_sender.log_stats()
@@ -4,4 +4,5 @@ __all__ = ('MailingStates',)
 
 
 class MailingStates(StatesGroup):
+    registered_after = State()
     waiting_newsletter = State()
@@ -1,10 +1,21 @@
-from aiogram.types import ReplyKeyboardMarkup, KeyboardButton
+from aiogram.types import (
+    InlineKeyboardButton,
+    InlineKeyboardMarkup,
+    KeyboardButton,
+    ReplyKeyboardMarkup,
+)
 
 from common.views import View
+from mailing.callback_data import (
+    MailingJobControlCallbackData,
+    MailingSegmentChooseCallbackData,
+)
+from mailing.models import MailingJobStatus, MailingSegment, MailingStats
 
 __all__ = (
     'MailingView',
-    'MailingFinishView',
+    'MailingSegmentsView',
+    'MailingJobView',
 )
 
 
@@ -23,24 +34,83 @@ class MailingView(View):
     )
 
 
-class MailingFinishView(View):
+class MailingSegmentsView(View):
+    text = '👥 Choose who will receive the newsletter'
+    reply_markup = InlineKeyboardMarkup(
+        inline_keyboard=[
+            [
+                InlineKeyboardButton(
+                    text=segment.value,
+                    callback_data=MailingSegmentChooseCallbackData().new(
+                        segment=segment.name,
+                    ),
+                ),
+            ] for segment in MailingSegment
+        ],
+    )
+
+
+class MailingJobView(View):
 
     def __init__(
             self,
             *,
-            successful_newsletters: int,
-            unsuccessful_newsletters: int,
+            mailing_job_id: int,
+            status: MailingJobStatus,
+            stats: MailingStats,
     ):
-        self.__unsuccessful_newsletters = unsuccessful_newsletters
-        self.__successful_newsletters = successful_newsletters
+        self.__mailing_job_id = mailing_job_id
+        self.__status = status
+        self.__stats = stats
 
     def get_text(self) -> str:
-        total_sent = (
-                self.__unsuccessful_newsletters + self.__successful_newsletters
-        )
+        status_to_title = {
+            MailingJobStatus.RUNNING: '📤 The newsletter is being sent',
+            MailingJobStatus.PAUSED: '⏸ The newsletter is paused',
+            MailingJobStatus.CANCELLED: '🚫 The newsletter is cancelled',
+            MailingJobStatus.COMPLETED: '✅ The newsletter is completed',
+            MailingJobStatus.FAILED: '❌ The newsletter failed',
+        }
+        stats = self.__stats
         return (
-            '✅ The newsletter is completed\n'
-            f'Total sent: {total_sent}\n\n'
-            f'✅ Successful: {self.__successful_newsletters}\n'
-            f'❌ Not sent: {self.__unsuccessful_newsletters}'
+            f'{status_to_title[self.__status]}\n'
+            f'Total sent: {stats.processed_count}\n\n'
+            f'✅ Successful: {stats.sent_count}\n'
+            f'❌ Not sent: {stats.failed_count}\n'
+            f'🚫 Blocked the bot: {stats.blocked_count}\n'
+            f'👻 Deactivated: {stats.deactivated_count}\n'
+            f'⚠️ Network errors: {stats.transient_failed_count}\n'
+            f'❓ Other errors: {stats.other_failed_count}\n\n'
+            f'⏱ Took {stats.elapsed_time:.0f} s'
+            f' ({stats.sent_per_second:.1f} messages/s)'
+        )
+
+    def get_reply_markup(self) -> InlineKeyboardMarkup | None:
+        if self.__status == MailingJobStatus.RUNNING:
+            toggle_button = InlineKeyboardButton(
+                text='⏸ Pause',
+                callback_data=MailingJobControlCallbackData().new(
+                    mailing_job_id=self.__mailing_job_id,
+                    action='pause',
+                ),
+            )
+        elif self.__status == MailingJobStatus.PAUSED:
+            toggle_button = InlineKeyboardButton(
+                text='▶️ Resume',
+                callback_data=MailingJobControlCallbackData().new(
+                    mailing_job_id=self.__mailing_job_id,
+                    action='resume',
+                ),
+            )
+        else:
+            return None
+        cancel_button = InlineKeyboardButton(
+            text='🚫 Cancel',
+            callback_data=MailingJobControlCallbackData().new(
+                mailing_job_id=self.__mailing_job_id,
+                action='cancel',
+            ),
+        )
+        return InlineKeyboardMarkup(
+            inline_keyboard=[[toggle_button, cancel_button]],
         )
@@ -1,2 +1,9 @@
 class BalanceAmountValidatorError(Exception):
     pass
+
+
+class CoinbaseAPIError(Exception):
+
+    def __init__(self, *args, status_code: int):
+        super().__init__(*args)
+        self.status_code = status_code
@@ -45,7 +45,7 @@ async def on_show_coinbase_management_menu(
         state: FSMContext,
 ) -> None:
     await state.finish()
-    is_valid = coinbase_api.check()
+    is_valid = await coinbase_api.check()
     view = CoinbaseManagementMenuView(is_valid)
     if isinstance(message_or_callback_query, Message):
         await answer_view(message=message_or_callback_query, view=view)
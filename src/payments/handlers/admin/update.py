@@ -19,12 +19,11 @@ async def on_ask_new_coinbase_api_key(callback_query: CallbackQuery) -> None:
 async def on_new_coinbase_api_key_input(
         message: Message,
         state: FSMContext,
-
+        coinbase_api: CoinbaseAPI,
 ) -> None:
     await state.finish()
     new_api_key = message.text
-    coinbase_api = CoinbaseAPI(new_api_key)
-    is_valid = coinbase_api.check()
+    is_valid = await coinbase_api.with_api_key(new_api_key).check()
     if not is_valid:
         await message.answer('❌ Invalid api key')
         return
@@ -5,7 +5,8 @@ from aiogram.types import Message
 
 from common.views import answer_view
 from payments.views import UserBalanceMenuView
-from users.repositories import UserRepository
+from users.exceptions import UserNotInDatabase
+from users.models import User
 
 __all__ = ('register_handlers',)
 
@@ -13,10 +14,11 @@ __all__ = ('register_handlers',)
 async def on_show_user_balance_menu(
         message: Message,
         state: FSMContext,
-        user_repository: UserRepository,
+        user: User | None,
 ) -> None:
     await state.finish()
-    user = user_repository.get_by_telegram_id(message.from_user.id)
+    if user is None:
+        raise UserNotInDatabase
     view = UserBalanceMenuView(balance=user.balance)
     await answer_view(message=message, view=view)
 
@@ -7,20 +7,18 @@ from aiogram.dispatcher.filters import Text
 from aiogram.types import CallbackQuery, Message, ChatType
 from structlog.stdlib import BoundLogger
 
-from common.services import AdminsNotificator
 from common.views import answer_view, edit_message_by_view
+from payments.models import PaymentMethod
+from payments.repositories import PendingChargeRepository
 from payments.services import parse_balance_amount
 from payments.states import UserBalanceTopUpStates
 from payments.views import (
     UserBalanceTopUpPaymentMethodsView,
     UserBalanceTopUpInvoiceView,
-    UserBalanceTopUpNotificationView,
 )
 from payments.services.payments_apis import CoinbaseAPI
-from top_up_bonuses.exceptions import TopUpBonusDoesNotExistError
-from top_up_bonuses.repositories import TopUpBonusRepository
-from top_up_bonuses.services import calculate_amount_to_top_up_with_bonus
-from users.repositories import UserRepository
+from users.exceptions import UserNotInDatabase
+from users.models import User
 
 __all__ = ('register_handlers',)
 
@@ -48,66 +46,29 @@ async def on_balance_amount_to_top_up_input(
 async def top_up_balance_with_coinbase(
         callback_query: CallbackQuery,
         state: FSMContext,
-        user_repository: UserRepository,
-        top_up_bonus_repository: TopUpBonusRepository,
+        user: User | None,
+        pending_charge_repository: PendingChargeRepository,
         coinbase_api: CoinbaseAPI,
-        admins_notificator: AdminsNotificator,
 ) -> None:
     state_data = await state.get_data()
+    await state.finish()
     amount: Decimal = state_data['amount']
 
-    user = user_repository.get_by_telegram_id(callback_query.from_user.id)
+    if user is None:
+        raise UserNotInDatabase
     charge = await coinbase_api.create_charge('Balance', amount)
+    await pending_charge_repository.create(
+        user_id=user.id,
+        payment_method=PaymentMethod.COINBASE,
+        charge_id=charge['id'],
+        amount=amount,
+    )
     view = UserBalanceTopUpInvoiceView(
         amount_to_top_up=amount,
         hosted_url=charge['hosted_url'],
     )
     await edit_message_by_view(message=callback_query.message, view=view)
 
-    if not await coinbase_api.check_payment(charge):
-        try:
-            amount = Decimal(
-                charge['timeline'][-1]['payment']['value']['amount'])
-        except KeyError:
-            amount = Decimal('0')
-
-        if amount <= 0:
-            await callback_query.message.answer('🚫 Balance refill failed')
-            return
-
-    try:
-        top_up_bonus = top_up_bonus_repository.get_by_top_up_amount(amount)
-    except TopUpBonusDoesNotExistError:
-        top_up_bonus_percentage = 0
-    else:
-        top_up_bonus_percentage = top_up_bonus.bonus_percentage
-        logger.debug(
-            'Top up bonus has been applied to balance top up',
-            top_up_bonus_percentage=top_up_bonus_percentage,
-        )
-
-    amount_to_top_up_with_bonus = calculate_amount_to_top_up_with_bonus(
-        amount_to_top_up=amount,
-        bonus_percentage=top_up_bonus_percentage
-    )
-    user_repository.top_up_balance(
-        user_id=user.id,
-        amount_to_top_up=amount_to_top_up_with_bonus,
-    )
-    await callback_query.message.delete()
-    await callback_query.message.answer(
-        f'✅ Balance was topped up by {amount:.2f}'
-    )
-    view = UserBalanceTopUpNotificationView(
-        amount=amount,
-        username=user.username,
-        user_telegram_id=user.telegram_id,
-    )
-    await admins_notificator.notify(
-        text=view.get_text(),
-        reply_markup=view.get_reply_markup(),
-    )
-
 
 def register_handlers(dispatcher: Dispatcher) -> None:
     dispatcher.register_callback_query_handler(
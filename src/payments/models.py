@@ -1,3 +1,45 @@
-from database.schemas import PaymentMethod
+import enum
+from dataclasses import dataclass
+from decimal import Decimal
 
-__all__ = ('PaymentMethod',)
+from database.schemas import PaymentMethod, PendingChargeStatus
+
+__all__ = (
+    'PaymentMethod',
+    'PendingChargeStatus',
+    'PendingCharge',
+    'ChargeStatus',
+    'ChargeCheckResult',
+)
+
+
+@dataclass(frozen=True, slots=True)
+class PendingCharge:
+    id: int
+    user_id: int
+    user_telegram_id: int
+    username: str | None
+    payment_method: PaymentMethod
+    charge_id: str
+    amount: Decimal
+    status: PendingChargeStatus
+
+
+class ChargeStatus(enum.Enum):
+    PENDING = enum.auto()
+    PAID = enum.auto()
+    PARTIALLY_PAID = enum.auto()
+    FAILED = enum.auto()
+
+
+@dataclass(frozen=True, slots=True)
+class ChargeCheckResult:
+    """Status of charge in payment gateway.
+
+    Attributes:
+        status: Charge status.
+        paid_amount: Amount actually paid if charge is partially paid.
+    """
+
+    status: ChargeStatus
+    paid_amount: Decimal | None = None
@@ -0,0 +1,153 @@
+from decimal import Decimal
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import sessionmaker
+
+from common.repositories import (
+    BaseRepository,
+    RepositoryThreadPool,
+    run_in_thread_pool,
+)
+from database.schemas import (
+    PendingCharge,
+    PendingChargeStatus,
+    PaymentMethod,
+    User,
+)
+from payments import models as payments_models
+from users.cache import UserCache
+
+__all__ = ('PendingChargeRepository',)
+
+
+class PendingChargeRepository(BaseRepository):
+
+    def __init__(
+            self,
+            session_factory: sessionmaker,
+            thread_pool: RepositoryThreadPool | None = None,
+            user_cache: UserCache | None = None,
+    ):
+        super().__init__(session_factory, thread_pool)
+        self.__user_cache = user_cache
+
+    @run_in_thread_pool
+    def create(
+            self,
+            *,
+            user_id: int,
+            payment_method: PaymentMethod,
+            charge_id: str,
+            amount: Decimal,
+    ) -> None:
+        pending_charge = PendingCharge(
+            user_id=user_id,
+            payment_method=payment_method,
+            charge_id=charge_id,
+            amount=amount,
+        )
+        with self._session_factory() as session:
+            with session.begin():
+                session.add(pending_charge)
+
+    @run_in_thread_pool
+    def get_pending(
+            self,
+            *,
+            payment_method: PaymentMethod,
+            after_id: int = 0,
+            limit: int = 100,
+    ) -> list[payments_models.PendingCharge]:
+        """Retrieve batch of pending charges ordered by ID.
+
+        Args:
+            payment_method: Payment method of charges.
+            after_id: Only charges with greater ID are retrieved.
+            limit: Max number of charges to retrieve.
+
+        Returns:
+            List of pending charges.
+        """
+        statement = (
+            select(PendingCharge, User.telegram_id, User.username)
+            .join(User, PendingCharge.user_id == User.id)
+            .where(
+                PendingCharge.status == PendingChargeStatus.PENDING,
+                PendingCharge.payment_method == payment_method,
+                PendingCharge.id > after_id,
+            )
+            .order_by(PendingCharge.id)
+            .limit(limit)
+        )
+        with self._session_factory() as session:
+            rows = session.execute(statement).all()
+        return [
+            payments_models.PendingCharge(
+                id=pending_charge.id,
+                user_id=pending_charge.user_id,
+                user_telegram_id=user_telegram_id,
+                username=username,
+                payment_method=pending_charge.payment_method,
+                charge_id=pending_charge.charge_id,
+                amount=pending_charge.amount,
+                status=pending_charge.status,
+            ) for pending_charge, user_telegram_id, username in rows
+        ]
+
+    @run_in_thread_pool
+    def credit(
+            self,
+            *,
+            pending_charge_id: int,
+            amount_to_top_up: Decimal,
+    ) -> bool:
+        """Top up user's balance and mark charge as credited atomically.
+
+        Args:
+            pending_charge_id: ID of the pending charge.
+            amount_to_top_up: Amount to add to user's balance.
+
+        Returns:
+            True if balance has been topped up, False if charge
+            has been credited or failed already.
+        """
+        mark_credited_statement = (
+            update(PendingCharge)
+            .where(
+                PendingCharge.id == pending_charge_id,
+                PendingCharge.status == PendingChargeStatus.PENDING,
+            )
+            .values(
+                status=PendingChargeStatus.CREDITED,
+                credited_amount=amount_to_top_up,
+            )
+            .returning(PendingCharge.user_id)
+        )
+        with self._session_factory() as session:
+            with session.begin():
+                user_id = session.scalar(mark_credited_statement)
+                if user_id is None:
+                    return False
+                session.execute(
+                    update(User)
+                    .where(User.id == user_id)
+                    .values(balance=User.balance + amount_to_top_up)
+                )
+        if self.__user_cache is not None:
+            self.__user_cache.invalidate_by_id(user_id)
+        return True
+
+    @run_in_thread_pool
+    def mark_failed(self, pending_charge_id: int) -> bool:
+        statement = (
+            update(PendingCharge)
+            .where(
+                PendingCharge.id == pending_charge_id,
+                PendingCharge.status == PendingChargeStatus.PENDING,
+            )
+            .values(status=PendingChargeStatus.FAILED)
+        )
+        with self._session_factory() as session:
+            with session.begin():
+                result = session.execute(statement)
+        return bool(result.rowcount)
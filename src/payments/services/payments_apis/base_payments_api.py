@@ -3,5 +3,5 @@ import abc
 
 class BasePaymentAPI(abc.ABC):
     @abc.abstractmethod
-    def check(self) -> bool:
+    async def check(self) -> bool:
         pass
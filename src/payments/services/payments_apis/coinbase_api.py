@@ -1,50 +1,184 @@
 import asyncio
-import contextlib
-from decimal import Decimal
+from collections.abc import Iterable, Mapping
+from decimal import Decimal, InvalidOperation
 
-import coinbase_commerce
-from coinbase_commerce import error
-from coinbase_commerce.api_resources import charge
+import httpx
+import structlog
+from structlog.stdlib import BoundLogger
 
+from payments.exceptions import CoinbaseAPIError
+from payments.models import ChargeCheckResult, ChargeStatus
 from payments.services.payments_apis import BasePaymentAPI
+from payments.services.payments_apis.http_client import (
+    create_http_client,
+    send_request_with_retries,
+)
+
+__all__ = ('CoinbaseAPI', 'parse_charge_check_result')
+
+logger: BoundLogger = structlog.get_logger('app')
+
+
+def parse_charge_check_result(charge: Mapping) -> ChargeCheckResult:
+    """Get charge status from the latest event of Coinbase charge timeline.
+
+    Overpaid charges are considered paid. Expired, canceled or unresolved
+    charges with some payment are considered partially paid.
+
+    Args:
+        charge: Coinbase charge resource.
+
+    Returns:
+        Charge check result.
+    """
+    last_event = charge['timeline'][-1]
+    status = last_event['status']
+    if status == 'COMPLETED':
+        return ChargeCheckResult(status=ChargeStatus.PAID)
+    if status not in ('EXPIRED', 'CANCELED', 'UNRESOLVED'):
+        return ChargeCheckResult(status=ChargeStatus.PENDING)
+    if last_event.get('context') == 'OVERPAID':
+        return ChargeCheckResult(status=ChargeStatus.PAID)
+    try:
+        paid_amount = Decimal(last_event['payment']['value']['amount'])
+    except (KeyError, TypeError, InvalidOperation):
+        paid_amount = Decimal('0')
+    if paid_amount <= 0:
+        return ChargeCheckResult(status=ChargeStatus.FAILED)
+    return ChargeCheckResult(
+        status=ChargeStatus.PARTIALLY_PAID,
+        paid_amount=paid_amount,
+    )
 
 
 class CoinbaseAPI(BasePaymentAPI):
-    def __init__(self, api_key: str):
-        self.__client = coinbase_commerce.client.Client(api_key=api_key)
+    """Async Coinbase Commerce API client.
+
+    Requests are sent with HTTP client that may be shared with other
+    payment APIs, so connections are pooled and kept alive.
+    """
+    api_url = 'https://api.commerce.coinbase.com'
+    api_version = '2018-03-22'
+
+    def __init__(
+            self,
+            api_key: str,
+            *,
+            http_client: httpx.AsyncClient | None = None,
+            api_url: str | None = None,
+            max_retries: int = 3,
+    ):
+        self.__api_key = api_key
+        self.__http_client = http_client or create_http_client()
+        self.__api_url = api_url or self.api_url
+        self.__max_retries = max_retries
+
+    def with_api_key(self, api_key: str) -> 'CoinbaseAPI':
+        """Create client with another API key sharing the HTTP client."""
+        return CoinbaseAPI(
+            api_key,
+            http_client=self.__http_client,
+            api_url=self.__api_url,
+            max_retries=self.__max_retries,
+        )
+
+    async def __send_api_request(
+            self,
+            method: str,
+            path: str,
+            *,
+            is_idempotent: bool,
+            json: dict | None = None,
+            params: dict | None = None,
+    ) -> httpx.Response:
+        return await send_request_with_retries(
+            self.__http_client,
+            method,
+            f'{self.__api_url}{path}',
+            is_idempotent=is_idempotent,
+            max_retries=self.__max_retries,
+            json=json,
+            params=params,
+            headers={
+                'X-CC-Api-Key': self.__api_key,
+                'X-CC-Version': self.api_version,
+            },
+        )
+
+    @staticmethod
+    def __get_data(response: httpx.Response) -> dict:
+        if response.is_error:
+            raise CoinbaseAPIError(status_code=response.status_code)
+        return response.json()['data']
 
     async def create_charge(
             self,
             name: str,
             price: Decimal | str,
             description: str = None,
-    ) -> charge.Charge:
-        return await asyncio.to_thread(
-            self.__client.charge.create,
-            name=name,
-            description=description,
-            local_price={
-                'amount': str(price),
-                'currency': str('USD'),
+    ) -> dict:
+        response = await self.__send_api_request(
+            'POST',
+            '/charges',
+            is_idempotent=False,
+            json={
+                'name': name,
+                'description': description,
+                'local_price': {
+                    'amount': str(price),
+                    'currency': 'USD',
+                },
+                'pricing_type': 'fixed_price',
             },
-            pricing_type='fixed_price',
         )
+        return self.__get_data(response)
 
-    @staticmethod
-    async def check_payment(payment: charge.Charge) -> bool:
-        while not (status := payment['timeline'][-1]['status']) == 'COMPLETED':
-            payment.refresh()
-            if status in ('EXPIRED', 'CANCELED', 'UNRESOLVED'):
-                if payment['timeline'][-1]['context'] == 'OVERPAID':
-                    return True
-                return False
-            await asyncio.sleep(30)
-        return True
-
-    def check(self) -> bool:
-        with contextlib.suppress(error.ResourceNotFoundError):
-            try:
-                self.__client.get()
-            except error.AuthenticationError:
-                return False
-        return True
+    async def get_charge(self, charge_id: str) -> dict:
+        response = await self.__send_api_request(
+            'GET',
+            f'/charges/{charge_id}',
+            is_idempotent=True,
+        )
+        return self.__get_data(response)
+
+    async def check_charge(self, charge_id: str) -> ChargeCheckResult:
+        charge = await self.get_charge(charge_id)
+        return parse_charge_check_result(charge)
+
+    async def check_charges(
+            self,
+            charge_ids: Iterable[str],
+    ) -> dict[str, ChargeCheckResult]:
+        """Check charges concurrently.
+
+        Charges that could not be checked are not in the result.
+        """
+        charge_ids = list(charge_ids)
+        results = await asyncio.gather(
+            *(self.check_charge(charge_id) for charge_id in charge_ids),
+            return_exceptions=True,
+        )
+        charge_check_results: dict[str, ChargeCheckResult] = {}
+        for charge_id, result in zip(charge_ids, results):
+            if isinstance(result, Exception):
+                logger.warning(
+                    'Could not check Coinbase charge',
+                    charge_id=charge_id,
+                    error=repr(result),
+                )
+            else:
+                charge_check_results[charge_id] = result
+        return charge_check_results
+
+    async def check(self) -> bool:
+        try:
+            response = await self.__send_api_request(
+                'GET',
+                '/charges',
+                is_idempotent=True,
+                params={'limit': 1},
+            )
+        except httpx.TransportError:
+            logger.warning('Could not check Coinbase API key')
+            return False
+        return response.status_code not in (401, 403)
@@ -1,30 +1,98 @@
-import asyncio
 import hashlib
 import hmac
-import time
 from collections import OrderedDict
+from collections.abc import Iterable, Mapping
 from urllib.parse import urlencode
 
 import httpx
+import structlog
+from structlog.stdlib import BoundLogger
 
+from payments.models import ChargeCheckResult, ChargeStatus
 from payments.services.payments_apis import BasePaymentAPI
+from payments.services.payments_apis.http_client import (
+    create_http_client,
+    send_request_with_retries,
+)
+
+__all__ = ('CoinPaymentsAPI', 'parse_tx_info_check_result')
+
+logger: BoundLogger = structlog.get_logger('app')
+
+# Commands that only read data, so they can be safely retried
+READ_ONLY_COMMANDS = frozenset((
+    'get_basic_info',
+    'rates',
+    'balances',
+    'get_tx_info',
+    'get_tx_info_multi',
+    'get_tx_ids',
+    'get_withdrawal_history',
+    'get_withdrawal_info',
+    'get_conversion_info',
+))
+
+
+def parse_tx_info_check_result(tx_info: Mapping) -> ChargeCheckResult:
+    """Get charge status from CoinPayments transaction info.
+
+    Status 100 and greater means payment is complete, 2 means payment
+    is queued for nightly payout, negative status means failure.
+    """
+    status = int(tx_info['status'])
+    if status >= 100 or status == 2:
+        return ChargeCheckResult(status=ChargeStatus.PAID)
+    if status < 0:
+        return ChargeCheckResult(status=ChargeStatus.FAILED)
+    return ChargeCheckResult(status=ChargeStatus.PENDING)
 
 
 class CoinPaymentsAPI(BasePaymentAPI):
     api_url = 'https://www.coinpayments.net/api.php'
     api_version = 1
-
-    def __init__(self, public_key: str, secret_key: str):
+    # Max number of transaction IDs in a single `get_tx_info_multi` call
+    tx_info_multi_max_size = 25
+
+    def __init__(
+            self,
+            public_key: str,
+            secret_key: str,
+            *,
+            http_client: httpx.AsyncClient | None = None,
+    ):
         self.public_key = public_key
         self.secret_key = secret_key
-
-    # TODO Unsafe code. Transaction checking can fail if bot will be restarted
-    async def check_transaction(self, txn_id: str) -> bool:
-        while not (await self.get_tx_info(txid=txn_id))['result']['status']:
-            await asyncio.sleep(30)
-            if (await self.get_tx_info(txid=txn_id))['result']['time_expires'] < time.time():
-                return False
-        return True
+        self.__http_client = http_client or create_http_client()
+
+    async def check_charges(
+            self,
+            charge_ids: Iterable[str],
+    ) -> dict[str, ChargeCheckResult]:
+        """Check transactions in batches with `get_tx_info_multi`.
+
+        Transactions that could not be checked are not in the result.
+        """
+        charge_ids = list(charge_ids)
+        results: dict[str, ChargeCheckResult] = {}
+        for i in range(0, len(charge_ids), self.tx_info_multi_max_size):
+            batch = charge_ids[i:i + self.tx_info_multi_max_size]
+            response = await self.get_tx_info_multi(txid='|'.join(batch))
+            if response['error'] != 'ok':
+                logger.error(
+                    'Could not get transactions info',
+                    error=response['error'],
+                )
+                continue
+            for txid, tx_info in response['result'].items():
+                if tx_info.get('error', 'ok') != 'ok':
+                    logger.warning(
+                        'Could not get transaction info',
+                        txid=txid,
+                        error=tx_info['error'],
+                    )
+                    continue
+                results[txid] = parse_tx_info_check_result(tx_info)
+        return results
 
     async def get_basic_info(self) -> dict:
         return await self.send_api_request('get_basic_info')
@@ -81,10 +149,15 @@ class CoinPaymentsAPI(BasePaymentAPI):
             'HMAC': signature,
             'Content-Type': 'application/x-www-form-urlencoded'
         }
-        async with httpx.AsyncClient() as session:
-            return (await session.post(self.api_url,
-                                       params=params,
-                                       headers=headers)).json()
+        response = await send_request_with_retries(
+            self.__http_client,
+            'POST',
+            self.api_url,
+            is_idempotent=command in READ_ONLY_COMMANDS,
+            params=params,
+            headers=headers,
+        )
+        return response.json()
 
     def _build_params(self, command: str, **kwargs) -> str:
         kwargs: dict
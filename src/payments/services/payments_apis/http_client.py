@@ -0,0 +1,95 @@
+import asyncio
+
+import httpx
+import structlog
+from structlog.stdlib import BoundLogger
+
+__all__ = ('create_http_client', 'send_request_with_retries')
+
+logger: BoundLogger = structlog.get_logger('app')
+
+RETRYABLE_STATUS_CODES = frozenset((429, 500, 502, 503, 504))
+# Errors raised before the request has been sent, so any request
+# (even not idempotent one) can be safely sent again.
+NOT_SENT_REQUEST_ERRORS = (
+    httpx.ConnectError,
+    httpx.ConnectTimeout,
+    httpx.PoolTimeout,
+)
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Create HTTP client with connection pool shared by payment APIs."""
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(10, connect=5),
+        limits=httpx.Limits(
+            max_connections=20,
+            max_keepalive_connections=10,
+            keepalive_expiry=60,
+        ),
+    )
+
+
+async def send_request_with_retries(
+        http_client: httpx.AsyncClient,
+        method: str,
+        url: str,
+        *,
+        is_idempotent: bool,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        **kwargs,
+) -> httpx.Response:
+    """Send HTTP request retrying it on network errors and server errors.
+
+    Not idempotent requests are retried only if they have not been sent.
+
+    Args:
+        http_client: HTTP client to send request with.
+        method: HTTP method.
+        url: Request URL.
+        is_idempotent: Whether request can be safely sent more than once.
+        max_retries: Max number of retries.
+        backoff_factor: Delay before the first retry in seconds,
+                        doubled on each next retry.
+        **kwargs: Arguments passed to `httpx.AsyncClient.request`.
+
+    Returns:
+        The last received response.
+
+    Raises:
+        httpx.TransportError: If request could not be sent
+                              after all the retries.
+    """
+    retryable_errors = httpx.TransportError if is_idempotent else (
+        NOT_SENT_REQUEST_ERRORS
+    )
+    for attempt in range(max_retries + 1):
+        is_last_attempt = attempt == max_retries
+        try:
+            response = await http_client.request(method, url, **kwargs)
+        except retryable_errors as error:
+            if is_last_attempt:
+                raise
+            logger.warning(
+                'HTTP request failed, retrying',
+                url=url,
+                attempt=attempt + 1,
+                error=repr(error),
+            )
+        else:
+            # Too Many Requests means request has been rejected unprocessed
+            is_retryable = (
+                response.status_code == 429
+                or is_idempotent
+                and response.status_code in RETRYABLE_STATUS_CODES
+            )
+            if is_last_attempt or not is_retryable:
+                return response
+            logger.warning(
+                'HTTP request got server error, retrying',
+                url=url,
+                attempt=attempt + 1,
+                status_code=response.status_code,
+            )
+        await asyncio.sleep(backoff_factor * 2 ** attempt)
@@ -38,5 +38,5 @@ class MinerlockAPI(BasePaymentAPI):
             await asyncio.sleep(30)
         return False
 
-    def check(self) -> bool:
+    async def check(self) -> bool:
         return False
@@ -0,0 +1,174 @@
+from collections.abc import Iterable, Mapping
+from decimal import Decimal
+from typing import Protocol
+
+import structlog
+from aiogram import Bot
+from aiogram.utils.exceptions import TelegramAPIError
+from structlog.contextvars import bound_contextvars
+from structlog.stdlib import BoundLogger
+
+from common.services import AdminsNotificator
+from payments.models import (
+    ChargeCheckResult,
+    ChargeStatus,
+    PaymentMethod,
+    PendingCharge,
+)
+from payments.repositories import PendingChargeRepository
+from payments.views import UserBalanceTopUpNotificationView
+from top_up_bonuses.exceptions import TopUpBonusDoesNotExistError
+from top_up_bonuses.repositories import TopUpBonusRepository
+from top_up_bonuses.services import calculate_amount_to_top_up_with_bonus
+
+__all__ = ('PendingChargesPoller',)
+
+logger: BoundLogger = structlog.get_logger('app')
+
+
+class HasCheckChargesMethod(Protocol):
+
+    async def check_charges(
+            self,
+            charge_ids: Iterable[str],
+    ) -> dict[str, ChargeCheckResult]: ...
+
+
+class PendingChargesPoller:
+    """Checks all pending charges in payment gateways and credits balances.
+
+    Pending charges are stored in the database, so polling is resumed
+    after restart. Crediting is idempotent: balance is topped up
+    in the same transaction the charge is marked as credited in.
+    """
+
+    def __init__(
+            self,
+            *,
+            bot: Bot,
+            payment_apis: Mapping[PaymentMethod, HasCheckChargesMethod],
+            pending_charge_repository: PendingChargeRepository,
+            top_up_bonus_repository: TopUpBonusRepository,
+            admins_notificator: AdminsNotificator,
+            batch_size: int = 100,
+    ):
+        self.__bot = bot
+        self.__payment_apis = payment_apis
+        self.__pending_charge_repository = pending_charge_repository
+        self.__top_up_bonus_repository = top_up_bonus_repository
+        self.__admins_notificator = admins_notificator
+        self.__batch_size = batch_size
+
+    async def poll(self) -> None:
+        for payment_method, payment_api in self.__payment_apis.items():
+            after_id = 0
+            while pending_charges := (
+                    await self.__pending_charge_repository.get_pending(
+                        payment_method=payment_method,
+                        after_id=after_id,
+                        limit=self.__batch_size,
+                    )
+            ):
+                await self.__check(
+                    payment_api=payment_api,
+                    pending_charges=pending_charges,
+                )
+                after_id = pending_charges[-1].id
+
+    async def __check(
+            self,
+            *,
+            payment_api: HasCheckChargesMethod,
+            pending_charges: list[PendingCharge],
+    ) -> None:
+        try:
+            results = await payment_api.check_charges(
+                pending_charge.charge_id for pending_charge in pending_charges
+            )
+        except Exception:
+            logger.exception('Could not check pending charges')
+            return
+
+        for pending_charge in pending_charges:
+            result = results.get(pending_charge.charge_id)
+            if result is None or result.status == ChargeStatus.PENDING:
+                continue
+            with bound_contextvars(
+                    pending_charge_id=pending_charge.id,
+                    payment_method=pending_charge.payment_method.name,
+            ):
+                if result.status == ChargeStatus.FAILED:
+                    await self.__fail(pending_charge)
+                elif result.status == ChargeStatus.PARTIALLY_PAID:
+                    await self.__credit(
+                        pending_charge=pending_charge,
+                        amount=result.paid_amount,
+                    )
+                else:
+                    await self.__credit(
+                        pending_charge=pending_charge,
+                        amount=pending_charge.amount,
+                    )
+
+    async def __fail(self, pending_charge: PendingCharge) -> None:
+        is_failed = await self.__pending_charge_repository.mark_failed(
+            pending_charge.id,
+        )
+        if not is_failed:
+            return
+        logger.info('Pending charge failed')
+        await self.__send_to_user(
+            chat_id=pending_charge.user_telegram_id,
+            text='🚫 Balance refill failed',
+        )
+
+    async def __credit(
+            self,
+            *,
+            pending_charge: PendingCharge,
+            amount: Decimal,
+    ) -> None:
+        try:
+            top_up_bonus = (
+                self.__top_up_bonus_repository.get_by_top_up_amount(amount)
+            )
+        except TopUpBonusDoesNotExistError:
+            top_up_bonus_percentage = 0
+        else:
+            top_up_bonus_percentage = top_up_bonus.bonus_percentage
+            logger.debug(
+                'Top up bonus has been applied to balance top up',
+                top_up_bonus_percentage=top_up_bonus_percentage,
+            )
+
+        amount_to_top_up_with_bonus = calculate_amount_to_top_up_with_bonus(
+            amount_to_top_up=amount,
+            bonus_percentage=top_up_bonus_percentage
+        )
+        is_credited = await self.__pending_charge_repository.credit(
+            pending_charge_id=pending_charge.id,
+            amount_to_top_up=amount_to_top_up_with_bonus,
+        )
+        if not is_credited:
+            return
+        logger.info('Pending charge credited', amount=amount)
+
+        await self.__send_to_user(
+            chat_id=pending_charge.user_telegram_id,
+            text=f'✅ Balance was topped up by {amount:.2f}',
+        )
+        view = UserBalanceTopUpNotificationView(
+            amount=amount,
+            username=pending_charge.username,
+            user_telegram_id=pending_charge.user_telegram_id,
+        )
+        self.__admins_notificator.notify_in_background(
+            text=view.get_text(),
+            reply_markup=view.get_reply_markup(),
+        )
+
+    async def __send_to_user(self, *, chat_id: int, text: str) -> None:
+        try:
+            await self.__bot.send_message(chat_id=chat_id, text=text)
+        except TelegramAPIError:
+            logger.warning('Could not notify user', chat_id=chat_id)
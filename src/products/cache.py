@@ -0,0 +1,141 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+
+import structlog
+from structlog.stdlib import BoundLogger
+
+from common.models import CacheStats
+from products.models import Product
+
+__all__ = ('ProductCache',)
+
+logger: BoundLogger = structlog.get_logger('app')
+
+
+class ProductCache:
+    """Thread-safe LRU cache of products and of product IDs by category.
+
+    Every invalidation bumps the cache version. Values read from
+    the database are put only if the version has not changed since
+    the read started, so stale rows never overwrite an invalidation.
+    """
+
+    def __init__(self, *, max_size: int):
+        self.__max_size = max_size
+        self.__lock = threading.Lock()
+        self.__version = 0
+        self.__products: OrderedDict[int, Product] = OrderedDict()
+        self.__category_product_ids: OrderedDict[int, tuple[int, ...]] = (
+            OrderedDict()
+        )
+        self.__hits_count = 0
+        self.__misses_count = 0
+        self.__evictions_count = 0
+
+    @property
+    def version(self) -> int:
+        return self.__version
+
+    def __evict(self, entries: OrderedDict) -> None:
+        while len(entries) > self.__max_size:
+            entries.popitem(last=False)
+            self.__evictions_count += 1
+
+    def __put_product(self, product: Product) -> None:
+        self.__products[product.id] = product
+        self.__products.move_to_end(product.id)
+        self.__evict(self.__products)
+
+    def get_product(self, product_id: int) -> Product | None:
+        with self.__lock:
+            product = self.__products.get(product_id)
+            if product is None:
+                self.__misses_count += 1
+                return None
+            self.__products.move_to_end(product_id)
+            self.__hits_count += 1
+            return product
+
+    def get_category_products(self, category_id: int) -> list[Product] | None:
+        """Get products of category if all of them are cached."""
+        with self.__lock:
+            product_ids = self.__category_product_ids.get(category_id)
+            if product_ids is None or not all(
+                    product_id in self.__products for product_id in product_ids
+            ):
+                self.__misses_count += 1
+                return None
+            self.__category_product_ids.move_to_end(category_id)
+            for product_id in product_ids:
+                self.__products.move_to_end(product_id)
+            self.__hits_count += 1
+            return [self.__products[product_id] for product_id in product_ids]
+
+    def put_product(self, product: Product, *, version: int) -> None:
+        with self.__lock:
+            if version == self.__version:
+                self.__put_product(product)
+
+    def put_category_products(
+            self,
+            *,
+            category_id: int,
+            products: Iterable[Product],
+            version: int,
+    ) -> None:
+        with self.__lock:
+            if version != self.__version:
+                return
+            products = list(products)
+            for product in products:
+                self.__put_product(product)
+            self.__category_product_ids[category_id] = tuple(
+                product.id for product in products
+            )
+            self.__category_product_ids.move_to_end(category_id)
+            self.__evict(self.__category_product_ids)
+
+    def invalidate_product(self, product_id: int) -> None:
+        with self.__lock:
+            self.__version += 1
+            self.__products.pop(product_id, None)
+
+    def invalidate_category(self, category_id: int) -> None:
+        with self.__lock:
+            self.__version += 1
+            self.__category_product_ids.pop(category_id, None)
+
+    def invalidate_deleted_product(self, product_id: int) -> None:
+        """Drop product and every category list that contains it."""
+        with self.__lock:
+            self.__version += 1
+            self.__products.pop(product_id, None)
+            category_ids = [
+                category_id
+                for category_id, product_ids
+                in self.__category_product_ids.items()
+                if product_id in product_ids
+            ]
+            for category_id in category_ids:
+                del self.__category_product_ids[category_id]
+
+    def get_stats(self) -> CacheStats:
+        with self.__lock:
+            return CacheStats(
+                hits_count=self.__hits_count,
+                misses_count=self.__misses_count,
+                evictions_count=self.__evictions_count,
+                size=len(self.__products),
+            )
+
+    def log_stats(self) -> None:
+        stats = self.get_stats()
+        logger.info(
+            'Product cache stats',
+            hits_count=stats.hits_count,
+            misses_count=stats.misses_count,
+            evictions_count=stats.evictions_count,
+            hit_ratio=stats.hit_ratio,
+            size=stats.size,
+        )
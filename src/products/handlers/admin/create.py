@@ -342,7 +342,7 @@ async def on_product_create_finish(
     price: Decimal = state_data['price']
     category_id: int = state_data['category_id']
 
-    product = product_repository.create(
+    product = await product_repository.create(
         name=name,
         description=description,
         media=parse_media_types(media),
@@ -360,6 +360,7 @@ async def on_product_create_finish(
         base_path=config.MEDIA_FILES_PATH,
         product=product,
         view=view,
+        product_repository=product_repository,
     )
 
 
@@ -390,7 +391,7 @@ async def on_product_advanced_settings_create_finish(
         set()
     )
 
-    product = product_repository.create(
+    product = await product_repository.create(
         name=name,
         description=description,
         media=parse_media_types(media),
@@ -416,6 +417,7 @@ async def on_product_advanced_settings_create_finish(
         base_path=config.MEDIA_FILES_PATH,
         product=product,
         view=view,
+        product_repository=product_repository,
     )
 
 
@@ -52,7 +52,7 @@ async def on_product_delete_confirm(
     state_data = await state.get_data()
     await state.finish()
     product_id: int = state_data['product_id']
-    product_repository.delete_by_id(product_id)
+    await product_repository.delete_by_id(product_id)
     await callback_query.answer('❗️ Product has been deleted', show_alert=True)
     await callback_query.message.delete()
 
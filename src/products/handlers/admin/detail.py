@@ -18,13 +18,14 @@ async def on_show_product_detail(
 ) -> None:
     await state.finish()
     product_id: int = callback_data['product_id']
-    product = product_repository.get_by_id(product_id)
+    product = await product_repository.get_by_id(product_id)
     view = AdminProductDetailView(product)
     await answer_view_with_media(
         message=callback_query.message,
         base_path=config.MEDIA_FILES_PATH,
         product=product,
         view=view,
+        product_repository=product_repository,
     )
 
 
@@ -14,7 +14,7 @@ async def on_show_top_level_categories_list(
         message: Message,
         category_repository: CategoryRepository,
 ) -> None:
-    categories = category_repository.get_categories()
+    categories = await category_repository.get_categories()
     view = AdminProductListView(categories=categories)
     await answer_view(message=message, view=view)
 
@@ -26,8 +26,8 @@ async def on_show_category_products_list(
         product_repository: ProductRepository,
 ) -> None:
     parent_id: int = callback_data['parent_id']
-    subcategories = category_repository.get_subcategories(parent_id)
-    products = product_repository.get_by_category_id(parent_id)
+    subcategories = await category_repository.get_subcategories(parent_id)
+    products = await product_repository.get_by_category_id(parent_id)
     view = AdminProductListView(
         parent_id=parent_id,
         products=products,
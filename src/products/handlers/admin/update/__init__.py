@@ -14,6 +14,7 @@ from . import (
     permitted_gateways,
     media,
     quantity,
+    units,
 )
 
 __all__ = ('register_handlers',)
@@ -33,3 +34,4 @@ def register_handlers(dispatcher: Dispatcher) -> None:
     permitted_gateways.register_handlers(dispatcher)
     media.register_handlers(dispatcher)
     quantity.register_handlers(dispatcher)
+    units.register_handlers(dispatcher)
@@ -15,13 +15,13 @@ async def on_can_be_purchased_status_toggle(
         product_repository: ProductRepository,
 ) -> None:
     product_id: int = callback_data['product_id']
-    product = product_repository.get_by_id(product_id)
+    product = await product_repository.get_by_id(product_id)
     can_be_purchased = not product.can_be_purchased
-    product_repository.update_can_be_purchased_status(
+    await product_repository.update_can_be_purchased_status(
         product_id=product_id,
         can_be_purchased=can_be_purchased,
     )
-    product = product_repository.get_by_id(product_id)
+    product = await product_repository.get_by_id(product_id)
     view = AdminProductDetailView(product)
     text = (
         f'❗️ Product purchases have been allowed'
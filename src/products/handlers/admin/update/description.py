@@ -31,9 +31,9 @@ async def on_product_description_input(
     state_data = await state.get_data()
     product_id: int = state_data['product_id']
     description = message.text
-    product_repository.update_description(product_id=product_id,
+    await product_repository.update_description(product_id=product_id,
                                           description=description)
-    product = product_repository.get_by_id(product_id)
+    product = await product_repository.get_by_id(product_id)
     view = AdminProductDetailView(product)
     await message.answer('✅ Product description has been updated')
     await answer_view(message=message, view=view)
@@ -15,15 +15,15 @@ async def on_duplicated_stock_entries_status_toggle(
         product_repository: ProductRepository,
 ) -> None:
     product_id: int = callback_data['product_id']
-    product = product_repository.get_by_id(product_id)
+    product = await product_repository.get_by_id(product_id)
     is_duplicated_stock_entries_allowed = (
         not product.is_duplicated_stock_entries_allowed
     )
-    product_repository.update_duplicated_stock_entries_status(
+    await product_repository.update_duplicated_stock_entries_status(
         product_id=product_id,
         is_duplicated_stock_entries_allowed=is_duplicated_stock_entries_allowed,
     )
-    product = product_repository.get_by_id(product_id)
+    product = await product_repository.get_by_id(product_id)
     view = AdminProductDetailView(product)
     text = (
         f'❗️ Product duplicated entries have been allowed'
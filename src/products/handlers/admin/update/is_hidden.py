@@ -15,13 +15,13 @@ async def on_hidden_status_toggle(
         product_repository: ProductRepository,
 ) -> None:
     product_id: int = callback_data['product_id']
-    product = product_repository.get_by_id(product_id)
+    product = await product_repository.get_by_id(product_id)
     is_hidden = not product.is_hidden
-    product_repository.update_hidden_status(
+    await product_repository.update_hidden_status(
         product_id=product_id,
         is_hidden=is_hidden,
     )
-    product = product_repository.get_by_id(product_id)
+    product = await product_repository.get_by_id(product_id)
     view = AdminProductDetailView(product)
     text = (
         f'❗️ Product has been hidden'
@@ -37,11 +37,11 @@ async def on_max_displayed_stock_count_input(
 
     state_data = await state.get_data()
     product_id: int = state_data['product_id']
-    product_repository.update_max_displayed_stock_count(
+    await product_repository.update_max_displayed_stock_count(
         product_id=product_id,
         max_displayed_stock_count=max_displayed_stock_count
     )
-    product = product_repository.get_by_id(product_id)
+    product = await product_repository.get_by_id(product_id)
     view = AdminProductDetailView(product)
     await message.answer('✅ Maximum displayed stock count has been updated')
     await answer_view(message=message, view=view)
@@ -36,11 +36,11 @@ async def on_max_order_quantity_input(
 
     state_data = await state.get_data()
     product_id: int = state_data['product_id']
-    product_repository.update_max_order_quantity(
+    await product_repository.update_max_order_quantity(
         product_id=product_id,
         max_order_quantity=max_order_quantity,
     )
-    product = product_repository.get_by_id(product_id)
+    product = await product_repository.get_by_id(product_id)
     view = AdminProductDetailView(product)
     await message.answer('✅ Maximum order quantity has been updated')
     await answer_view(message=message, view=view)
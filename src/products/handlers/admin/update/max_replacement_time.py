@@ -38,11 +38,11 @@ async def on_max_replacement_time_input(
 
     state_data = await state.get_data()
     product_id: int = state_data['product_id']
-    product_repository.update_max_replacement_time(
+    await product_repository.update_max_replacement_time(
         product_id=product_id,
         max_replacement_time=max_replacement_time,
     )
-    product = product_repository.get_by_id(product_id)
+    product = await product_repository.get_by_id(product_id)
     view = AdminProductDetailView(product)
     await message.answer('✅ Maximum replacement time has been updated')
     await answer_view(message=message, view=view)
@@ -68,7 +68,7 @@ async def on_media_upload_finish(
     await state.finish()
     product_id: int = state_data['product_id']
     media: set[str] = state_data.get('media', set())
-    product_repository.update_media(
+    await product_repository.update_media(
         product_id=product_id,
         media=parse_media_types(media),
     )
@@ -77,7 +77,7 @@ async def on_media_upload_finish(
         file_names=media,
         destination_path=config.MEDIA_FILES_PATH,
     )
-    product = product_repository.get_by_id(product_id)
+    product = await product_repository.get_by_id(product_id)
     view = AdminProductDetailView(product)
     await answer_view(message=callback_query.message, view=view)
 
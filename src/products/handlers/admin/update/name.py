@@ -30,8 +30,8 @@ async def on_product_name_input(
     state_data = await state.get_data()
     product_id: int = state_data['product_id']
     name = message.text
-    product_repository.update_name(product_id=product_id, name=name)
-    product = product_repository.get_by_id(product_id)
+    await product_repository.update_name(product_id=product_id, name=name)
+    product = await product_repository.get_by_id(product_id)
     view = AdminProductDetailView(product)
     await message.answer('✅ Product name has been updated')
     await answer_view(message=message, view=view)
@@ -28,7 +28,7 @@ async def on_show_permitted_gateways_list(
 ) -> None:
     product_id: int = callback_data['product_id']
     await ProductUpdateStates.permitted_gateways.set()
-    product = product_repository.get_by_id(product_id)
+    product = await product_repository.get_by_id(product_id)
     view = AdminProductPermittedGatewaysView(
         payment_method=PaymentMethod,
         chosen_payment_methods=product.permitted_gateways,
@@ -69,11 +69,11 @@ async def on_product_permitted_gateways_update_finish(
     await state.finish()
     product_id: int = state_data['product_id']
     permitted_gateways: set[PaymentMethod] = state_data['permitted_gateways']
-    product_repository.update_permitted_gateways(
+    await product_repository.update_permitted_gateways(
         product_id=product_id,
         payment_methods=permitted_gateways,
     )
-    product = product_repository.get_by_id(product_id)
+    product = await product_repository.get_by_id(product_id)
     view = AdminProductDetailView(product)
     await edit_message_by_view(message=callback_query.message, view=view)
 
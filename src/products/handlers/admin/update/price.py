@@ -38,8 +38,8 @@ async def on_product_price_input(
 
     state_data = await state.get_data()
     product_id: int = state_data['product_id']
-    product_repository.update_price(product_id=product_id, price=price)
-    product = product_repository.get_by_id(product_id)
+    await product_repository.update_price(product_id=product_id, price=price)
+    product = await product_repository.get_by_id(product_id)
     view = AdminProductDetailView(product)
     await message.answer('✅ Product price has been updated')
     await answer_view(message=message, view=view)
@@ -34,8 +34,11 @@ async def on_product_quantity_input(
     quantity = int(message.text)
     state_data = await state.get_data()
     product_id: int = state_data['product_id']
-    product_repository.update_quantity(product_id=product_id, quantity=quantity)
-    product = product_repository.get_by_id(product_id)
+    await product_repository.update_quantity(
+        product_id=product_id,
+        quantity=quantity,
+    )
+    product = await product_repository.get_by_id(product_id)
     view = AdminProductDetailView(product)
     await message.answer('✅ Product quantity has been updated')
     await answer_view(message=message, view=view)
@@ -0,0 +1,132 @@
+import io
+import pathlib
+import tempfile
+from collections.abc import Iterable
+
+from aiogram import Dispatcher
+from aiogram.dispatcher import FSMContext
+from aiogram.types import CallbackQuery, ContentType, Message
+
+from common.filters import AdminFilter
+from common.views import answer_view, edit_message_by_view
+from products.callback_data import AdminProductUpdateCallbackData
+from products.repositories import ProductRepository
+from products.services import import_product_units
+from products.states import ProductUpdateStates
+from products.views import (
+    AdminProductDetailView,
+    ProductUnitCreateView,
+    ProductUnitsImportFailedView,
+    ProductUnitsImportProgressView,
+)
+
+__all__ = ('register_handlers',)
+
+PRODUCT_UNITS_DOCUMENT_EXTENSIONS = ('.txt',)
+
+
+async def on_start_product_units_import_flow(
+        callback_query: CallbackQuery,
+        callback_data: dict,
+        state: FSMContext,
+) -> None:
+    product_id: int = callback_data['product_id']
+    await ProductUpdateStates.units.set()
+    await state.update_data(product_id=product_id)
+    view = ProductUnitCreateView()
+    await answer_view(message=callback_query.message, view=view)
+
+
+async def import_units_with_progress(
+        *,
+        message: Message,
+        product_repository: ProductRepository,
+        product_id: int,
+        lines: Iterable[str],
+) -> None:
+    view = ProductUnitsImportProgressView(0, is_completed=False)
+    progress_message = await answer_view(message=message, view=view)
+
+    async def on_progress(imported_units_count: int) -> None:
+        await edit_message_by_view(
+            message=progress_message,
+            view=ProductUnitsImportProgressView(
+                imported_units_count,
+                is_completed=False,
+            ),
+        )
+
+    try:
+        imported_units_count = await import_product_units(
+            product_repository=product_repository,
+            product_id=product_id,
+            lines=lines,
+            on_progress=on_progress,
+        )
+    except UnicodeDecodeError:
+        # import is rolled back, so stale progress must not stay on screen
+        view = ProductUnitsImportFailedView()
+        await edit_message_by_view(message=progress_message, view=view)
+        raise
+    view = ProductUnitsImportProgressView(
+        imported_units_count,
+        is_completed=True,
+    )
+    await edit_message_by_view(message=progress_message, view=view)
+
+
+async def on_product_units_input(
+        message: Message,
+        state: FSMContext,
+        product_repository: ProductRepository,
+) -> None:
+    document = message.document
+    if document is not None:
+        file_extension = pathlib.Path(document.file_name or '').suffix
+        if file_extension.lower() not in PRODUCT_UNITS_DOCUMENT_EXTENSIONS:
+            await message.reply('❌ Send .txt document')
+            return
+    state_data = await state.get_data()
+    await state.finish()
+    product_id: int = state_data['product_id']
+
+    if document is None:
+        await import_units_with_progress(
+            message=message,
+            product_repository=product_repository,
+            product_id=product_id,
+            lines=message.text.splitlines(),
+        )
+    else:
+        # document is kept on disk and read line by line while importing
+        with tempfile.TemporaryFile() as file:
+            await document.download(destination_file=file)
+            lines = io.TextIOWrapper(file, encoding='utf-8-sig')
+            try:
+                await import_units_with_progress(
+                    message=message,
+                    product_repository=product_repository,
+                    product_id=product_id,
+                    lines=lines,
+                )
+            except UnicodeDecodeError:
+                return
+
+    product = await product_repository.get_by_id(product_id)
+    view = AdminProductDetailView(product)
+    await answer_view(message=message, view=view)
+
+
+def register_handlers(dispatcher: Dispatcher) -> None:
+    dispatcher.register_callback_query_handler(
+        on_start_product_units_import_flow,
+        AdminProductUpdateCallbackData().filter(field='units'),
+        AdminFilter(),
+        state='*',
+    )
+    dispatcher.register_message_handler(
+        on_product_units_input,
+        AdminFilter(),
+        content_types=(ContentType.TEXT, ContentType.DOCUMENT),
+        state=ProductUpdateStates.units,
+    )
@@ -17,7 +17,7 @@ async def on_show_product_detail(
         product_repository: ProductRepository,
 ) -> None:
     product_id: int = callback_data['product_id']
-    product = product_repository.get_by_id(product_id)
+    product = await product_repository.get_by_id(product_id)
     if not product.can_be_purchased:
         await callback_query.answer('Coming soon...', show_alert=True)
         return
@@ -27,6 +27,7 @@ async def on_show_product_detail(
         message=callback_query.message,
         base_path=config.MEDIA_FILES_PATH,
         product=product,
+        product_repository=product_repository,
     )
 
 
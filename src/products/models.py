@@ -19,6 +19,7 @@ MediaFileName = NewType('MediaFileName', str)
 class ProductMedia:
     uuid: UUID
     type: MediaType
+    telegram_file_id: str | None = None
 
     @property
     def file_name(self) -> str:
@@ -1,12 +1,19 @@
-from collections.abc import Iterable
+import itertools
+from collections.abc import Callable, Iterable, Mapping
 from decimal import Decimal
+from uuid import UUID, uuid4
 
 import structlog
-from sqlalchemy import select, delete, update, func
-from sqlalchemy.orm import joinedload
+from sqlalchemy import select, delete, insert, update, func, Delete
+from sqlalchemy.orm import Session, joinedload, sessionmaker
 
-from common.repositories import BaseRepository
+from common.repositories import (
+    BaseRepository,
+    RepositoryThreadPool,
+    run_in_thread_pool,
+)
 from database import schemas as database_models
+from products.cache import ProductCache
 from products.exceptions import ProductDoesNotExistError
 from products.models import Product, PaymentMethod, ProductMedia
 
@@ -15,8 +22,53 @@ __all__ = ('ProductRepository',)
 logger: structlog.stdlib.BoundLogger = structlog.get_logger('app')
 
 
+def map_product_media_to_dto(
+        product_media: database_models.ProductMedia,
+) -> ProductMedia:
+    telegram_file = product_media.telegram_file
+    return ProductMedia(
+        uuid=product_media.uuid,
+        type=product_media.type,
+        telegram_file_id=(
+            None if telegram_file is None else telegram_file.file_id
+        ),
+    )
+
+
+def delete_media_telegram_files_statement(product_id: int) -> Delete:
+    return (
+        delete(database_models.ProductMediaTelegramFile)
+        .where(
+            database_models.ProductMediaTelegramFile.media_uuid.in_(
+                select(database_models.ProductMedia.uuid)
+                .where(database_models.ProductMedia.product_id == product_id)
+            )
+        )
+    )
+
+
 class ProductRepository(BaseRepository):
+    """Products storage.
+
+    If product cache is provided, `get_by_id` and `get_by_category_id`
+    read through it without going to the thread pool on cache hit,
+    and every method that changes products invalidates affected entries.
+    """
+
+    def __init__(
+            self,
+            session_factory: sessionmaker,
+            thread_pool: RepositoryThreadPool | None = None,
+            product_cache: ProductCache | None = None,
+    ):
+        super().__init__(session_factory, thread_pool)
+        self.__product_cache = product_cache
+
+    def __invalidate_product(self, product_id: int) -> None:
+        if self.__product_cache is not None:
+            self.__product_cache.invalidate_product(product_id)
 
+    @run_in_thread_pool
     def create(
             self,
             *,
@@ -71,6 +123,9 @@ class ProductRepository(BaseRepository):
                 session.flush()
                 session.refresh(product)
 
+        if self.__product_cache is not None:
+            self.__product_cache.invalidate_category(category_id)
+
         return Product(
             id=product.id,
             category_id=product.category_id,
@@ -89,12 +144,24 @@ class ProductRepository(BaseRepository):
             permitted_gateways=list(permitted_gateways),
         )
 
-    def get_by_id(self, product_id: int) -> Product:
+    async def get_by_id(self, product_id: int) -> Product:
+        if self.__product_cache is None:
+            return await self.__get_by_id(product_id)
+        product = self.__product_cache.get_product(product_id)
+        if product is None:
+            version = self.__product_cache.version
+            product = await self.__get_by_id(product_id)
+            self.__product_cache.put_product(product, version=version)
+        return product
+
+    @run_in_thread_pool
+    def __get_by_id(self, product_id: int) -> Product:
         statement = (
             select(database_models.Product)
             .where(database_models.Product.id == product_id)
             .options(
-                joinedload(database_models.Product.media),
+                joinedload(database_models.Product.media)
+                .joinedload(database_models.ProductMedia.telegram_file),
                 joinedload(database_models.Product.permitted_gateways),
             )
         )
@@ -107,10 +174,8 @@ class ProductRepository(BaseRepository):
             for permitted_gateway in product.permitted_gateways
         ]
         media = [
-            ProductMedia(
-                uuid=product_media.uuid,
-                type=product_media.type,
-            ) for product_media in product.media
+            map_product_media_to_dto(product_media)
+            for product_media in product.media
         ]
         return Product(
             id=product.id,
@@ -130,12 +195,28 @@ class ProductRepository(BaseRepository):
             permitted_gateways=permitted_gateways,
         )
 
-    def get_by_category_id(self, category_id: int) -> list[Product]:
+    async def get_by_category_id(self, category_id: int) -> list[Product]:
+        if self.__product_cache is None:
+            return await self.__get_by_category_id(category_id)
+        products = self.__product_cache.get_category_products(category_id)
+        if products is None:
+            version = self.__product_cache.version
+            products = await self.__get_by_category_id(category_id)
+            self.__product_cache.put_category_products(
+                category_id=category_id,
+                products=products,
+                version=version,
+            )
+        return products
+
+    @run_in_thread_pool
+    def __get_by_category_id(self, category_id: int) -> list[Product]:
         statement = (
             select(database_models.Product)
             .where(database_models.Product.category_id == category_id)
             .options(
-                joinedload(database_models.Product.media),
+                joinedload(database_models.Product.media)
+                .joinedload(database_models.ProductMedia.telegram_file),
                 joinedload(database_models.Product.permitted_gateways),
             )
         )
@@ -156,11 +237,18 @@ class ProductRepository(BaseRepository):
                 is_duplicated_stock_entries_allowed=product.is_duplicated_stock_entries_allowed,
                 is_hidden=product.is_hidden,
                 can_be_purchased=product.can_be_purchased,
-                media=product.media,
-                permitted_gateways=product.permitted_gateways,
+                media=[
+                    map_product_media_to_dto(product_media)
+                    for product_media in product.media
+                ],
+                permitted_gateways=[
+                    permitted_gateway.payment_method
+                    for permitted_gateway in product.permitted_gateways
+                ],
             ) for product in products
         ]
 
+    @run_in_thread_pool
     def update_media(
             self,
             *,
@@ -181,9 +269,38 @@ class ProductRepository(BaseRepository):
 
         with self._session_factory() as session:
             with session.begin():
+                session.execute(
+                    delete_media_telegram_files_statement(product_id),
+                )
                 session.execute(delete_statement)
                 session.add_all(media_to_insert)
+        self.__invalidate_product(product_id)
+
+    @run_in_thread_pool
+    def save_media_telegram_file_ids(
+            self,
+            *,
+            product_id: int,
+            media_telegram_file_ids: Mapping[UUID, str],
+    ) -> None:
+        """Save Telegram file IDs of product media uploaded to Telegram.
 
+        Args:
+            product_id: ID of the product the media belongs to.
+            media_telegram_file_ids: Telegram file IDs by media UUIDs.
+        """
+        with self._session_factory() as session:
+            with session.begin():
+                for media_uuid, file_id in media_telegram_file_ids.items():
+                    session.merge(
+                        database_models.ProductMediaTelegramFile(
+                            media_uuid=media_uuid,
+                            file_id=file_id,
+                        ),
+                    )
+        self.__invalidate_product(product_id)
+
+    @run_in_thread_pool
     def update_permitted_gateways(
             self,
             *,
@@ -206,6 +323,7 @@ class ProductRepository(BaseRepository):
             with session.begin():
                 session.execute(delete_statement)
                 session.add_all(payment_methods_to_insert)
+        self.__invalidate_product(product_id)
 
     def __update_by_id(self, *, product_id, values_to_update: dict) -> None:
         statement = (
@@ -216,31 +334,37 @@ class ProductRepository(BaseRepository):
         with self._session_factory() as session:
             with session.begin():
                 session.execute(statement)
+        self.__invalidate_product(product_id)
 
+    @run_in_thread_pool
     def update_name(self, *, product_id: int, name: str) -> None:
         self.__update_by_id(
             product_id=product_id,
             values_to_update={'name': name},
         )
 
+    @run_in_thread_pool
     def update_description(self, *, product_id: int, description: str) -> None:
         self.__update_by_id(
             product_id=product_id,
             values_to_update={'description': description},
         )
 
+    @run_in_thread_pool
     def update_price(self, *, product_id: int, price: Decimal) -> None:
         self.__update_by_id(
             product_id=product_id,
             values_to_update={'price': price},
         )
 
+    @run_in_thread_pool
     def update_quantity(self, *, product_id: int, quantity: int) -> None:
         self.__update_by_id(
             product_id=product_id,
             values_to_update={'quantity': quantity},
         )
 
+    @run_in_thread_pool
     def update_min_order_quantity(self, *, product_id: int,
                                   min_order_quantity: int | None) -> None:
         self.__update_by_id(
@@ -248,6 +372,7 @@ class ProductRepository(BaseRepository):
             values_to_update={'min_order_quantity': min_order_quantity},
         )
 
+    @run_in_thread_pool
     def update_max_order_quantity(self, *, product_id: int,
                                   max_order_quantity: int | None) -> None:
         self.__update_by_id(
@@ -255,6 +380,7 @@ class ProductRepository(BaseRepository):
             values_to_update={'max_order_quantity': max_order_quantity},
         )
 
+    @run_in_thread_pool
     def update_max_replacement_time(self, *, product_id: int,
                                     max_replacement_time: int) -> None:
         self.__update_by_id(
@@ -264,6 +390,7 @@ class ProductRepository(BaseRepository):
             },
         )
 
+    @run_in_thread_pool
     def update_max_displayed_stock_count(
             self,
             *,
@@ -277,6 +404,7 @@ class ProductRepository(BaseRepository):
             },
         )
 
+    @run_in_thread_pool
     def update_duplicated_stock_entries_status(
             self,
             *,
@@ -292,12 +420,14 @@ class ProductRepository(BaseRepository):
             },
         )
 
+    @run_in_thread_pool
     def update_hidden_status(self, *, product_id: int, is_hidden: bool) -> None:
         self.__update_by_id(
             product_id=product_id,
             values_to_update={'is_hidden': is_hidden},
         )
 
+    @run_in_thread_pool
     def update_can_be_purchased_status(
             self,
             *,
@@ -309,6 +439,7 @@ class ProductRepository(BaseRepository):
             values_to_update={'can_be_purchased': can_be_purchased},
         )
 
+    @run_in_thread_pool
     def delete_by_id(self, product_id: int) -> None:
         statement_to_delete_product = (
             delete(database_models.Product)
@@ -331,9 +462,159 @@ class ProductRepository(BaseRepository):
         with self._session_factory() as session:
             with session.begin():
                 session.execute(statement_to_delete_product)
+                session.execute(
+                    delete_media_telegram_files_statement(product_id),
+                )
                 session.execute(statement_to_delete_product_media)
                 session.execute(statement_to_delete_product_permitted_gateways)
+        if self.__product_cache is not None:
+            self.__product_cache.invalidate_deleted_product(product_id)
+
+    def __add_units_to_quantity(
+            self,
+            *,
+            session: Session,
+            product_id: int,
+            units_count: int,
+    ) -> None:
+        session.execute(
+            update(database_models.Product)
+            .where(database_models.Product.id == product_id)
+            .values(
+                quantity=func.max(
+                    database_models.Product.quantity + units_count,
+                    0,
+                ),
+            )
+        )
+
+    def __delete_imported_units(
+            self,
+            *,
+            product_id: int,
+            import_id: str,
+            batch_size: int,
+    ) -> int:
+        deleted_units_count = 0
+        statement = (
+            delete(database_models.ProductUnit)
+            .where(
+                database_models.ProductUnit.id.in_(
+                    select(database_models.ProductUnit.id)
+                    .where(
+                        database_models.ProductUnit.import_id == import_id,
+                        database_models.ProductUnit.sale_id.is_(None),
+                    )
+                    .limit(batch_size)
+                ),
+            )
+        )
+        while True:
+            with self._session_factory() as session, session.begin():
+                batch_deleted_units_count = session.execute(
+                    statement,
+                ).rowcount
+                self.__add_units_to_quantity(
+                    session=session,
+                    product_id=product_id,
+                    units_count=-batch_deleted_units_count,
+                )
+            deleted_units_count += batch_deleted_units_count
+            if batch_deleted_units_count < batch_size:
+                return deleted_units_count
+
+    @run_in_thread_pool
+    def import_units(
+            self,
+            *,
+            product_id: int,
+            contents: Iterable[str],
+            batch_size: int = 5000,
+            on_batch_imported: Callable[[int], None] | None = None,
+    ) -> int:
+        """Insert text units of product and add them to its quantity.
+
+        Contents are consumed lazily and inserted by `executemany`
+        in batches, so memory use does not depend on number of units.
+        Every batch is committed with its quantity increment in its own
+        transaction, so the database write lock is released between
+        batches. Units are tagged with ID of the import, and if import
+        fails, units of its committed batches that are not sold yet
+        are deleted, so a failed import leaves no units.
+
+        Args:
+            product_id: ID of product to import units of.
+            contents: Contents of text units.
+            batch_size: Number of units inserted in one transaction.
+            on_batch_imported: Called with number of units inserted
+                so far after every committed batch.
+
+        Returns:
+            Number of imported units.
+
+        Raises:
+            ProductDoesNotExistError: If product does not exist.
+        """
+        with self._session_factory() as session:
+            is_product_exists = session.scalar(
+                select(database_models.Product.id)
+                .where(database_models.Product.id == product_id)
+            ) is not None
+        if not is_product_exists:
+            raise ProductDoesNotExistError
+
+        contents = iter(contents)
+        import_id = uuid4().hex
+        imported_units_count = 0
+        insert_units_statement = insert(database_models.ProductUnit)
+        try:
+            while batch := list(itertools.islice(contents, batch_size)):
+                with self._session_factory() as session, session.begin():
+                    session.connection().execute(
+                        insert_units_statement,
+                        [
+                            {
+                                'product_id': product_id,
+                                'content': content,
+                                'type': 'text',
+                                'import_id': import_id,
+                            }
+                            for content in batch
+                        ],
+                    )
+                    self.__add_units_to_quantity(
+                        session=session,
+                        product_id=product_id,
+                        units_count=len(batch),
+                    )
+                imported_units_count += len(batch)
+                self.__invalidate_product(product_id)
+                if on_batch_imported is not None:
+                    on_batch_imported(imported_units_count)
+        except Exception:
+            deleted_units_count = self.__delete_imported_units(
+                product_id=product_id,
+                import_id=import_id,
+                batch_size=batch_size,
+            )
+            self.__invalidate_product(product_id)
+            logger.warning(
+                'Product repository: import units failed, units deleted',
+                product_id=product_id,
+                import_id=import_id,
+                imported_units_count=imported_units_count,
+                deleted_units_count=deleted_units_count,
+            )
+            raise
+        logger.debug(
+            'Product repository: import units',
+            product_id=product_id,
+            import_id=import_id,
+            imported_units_count=imported_units_count,
+        )
+        return imported_units_count
 
+    @run_in_thread_pool
     def count_products(self, category_ids: Iterable[int]) -> int:
         statement = (
             select(func.count())
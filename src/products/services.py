@@ -1,7 +1,15 @@
+import asyncio
 import contextlib
 import pathlib
 import shutil
-from collections.abc import Iterable, Callable
+from collections.abc import (
+    Awaitable,
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+)
+from typing import Protocol
 from uuid import UUID
 
 import structlog
@@ -24,6 +32,8 @@ __all__ = (
     'answer_view_with_media',
     'file_extension_to_media_type',
     'parse_media_types',
+    'iter_product_unit_contents',
+    'import_product_units',
 )
 
 logger: structlog.stdlib.BoundLogger = structlog.get_logger('app')
@@ -37,37 +47,100 @@ def build_file_paths(
     return [base_path / file_name for file_name in file_names]
 
 
-async def answer_view_with_media(
+class HasSaveMediaTelegramFileIdsMethod(Protocol):
+
+    async def save_media_telegram_file_ids(
+            self,
+            *,
+            product_id: int,
+            media_telegram_file_ids: Mapping[UUID, str],
+    ) -> None: ...
+
+
+def get_sent_media_file_id(message: Message) -> str | None:
+    if message.animation is not None:
+        return message.animation.file_id
+    if message.video is not None:
+        return message.video.file_id
+    if message.photo:
+        return message.photo[-1].file_id
+    return None
+
+
+async def answer_animation(
         *,
         message: Message,
         base_path: pathlib.Path,
-        product: Product,
-        view: View,
-) -> Message:
-    if len(product.media) > 10:
-        raise ValueError('Too many media files (10 maximum)')
+        animation: ProductMedia,
+) -> str | None:
+    """Send animation by its Telegram file ID or upload it from disk.
 
-    for animation in product.animations:
-        file_path = base_path / animation.file_name
+    Returns:
+        Telegram file ID if animation has been uploaded, None otherwise.
+    """
+    if animation.telegram_file_id is not None:
         try:
-            with file_path.open('rb') as file_io:
-                await message.answer_animation(file_io)
-        except OSError:
-            logger.error('File does not exist', file_path=file_path)
+            await message.answer_animation(animation.telegram_file_id)
         except TelegramAPIError:
-            logger.exception(
-                'Could not send mediafile',
-                media_type=animation.type.name,
+            logger.warning(
+                'Could not send mediafile by Telegram file ID',
+                media_uuid=animation.uuid,
             )
+        else:
+            return None
+
+    file_path = base_path / animation.file_name
+    try:
+        with file_path.open('rb') as file_io:
+            sent_message = await message.answer_animation(file_io)
+    except OSError:
+        logger.error('File does not exist', file_path=file_path)
+    except TelegramAPIError:
+        logger.exception(
+            'Could not send mediafile',
+            media_type=animation.type.name,
+        )
+    else:
+        return get_sent_media_file_id(sent_message)
+    return None
+
 
+async def answer_media_group(
+        *,
+        message: Message,
+        base_path: pathlib.Path,
+        media: Iterable[ProductMedia],
+        is_telegram_file_ids_used: bool = True,
+) -> dict[UUID, str]:
+    """Send photos and videos as media group.
+
+    Media with known Telegram file ID is sent by it, the rest is uploaded
+    from disk. If Telegram rejects the media group, it is uploaded once
+    again from disk entirely.
+
+    Returns:
+        Telegram file IDs of uploaded media by their UUIDs.
+    """
     media_type_to_input_media = {
         MediaType.PHOTO: InputMediaPhoto,
         MediaType.VIDEO: InputMediaVideo,
     }
+    media = list(media)
 
     with contextlib.ExitStack() as exit_stack:
         input_medias: list[InputMedia] = []
-        for photo_or_video in product.photos_and_videos:
+        uploaded_media: list[tuple[int, ProductMedia]] = []
+        for photo_or_video in media:
+            input_media = media_type_to_input_media[photo_or_video.type]
+
+            if (
+                    is_telegram_file_ids_used
+                    and photo_or_video.telegram_file_id is not None
+            ):
+                input_medias.append(
+                    input_media(photo_or_video.telegram_file_id),
+                )
+                continue
 
             file_path = base_path / photo_or_video.file_name
             try:
@@ -76,16 +149,74 @@ async def answer_view_with_media(
                 logger.error('File does not exist', file_path=file_path)
                 continue
 
-            input_media = media_type_to_input_media[photo_or_video.type]
+            uploaded_media.append((len(input_medias), photo_or_video))
             input_medias.append(input_media(file_io))
 
-        if input_medias:
-            media_group = MediaGroup(input_medias)
+        if not input_medias:
+            return {}
+
+        try:
+            sent_messages = await message.answer_media_group(
+                MediaGroup(input_medias),
+            )
+        except TelegramAPIError:
+            if len(uploaded_media) < len(input_medias):
+                logger.warning('Could not send media group by file IDs')
+                return await answer_media_group(
+                    message=message,
+                    base_path=base_path,
+                    media=media,
+                    is_telegram_file_ids_used=False,
+                )
+            logger.error('Could not send media group')
+            return {}
+
+    media_telegram_file_ids: dict[UUID, str] = {}
+    for index, photo_or_video in uploaded_media:
+        file_id = get_sent_media_file_id(sent_messages[index])
+        if file_id is not None:
+            media_telegram_file_ids[photo_or_video.uuid] = file_id
+    return media_telegram_file_ids
 
-            try:
-                await message.answer_media_group(media_group)
-            except TelegramAPIError:
-                logger.error('Could not send media group')
+
+async def answer_view_with_media(
+        *,
+        message: Message,
+        base_path: pathlib.Path,
+        product: Product,
+        view: View,
+        product_repository: HasSaveMediaTelegramFileIdsMethod,
+) -> Message:
+    """Answer with product media and then with view.
+
+    Media is read from disk and uploaded to Telegram only once,
+    then it is sent by Telegram file ID saved in the repository.
+    """
+    if len(product.media) > 10:
+        raise ValueError('Too many media files (10 maximum)')
+
+    media_telegram_file_ids: dict[UUID, str] = {}
+
+    for animation in product.animations:
+        file_id = await answer_animation(
+            message=message,
+            base_path=base_path,
+            animation=animation,
+        )
+        if file_id is not None:
+            media_telegram_file_ids[animation.uuid] = file_id
+
+    media_telegram_file_ids |= await answer_media_group(
+        message=message,
+        base_path=base_path,
+        media=product.photos_and_videos,
+    )
+
+    if media_telegram_file_ids:
+        await product_repository.save_media_telegram_file_ids(
+            product_id=product.id,
+            media_telegram_file_ids=media_telegram_file_ids,
+        )
 
     return await answer_view(message=message, view=view)
 
@@ -235,3 +366,71 @@ def parse_media_types(media: Iterable[str]) -> list[ProductMedia]:
         )
 
     return product_media
+
+
+def iter_product_unit_contents(lines: Iterable[str]) -> Iterator[str]:
+    """Yield contents of text units, one per non-blank line."""
+    for line in lines:
+        content = line.strip()
+        if content:
+            yield content
+
+
+class HasImportUnitsMethod(Protocol):
+
+    async def import_units(
+            self,
+            *,
+            product_id: int,
+            contents: Iterable[str],
+            on_batch_imported: Callable[[int], None] | None = None,
+    ) -> int: ...
+
+
+async def import_product_units(
+        *,
+        product_repository: HasImportUnitsMethod,
+        product_id: int,
+        lines: Iterable[str],
+        on_progress: Callable[[int], Awaitable[None]],
+        progress_interval: float = 3,
+) -> int:
+    """Import text units from lines, e.g. lines of uploaded document.
+
+    Lines are read and imported in the repository's thread pool,
+    so the event loop is not blocked. Every `progress_interval` seconds,
+    if more units have been imported since the last report,
+    `on_progress` is awaited with number of units imported so far. Failing to report progress
+    does not interrupt the import.
+
+    Returns:
+        Number of imported units.
+    """
+    imported_units_count = 0
+
+    def on_batch_imported(units_count: int) -> None:
+        nonlocal imported_units_count
+        imported_units_count = units_count
+
+    import_task = asyncio.create_task(
+        product_repository.import_units(
+            product_id=product_id,
+            contents=iter_product_unit_contents(lines),
+            on_batch_imported=on_batch_imported,
+        )
+    )
+    reported_units_count = 0
+    while True:
+        done, _ = await asyncio.wait({import_task}, timeout=progress_interval)
+        if done:
+            return import_task.result()
+        if imported_units_count == reported_units_count:
+            continue
+        reported_units_count = imported_units_count
+        try:
+            await on_progress(reported_units_count)
+        except TelegramAPIError:
+            logger.warning(
+                'Could not report product units import progress',
+                product_id=product_id,
+            )
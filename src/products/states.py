@@ -6,7 +6,6 @@ __all__ = (
     'ProductUpdateStates',
     'EditProductUnitStates',
     'EnterProductQuantityStates',
-    'AddProductUnitStates',
 )
 
 
@@ -40,6 +39,7 @@ class ProductUpdateStates(StatesGroup):
     max_displayed_stock = State()
     permitted_gateways = State()
     quantity = State()
+    units = State()
 
 
 class AddProductStates(StatesGroup):
@@ -50,10 +50,6 @@ class AddProductStates(StatesGroup):
     waiting_content = State()
 
 
-class AddProductUnitStates(StatesGroup):
-    waiting_content = State()
-
-
 class EditProductUnitStates(StatesGroup):
     waiting_content = State()
 
@@ -1,9 +1,6 @@
 from collections.abc import Iterable
 
-from aiogram.types import (
-    InlineKeyboardMarkup, InlineKeyboardButton,
-    ReplyKeyboardMarkup, KeyboardButton
-)
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
 from categories.models import Category
 from common.views import View
@@ -24,7 +21,8 @@ __all__ = (
     'AdminAskForProductMediaView',
     'AdminProductDeleteView',
     'ProductUnitCreateView',
-    'ProductUnitLoadingCompleteView',
+    'ProductUnitsImportProgressView',
+    'ProductUnitsImportFailedView',
 )
 
 
@@ -194,6 +192,7 @@ class AdminProductDetailView(View):
             ('📝 Max Replacement Time', 'max-replacement-time'),
             ('📝 Permitted Gateways', 'permitted-gateways'),
             ('📦 Quantity', 'quantity'),
+            ('📥 Load Units', 'units'),
             ('🖼️ Media', 'media')
         )
 
@@ -325,40 +324,26 @@ class AdminProductPermittedGatewaysView(View):
 
 class ProductUnitCreateView(View):
     text = (
-        '📦 Enter the product data\n\n'
-        'Examples of download:\n\n'
+        '📦 Enter the product units, one per line\n\n'
+        'Example:\n\n'
         'Product 1\n'
         'Product 2\n'
         'Product n\n\n'
-        'Grouped Documents\n\n'
-        'The products will be loaded until you click ✅ Complete'
-    )
-    reply_markup = ReplyKeyboardMarkup(
-        resize_keyboard=True,
-        keyboard=[
-            [
-                KeyboardButton('✅ Complete'),
-            ],
-        ],
+        'Large lists can be sent as .txt document'
     )
 
 
-class ProductUnitLoadingCompleteView(View):
-    reply_markup = ReplyKeyboardMarkup(
-        resize_keyboard=True,
-        keyboard=[
-            [
-                KeyboardButton('📝 Products Management'),
-                KeyboardButton('📁 Categories Control'),
-            ],
-            [
-                KeyboardButton('⬅️ Back'),
-            ],
-        ]
-    )
+class ProductUnitsImportProgressView(View):
 
-    def __init__(self, product_name: str):
-        self.__product_name = product_name
+    def __init__(self, imported_units_count: int, *, is_completed: bool):
+        self.__imported_units_count = imported_units_count
+        self.__is_completed = is_completed
 
     def get_text(self) -> str:
-        return f'✅ loading {self.__product_name} Completed'
+        if self.__is_completed:
+            return f'✅ Units loaded: {self.__imported_units_count}'
+        return f'⏳ Loading units... {self.__imported_units_count}'
+
+
+class ProductUnitsImportFailedView(View):
+    text = '❌ Units are not loaded: document must be encoded in UTF-8'
@@ -6,12 +6,7 @@ import aiogram.types
 import config
 from categories.models import Category
 from database import schemas
-from keyboards.buttons import navigation_buttons
-from keyboards.inline import (
-    product_keyboards,
-    callback_factories,
-    payments_keyboards,
-)
+from keyboards.inline import product_keyboards
 from responses import base
 
 
@@ -302,33 +297,3 @@ class IncorrectQuantity(base.BaseResponse):
 
     async def _send_response(self) -> aiogram.types.Message:
         return await self.__message.answer('❗️ Incorrect quantity value ❗️')
-
-
-class PaymentMethodResponse(base.BaseResponse):
-    def __init__(self,
-                 update: aiogram.types.CallbackQuery | aiogram.types.Message,
-                 callback_data: dict[str:str], crypto_payments: str = None):
-        self.__update = update
-        callback_data.pop('@')
-        self.__keyboard = payments_keyboards.PaymentMethodsKeyboard(
-            callback_data, callback_factories.BuyProductCallbackFactory(),
-            is_balance=True, crypto_payments=crypto_payments
-        )
-        self.__keyboard.add(navigation_buttons.InlineBackButton(
-            callback_factories.BuyProductCallbackFactory().new(
-                **(callback_data | {'quantity': '', 'payment_method': ''})))
-        )
-
-    async def _send_response(self) -> aiogram.types.Message:
-        message_text = '💳 Choose a desired payment method'
-        if isinstance(self.__update, aiogram.types.CallbackQuery):
-            await self.__update.answer()
-            return await self.__update.message.edit_text(
-                text=message_text,
-                reply_markup=self.__keyboard,
-            )
-        elif isinstance(self.__update, aiogram.types.Message):
-            return await self.__update.answer(
-                text=message_text,
-                reply_markup=self.__keyboard,
-            )
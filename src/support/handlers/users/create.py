@@ -14,7 +14,8 @@ from support.views import (
     SupportRulesAcceptView,
     SupportTicketCreatedView,
 )
-from users.repositories import UserRepository
+from users.exceptions import UserNotInDatabase
+from users.models import User
 
 
 async def on_support_ticket_create_rate_limit_error(
@@ -76,7 +77,7 @@ async def on_support_ticket_subject_input(
 async def on_support_ticket_issue_input(
         message: Message,
         state: FSMContext,
-        user_repository: UserRepository,
+        user: User | None,
         support_ticket_repository: SupportTicketRepository,
 ) -> None:
     state_data = await state.get_data()
@@ -84,7 +85,8 @@ async def on_support_ticket_issue_input(
     subject = state_data['subject']
     issue = message.text
 
-    user = user_repository.get_by_telegram_id(message.from_user.id)
+    if user is None:
+        raise UserNotInDatabase
     support_ticket = support_ticket_repository.create(
         user_id=user.id,
         user_telegram_id=message.from_user.id,
@@ -7,6 +7,7 @@ from aiogram.utils.exceptions import TelegramAPIError
 from structlog.stdlib import BoundLogger
 
 from common.models import Period
+from common.send_queue import SendPriority, send_priority
 from common.services import get_now_datetime, to_local_time
 from support.exceptions import (
     InvalidSupportDateRangeError,
@@ -52,10 +53,11 @@ async def notify_user_ticket_status_changed(
 ) -> None:
     view = SupportTicketStatusChangedNotificationView(support_ticket)
     try:
-        await bot.send_message(
-            text=view.get_text(),
-            chat_id=support_ticket.user_telegram_id,
-        )
+        with send_priority(SendPriority.ADMIN):
+            await bot.send_message(
+                text=view.get_text(),
+                chat_id=support_ticket.user_telegram_id,
+            )
     except TelegramAPIError:
         logger.warning(
             'User notifications:'
@@ -0,0 +1,98 @@
+import threading
+import time
+from collections import OrderedDict
+
+import structlog
+from structlog.stdlib import BoundLogger
+
+from common.models import CacheStats
+from users.models import User
+
+__all__ = ('UserCache',)
+
+logger: BoundLogger = structlog.get_logger('app')
+
+
+class UserCache:
+    """Thread-safe LRU cache of users by Telegram ID with short TTL.
+
+    Repositories that change users invalidate them by ID, the TTL
+    only bounds staleness of changes made outside of this process.
+    As in `ProductCache`, users read from the database are put only
+    if no invalidation happened since the read started.
+    """
+
+    def __init__(self, *, ttl: float, max_size: int):
+        self.__ttl = ttl
+        self.__max_size = max_size
+        self.__lock = threading.Lock()
+        self.__version = 0
+        self.__users: OrderedDict[int, tuple[User, float]] = OrderedDict()
+        self.__telegram_ids: dict[int, int] = {}
+        self.__hits_count = 0
+        self.__misses_count = 0
+        self.__evictions_count = 0
+
+    @property
+    def version(self) -> int:
+        return self.__version
+
+    def __delete(self, telegram_id: int) -> None:
+        user, _ = self.__users.pop(telegram_id)
+        self.__telegram_ids.pop(user.id, None)
+
+    def get(self, telegram_id: int) -> User | None:
+        with self.__lock:
+            entry = self.__users.get(telegram_id)
+            if entry is None:
+                self.__misses_count += 1
+                return None
+            user, expires_at = entry
+            if expires_at <= time.monotonic():
+                self.__delete(telegram_id)
+                self.__misses_count += 1
+                return None
+            self.__users.move_to_end(telegram_id)
+            self.__hits_count += 1
+            return user
+
+    def put(self, user: User, *, version: int) -> None:
+        with self.__lock:
+            if version != self.__version:
+                return
+            self.__users[user.telegram_id] = (
+                user,
+                time.monotonic() + self.__ttl,
+            )
+            self.__users.move_to_end(user.telegram_id)
+            self.__telegram_ids[user.id] = user.telegram_id
+            while len(self.__users) > self.__max_size:
+                self.__delete(next(iter(self.__users)))
+                self.__evictions_count += 1
+
+    def invalidate_by_id(self, user_id: int) -> None:
+        with self.__lock:
+            self.__version += 1
+            telegram_id = self.__telegram_ids.get(user_id)
+            if telegram_id is not None:
+                self.__delete(telegram_id)
+
+    def get_stats(self) -> CacheStats:
+        with self.__lock:
+            return CacheStats(
+                hits_count=self.__hits_count,
+                misses_count=self.__misses_count,
+                evictions_count=self.__evictions_count,
+                size=len(self.__users),
+            )
+
+    def log_stats(self) -> None:
+        stats = self.get_stats()
+        logger.info(
+            'User cache stats',
+            hits_count=stats.hits_count,
+            misses_count=stats.misses_count,
+            evictions_count=stats.evictions_count,
+            hit_ratio=stats.hit_ratio,
+            size=stats.size,
+        )
@@ -25,7 +25,7 @@ async def on_ask_user_delete_confirmation(
         user_repository: UserRepository,
 ) -> None:
     user_id: int = callback_data['user_id']
-    user = user_repository.get_by_id(user_id)
+    user = await user_repository.get_by_id(user_id)
     await UserDeleteStates.confirm.set()
     await state.update_data(user_id=user_id)
     view = UserDeleteAskForConfirmationView(user)
@@ -39,9 +39,9 @@ async def on_user_delete_confirm(
 ) -> None:
     state_data = await state.get_data()
     user_id: int = state_data['user_id']
-    deleted_user = user_repository.get_by_id(user_id)
-    user_repository.delete_by_id(user_id)
-    users = user_repository.get_by_usernames_and_ids(limit=10, offset=0)
+    deleted_user = await user_repository.get_by_id(user_id)
+    await user_repository.delete_by_id(user_id)
+    users = await user_repository.get_by_usernames_and_ids(limit=10, offset=0)
     total_balance = calculate_total_balance(users)
     view = UserDeleteSuccessView(deleted_user)
     await edit_message_by_view(message=callback_query.message, view=view)
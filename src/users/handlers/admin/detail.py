@@ -18,7 +18,7 @@ async def on_show_user_detail(
         sale_repository: SaleRepository,
 ) -> None:
     user_id: int = callback_data['user_id']
-    user = user_repository.get_by_id(user_id)
+    user = await user_repository.get_by_id(user_id)
     orders_count = sale_repository.count_by_user_id(user_id)
     view = UserDetailView(
         user=user,
@@ -14,9 +14,9 @@ async def on_show_users_list(
         message: Message,
         user_repository: UserRepository,
 ) -> None:
-    total_balance = user_repository.get_total_balance()
+    total_balance = await user_repository.get_total_balance()
     page_size = 10
-    users = user_repository.get_by_usernames_and_ids(
+    users = await user_repository.get_by_usernames_and_ids(
         limit=page_size,
         offset=0,
     )
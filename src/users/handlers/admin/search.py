@@ -33,7 +33,7 @@ async def on_users_identifiers_for_search_input(
     await state.finish()
     page, page_size = 0, 10
     users_identifiers = parse_users_identifiers_for_search(message.text)
-    users = user_repository.get_by_usernames_and_ids(
+    users = await user_repository.get_by_usernames_and_ids(
         usernames=users_identifiers.usernames,
         user_ids=users_identifiers.user_ids,
         limit=page_size,
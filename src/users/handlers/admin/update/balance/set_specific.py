@@ -61,7 +61,7 @@ async def on_balance_update_reason_choice(
     state_data = await state.get_data()
     user_id: int = state_data['user_id']
     amount_to_set: Decimal = state_data['amount_to_set']
-    user = user_repository.get_by_id(user_id)
+    user = await user_repository.get_by_id(user_id)
     view = UserSetSpecificBalanceAskForConfirmationView(
         user=user,
         amount_to_set=amount_to_set,
@@ -82,14 +82,14 @@ async def on_set_specific_balance_confirm(
     amount_to_set: Decimal = state_data['amount_to_set']
     reason: str = state_data['reason']
 
-    user = user_repository.get_by_id(user_id)
+    user = await user_repository.get_by_id(user_id)
     old_balance = user.balance
 
-    user_repository.update_balance(
+    await user_repository.update_balance(
         user_id=user_id,
         amount_to_set=amount_to_set,
     )
-    user = user_repository.get_by_id(user_id)
+    user = await user_repository.get_by_id(user_id)
     orders_count = sale_repository.count_by_user_id(user_id)
     view = UserSetSpecificBalanceReceiptView(
         user=user,
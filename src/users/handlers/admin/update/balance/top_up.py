@@ -81,7 +81,7 @@ async def on_balance_top_up_method_choice(
     state_data = await state.get_data()
     user_id: int = state_data['user_id']
     amount_to_top_up: Decimal = state_data['amount_to_top_up']
-    user = user_repository.get_by_id(user_id)
+    user = await user_repository.get_by_id(user_id)
     view = UserBalanceTopUpAskForConfirmationView(
         user=user,
         amount_to_top_up=amount_to_top_up,
@@ -102,11 +102,11 @@ async def on_balance_top_up_confirm(
     amount_to_top_up: Decimal = state_data['amount_to_top_up']
     payment_method: str = state_data['payment_method']
 
-    user_repository.top_up_balance(
+    await user_repository.top_up_balance(
         user_id=user_id,
         amount_to_top_up=amount_to_top_up
     )
-    user = user_repository.get_by_id(user_id)
+    user = await user_repository.get_by_id(user_id)
     orders_count = sale_repository.count_by_user_id(user_id)
     view = UserBalanceTopUpReceiptView(
         user=user,
@@ -20,7 +20,7 @@ async def on_banned_status_toggle(
         user_repository: UserRepository,
 ) -> None:
     user_id: int = callback_data['user_id']
-    user = user_repository.get_by_id(user_id)
+    user = await user_repository.get_by_id(user_id)
     await state.update_data(
         user_id=user_id,
         user_telegram_id=user.telegram_id,
@@ -38,14 +38,14 @@ async def on_banned_status_toggle_confirm(
     state_data = await state.get_data()
     user_id: int = state_data['user_id']
     user_telegram_id: int = state_data['user_telegram_id']
-    is_banned = user_repository.is_banned(user_telegram_id)
+    is_banned = await user_repository.is_banned(user_telegram_id)
 
     if is_banned:
-        user_repository.unban_by_id(user_id)
+        await user_repository.unban_by_id(user_id)
     else:
-        user_repository.ban_by_id(user_id)
+        await user_repository.ban_by_id(user_id)
 
-    user = user_repository.get_by_id(user_id)
+    user = await user_repository.get_by_id(user_id)
     orders_count = sale_repository.count_by_user_id(user_id)
     view = UserDetailView(user=user, number_of_orders=orders_count)
     await edit_message_by_view(message=callback_query.message, view=view)
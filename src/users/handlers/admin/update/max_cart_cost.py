@@ -35,11 +35,11 @@ async def on_remove_max_cart_cost(
 ) -> None:
     state_data = await state.get_data()
     user_id: int = state_data['user_id']
-    user_repository.update_max_cart_cost(
+    await user_repository.update_max_cart_cost(
         user_id=user_id,
         max_cart_cost=None,
     )
-    user = user_repository.get_by_id(user_id)
+    user = await user_repository.get_by_id(user_id)
     orders_count = sale_repository.count_by_user_id(user_id)
     view = UserDetailView(user=user, number_of_orders=orders_count)
     await edit_message_by_view(message=callback_query.message, view=view)
@@ -54,11 +54,11 @@ async def on_new_max_cart_cost_input(
     max_cart_cost = parse_balance_amount(message.text)
     state_data = await state.get_data()
     user_id: int = state_data['user_id']
-    user_repository.update_max_cart_cost(
+    await user_repository.update_max_cart_cost(
         user_id=user_id,
         max_cart_cost=max_cart_cost,
     )
-    user = user_repository.get_by_id(user_id)
+    user = await user_repository.get_by_id(user_id)
     orders_count = sale_repository.count_by_user_id(user_id)
     view = UserDetailView(user=user, number_of_orders=orders_count)
     await answer_view(message=message, view=view)
@@ -56,7 +56,7 @@ async def on_permanent_discount_granting_reason_choice(
     reason: str = callback_query.data
     await UserGrantPermanentDiscountStates.confirm.set()
     await state.update_data(reason=reason)
-    user = user_repository.get_by_id(user_id)
+    user = await user_repository.get_by_id(user_id)
     view = UserPermanentDiscountGrantingConfirmView(
         user=user,
         reason=reason,
@@ -75,11 +75,11 @@ async def on_permanent_discount_grant_confirm(
     await state.finish()
     user_id: int = state_data['user_id']
     permanent_discount: int = state_data['permanent_discount']
-    user_repository.update_permanent_discount(
+    await user_repository.update_permanent_discount(
         user_id=user_id,
         permanent_discount=permanent_discount,
     )
-    user = user_repository.get_by_id(user_id)
+    user = await user_repository.get_by_id(user_id)
     orders_count = sale_repository.count_by_user_id(user_id)
     view = UserDetailView(user=user, number_of_orders=orders_count)
     await edit_message_by_view(message=callback_query.message, view=view)
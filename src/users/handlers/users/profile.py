@@ -4,7 +4,8 @@ from aiogram.types import Message
 
 from common.views import answer_view
 from sales.repositories import SaleRepository
-from users.repositories import UserRepository
+from users.exceptions import UserNotInDatabase
+from users.models import User
 from users.views import UserProfileView
 
 __all__ = ('on_show_profile_menu',)
@@ -12,10 +13,11 @@ __all__ = ('on_show_profile_menu',)
 
 async def on_show_profile_menu(
         message: Message,
-        user_repository: UserRepository,
+        user: User | None,
         sale_repository: SaleRepository
 ) -> None:
-    user = user_repository.get_by_telegram_id(message.from_user.id)
+    if user is None:
+        raise UserNotInDatabase
     total_orders_count = sale_repository.count_by_user_id(user.id)
     total_orders_cost = sale_repository.calculate_total_cost_by_user_id(user.id)
     view = UserProfileView(
@@ -6,7 +6,7 @@ import database
 from common.filters import AdminFilter
 from common.models import Buyer
 from common.views import answer_view
-from database import queries, session_factory
+from database import queries
 from sales.repositories import SaleRepository
 from users.repositories import UserRepository
 from users.views import UserStatisticsMenuView, UserGeneralStatisticsView
@@ -18,10 +18,10 @@ async def on_show_user_statistics_menu(message: Message) -> None:
 
 async def on_show_user_general_statistics(
         message: Message,
+        user_repository: UserRepository,
         sale_repository: SaleRepository,
 ) -> None:
-    user_repository = UserRepository(session_factory)
-    buyers_count = user_repository.get_total_count()
+    buyers_count = await user_repository.get_total_count()
     total_orders_count = sale_repository.count_all()
     total_orders_cost = sale_repository.calculate_total_cost()
 
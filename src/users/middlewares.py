@@ -1,4 +1,3 @@
-from collections.abc import Iterable
 from typing import Protocol
 
 from aiogram.dispatcher.handler import CancelHandler
@@ -7,35 +6,75 @@ from aiogram.dispatcher.middlewares import (
 )
 from aiogram.types import CallbackQuery, Message
 
+from common.admins import AdminTelegramIds
+from users.models import User
+
 __all__ = (
-    'AdminIdentifierMiddleware',
-    'BannedUserMiddleware',
+    'UserContextMiddleware',
+    'UserReachabilityMiddleware',
 )
 
 
-class HasIsUserBannedMethod(Protocol):
+class HasUserContextMethods(Protocol):
+
+    async def is_banned(self, telegram_id: int) -> bool: ...
+
+    async def get_cached_by_telegram_id(
+            self,
+            telegram_id: int,
+    ) -> User | None: ...
+
+
+class HasMarkReachableMethod(Protocol):
+
+    async def mark_reachable(self, telegram_id: int) -> None: ...
 
-    def is_banned(self, telegram_id: int) -> bool: ...
 
+class UserContextMiddleware(LifetimeControllerMiddleware):
+    """Put user, admin status and ban status into handler data.
 
-class AdminIdentifierMiddleware(LifetimeControllerMiddleware):
-    skip_patterns = ("error", "update",)
+    User is loaded once per update (or taken from the user cache),
+    so handlers do not query it again. `user` is None if the user
+    has not registered yet. Updates from banned users are dropped
+    before the user is loaded.
 
-    def __init__(self, admin_telegram_ids: Iterable[int]):
+    Admin set is shared with `common.filters.AdminFilter` through
+    `is_admin` and is replaced at runtime by reloading
+    `admin_telegram_ids`.
+    """
+    skip_patterns = ('update', 'error')
+
+    def __init__(
+            self,
+            *,
+            user_repository: HasUserContextMethods,
+            admin_telegram_ids: AdminTelegramIds,
+    ):
         super().__init__()
-        self.__admin_telegram_ids = set(admin_telegram_ids)
+        self.__user_repository = user_repository
+        self.__admin_telegram_ids = admin_telegram_ids
 
     async def pre_process(self, obj: Message | CallbackQuery, data, *args):
-        data['is_admin'] = obj.from_user.id in self.__admin_telegram_ids
+        telegram_id = obj.from_user.id
+        is_banned = await self.__user_repository.is_banned(telegram_id)
+        data['is_banned'] = is_banned
+        if is_banned:
+            raise CancelHandler
+        data['is_admin'] = telegram_id in self.__admin_telegram_ids
+        data['user'] = (
+            await self.__user_repository.get_cached_by_telegram_id(
+                telegram_id,
+            )
+        )
 
 
-class BannedUserMiddleware(LifetimeControllerMiddleware):
+class UserReachabilityMiddleware(LifetimeControllerMiddleware):
+    """Return user to mailings once they write to the bot again."""
     skip_patterns = ('update', 'error')
 
-    def __init__(self, user_repository: HasIsUserBannedMethod):
+    def __init__(self, user_repository: HasMarkReachableMethod):
         super().__init__()
         self.__user_repository = user_repository
 
     async def pre_process(self, obj: Message | CallbackQuery, data, *args):
-        if self.__user_repository.is_banned(obj.from_user.id):
-            raise CancelHandler
+        await self.__user_repository.mark_reachable(obj.from_user.id)
@@ -1,21 +1,145 @@
-from collections.abc import Iterable
+from collections.abc import AsyncIterator, Iterable
+from datetime import datetime
 from decimal import Decimal
 
-from sqlalchemy import select, func, delete, update
+import structlog
+from sqlalchemy import select, func, delete, update, exists
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from structlog.stdlib import BoundLogger
 
-from common.repositories import BaseRepository
-from database.schemas import User
+from common.repositories import AsyncBaseRepository
+from database.schemas import CartProduct, MailingSegment, Sale, User
 from users import models as users_models
+from users.cache import UserCache
 from users.exceptions import UserNotInDatabase
 
 __all__ = ('UserRepository',)
 
+logger: BoundLogger = structlog.get_logger('app')
 
-class UserRepository(BaseRepository):
 
-    def get_by_id(self, user_id: int) -> users_models.User:
-        with self._session_factory() as session:
-            result = session.get(User, user_id)
+class UserRepository(AsyncBaseRepository):
+    """Users storage.
+
+    Telegram IDs of banned users are kept in memory once
+    `load_banned_telegram_ids` has been called, so `is_banned`
+    is answered without querying the database. The same is done
+    for unreachable users by `load_unreachable_telegram_ids`,
+    so `mark_reachable` writes only if the user was unreachable.
+
+    If user cache is provided, `get_cached_by_telegram_id` serves
+    users from it and every change of a user invalidates the entry.
+    """
+
+    def __init__(
+            self,
+            session_factory: async_sessionmaker,
+            user_cache: UserCache | None = None,
+    ):
+        super().__init__(session_factory)
+        self.__user_cache = user_cache
+        self.__banned_telegram_ids: set[int] | None = None
+        self.__banned_telegram_ids_changes_count = 0
+        self.__unreachable_telegram_ids: set[int] | None = None
+
+    def __invalidate_cached_user(self, user_id: int) -> None:
+        if self.__user_cache is not None:
+            self.__user_cache.invalidate_by_id(user_id)
+
+    def __set_banned(self, telegram_id: int, is_banned: bool) -> None:
+        if self.__banned_telegram_ids is None:
+            return
+        self.__banned_telegram_ids_changes_count += 1
+        if is_banned:
+            self.__banned_telegram_ids.add(telegram_id)
+        else:
+            self.__banned_telegram_ids.discard(telegram_id)
+
+    async def load_banned_telegram_ids(self) -> None:
+        """Load (or resync) in-memory set of banned users' Telegram IDs.
+
+        If user is banned or unbanned while the set is being loaded,
+        the loaded set may be stale already, so it is dropped and
+        the current one is kept until the next resync.
+        """
+        changes_count = self.__banned_telegram_ids_changes_count
+        statement = select(User.telegram_id).where(User.is_banned.is_(True))
+        async with self._session_factory() as session:
+            banned_telegram_ids = set((await session.scalars(statement)).all())
+        if (
+                self.__banned_telegram_ids is not None
+                and changes_count != self.__banned_telegram_ids_changes_count
+        ):
+            logger.info('Banned users resync skipped due to concurrent update')
+            return
+        self.__banned_telegram_ids = banned_telegram_ids
+        logger.debug(
+            'Banned users loaded',
+            banned_users_count=len(banned_telegram_ids),
+        )
+
+    async def load_unreachable_telegram_ids(self) -> None:
+        statement = (
+            select(User.telegram_id)
+            .where(User.is_reachable.is_(False))
+        )
+        async with self._session_factory() as session:
+            self.__unreachable_telegram_ids = set(
+                (await session.scalars(statement)).all()
+            )
+        logger.debug(
+            'Unreachable users loaded',
+            unreachable_users_count=len(self.__unreachable_telegram_ids),
+        )
+
+    async def mark_unreachable(self, telegram_ids: Iterable[int]) -> None:
+        """Exclude users from mailings until they write to the bot again.
+
+        Args:
+            telegram_ids: Telegram IDs of users who blocked the bot
+                          or whose accounts have been deleted.
+        """
+        telegram_ids = list(telegram_ids)
+        if not telegram_ids:
+            return
+        async with self._session_factory() as session:
+            async with session.begin():
+                for batch_start in range(0, len(telegram_ids), 500):
+                    await session.execute(
+                        update(User)
+                        .where(
+                            User.telegram_id.in_(
+                                telegram_ids[batch_start:batch_start + 500],
+                            ),
+                        )
+                        .values(is_reachable=False)
+                    )
+        if self.__unreachable_telegram_ids is not None:
+            self.__unreachable_telegram_ids.update(telegram_ids)
+
+    async def mark_reachable(self, telegram_id: int) -> None:
+        if (
+                self.__unreachable_telegram_ids is not None
+                and telegram_id not in self.__unreachable_telegram_ids
+        ):
+            return
+        statement = (
+            update(User)
+            .where(
+                User.telegram_id == telegram_id,
+                User.is_reachable.is_(False),
+            )
+            .values(is_reachable=True)
+        )
+        async with self._session_factory() as session:
+            async with session.begin():
+                await session.execute(statement)
+        if self.__unreachable_telegram_ids is not None:
+            self.__unreachable_telegram_ids.discard(telegram_id)
+
+    async def get_by_id(self, user_id: int) -> users_models.User:
+        async with self._session_factory() as session:
+            result = await session.get(User, user_id)
         if result is None:
             raise UserNotInDatabase
         return users_models.User(
@@ -29,13 +153,16 @@ class UserRepository(BaseRepository):
             permanent_discount=result.permanent_discount,
         )
 
-    def get_by_telegram_id(self, telegram_id: int) -> users_models.User:
+    async def get_by_telegram_id(self, telegram_id: int) -> users_models.User:
+        cache_version = (
+            None if self.__user_cache is None else self.__user_cache.version
+        )
         statement = select(User).where(User.telegram_id == telegram_id)
-        with self._session_factory() as session:
-            result = session.scalar(statement)
+        async with self._session_factory() as session:
+            result = await session.scalar(statement)
         if result is None:
             raise UserNotInDatabase
-        return users_models.User(
+        user = users_models.User(
             id=result.id,
             telegram_id=result.telegram_id,
             username=result.username,
@@ -45,18 +172,41 @@ class UserRepository(BaseRepository):
             max_cart_cost=result.max_cart_cost,
             permanent_discount=result.permanent_discount,
         )
+        if self.__user_cache is not None:
+            self.__user_cache.put(user, version=cache_version)
+        return user
+
+    async def get_cached_by_telegram_id(
+            self,
+            telegram_id: int,
+    ) -> users_models.User | None:
+        """Get user from cache, or from the database on cache miss.
+
+        Returns:
+            User or None if user is not registered yet.
+        """
+        if self.__user_cache is not None:
+            user = self.__user_cache.get(telegram_id)
+            if user is not None:
+                return user
+        try:
+            return await self.get_by_telegram_id(telegram_id)
+        except UserNotInDatabase:
+            return None
 
-    def create(
+    async def create(
             self,
             *,
             telegram_id: int,
             username: str | None = None,
     ) -> users_models.User:
         user = User(telegram_id=telegram_id, username=username)
-        with self._session_factory() as session:
-            with session.begin():
-                session.merge(user)
-        return users_models.User(
+        async with self._session_factory() as session:
+            async with session.begin():
+                user = await session.merge(user)
+                await session.flush()
+                await session.refresh(user)
+        user = users_models.User(
             id=user.id,
             telegram_id=user.telegram_id,
             username=user.username,
@@ -66,59 +216,82 @@ class UserRepository(BaseRepository):
             max_cart_cost=user.max_cart_cost,
             permanent_discount=user.permanent_discount,
         )
+        if self.__user_cache is not None:
+            self.__user_cache.put(user, version=self.__user_cache.version)
+        return user
 
-    def delete_by_id(self, user_id: int) -> bool:
-        statement = delete(User).where(User.id == user_id)
-        with self._session_factory() as session:
-            with session.begin():
-                result = session.execute(statement)
-        return bool(result.rowcount)
+    async def delete_by_id(self, user_id: int) -> bool:
+        statement = (
+            delete(User)
+            .where(User.id == user_id)
+            .returning(User.telegram_id)
+        )
+        async with self._session_factory() as session:
+            async with session.begin():
+                telegram_id = await session.scalar(statement)
+        if telegram_id is None:
+            return False
+        self.__set_banned(telegram_id, False)
+        self.__invalidate_cached_user(user_id)
+        return True
 
-    def get_total_balance(self) -> Decimal:
+    async def get_total_balance(self) -> Decimal:
         statement = select(func.sum(User.balance))
-        with self._session_factory() as session:
-            row = session.execute(statement).first()
+        async with self._session_factory() as session:
+            row = (await session.execute(statement)).first()
         return Decimal('0') if row is None else row[0]
 
-    def get_total_count(self) -> int:
+    async def get_total_count(self) -> int:
         statement = select(func.count(User.id))
-        with self._session_factory() as session:
-            result = session.execute(statement).first()
+        async with self._session_factory() as session:
+            result = (await session.execute(statement)).first()
         return result[0]
 
-    def ban_by_id(self, user_id: int) -> bool:
+    async def ban_by_id(self, user_id: int) -> bool:
         statement = (
             update(User)
             .where(User.id == user_id)
             .values(is_banned=True)
+            .returning(User.telegram_id)
         )
-        with self._session_factory() as session:
-            with session.begin():
-                result = session.execute(statement)
-        return bool(result.rowcount)
+        async with self._session_factory() as session:
+            async with session.begin():
+                telegram_id = await session.scalar(statement)
+        if telegram_id is None:
+            return False
+        self.__set_banned(telegram_id, True)
+        self.__invalidate_cached_user(user_id)
+        return True
 
-    def unban_by_id(self, user_id: int) -> bool:
+    async def unban_by_id(self, user_id: int) -> bool:
         statement = (
             update(User)
             .where(User.id == user_id)
             .values(is_banned=False)
+            .returning(User.telegram_id)
         )
-        with self._session_factory() as session:
-            with session.begin():
-                result = session.execute(statement)
-        return bool(result.rowcount)
+        async with self._session_factory() as session:
+            async with session.begin():
+                telegram_id = await session.scalar(statement)
+        if telegram_id is None:
+            return False
+        self.__set_banned(telegram_id, False)
+        self.__invalidate_cached_user(user_id)
+        return True
 
-    def is_banned(self, telegram_id: int) -> bool:
+    async def is_banned(self, telegram_id: int) -> bool:
+        if self.__banned_telegram_ids is not None:
+            return telegram_id in self.__banned_telegram_ids
         statement = (
             select(User.is_banned)
             .where(User.telegram_id == telegram_id)
         )
-        with self._session_factory() as session:
-            row = session.execute(statement).first()
+        async with self._session_factory() as session:
+            row = (await session.execute(statement)).first()
 
         return row is not None and row[0]
 
-    def get_by_usernames_and_ids(
+    async def get_by_usernames_and_ids(
             self,
             *,
             usernames: Iterable[str] | None = None,
@@ -146,8 +319,8 @@ class UserRepository(BaseRepository):
             statement = statement.where(User.username.in_(usernames))
         if user_ids is not None:
             statement = statement.where(User.id.in_(user_ids))
-        with self._session_factory() as session:
-            users = session.scalars(statement).all()
+        async with self._session_factory() as session:
+            users = (await session.scalars(statement)).all()
         return [
             users_models.User(
                 id=user.id,
@@ -161,7 +334,7 @@ class UserRepository(BaseRepository):
             ) for user in users
         ]
 
-    def top_up_balance(
+    async def top_up_balance(
             self,
             *,
             user_id: int,
@@ -172,11 +345,12 @@ class UserRepository(BaseRepository):
             .where(User.id == user_id)
             .values(balance=User.balance + amount_to_top_up)
         )
-        with self._session_factory() as session:
-            with session.begin():
-                session.execute(statement)
+        async with self._session_factory() as session:
+            async with session.begin():
+                await session.execute(statement)
+        self.__invalidate_cached_user(user_id)
 
-    def update_balance(
+    async def update_balance(
             self,
             *,
             user_id: int,
@@ -187,11 +361,12 @@ class UserRepository(BaseRepository):
             .where(User.id == user_id)
             .values(balance=amount_to_set)
         )
-        with self._session_factory() as session:
-            with session.begin():
-                session.execute(statement)
+        async with self._session_factory() as session:
+            async with session.begin():
+                await session.execute(statement)
+        self.__invalidate_cached_user(user_id)
 
-    def update_max_cart_cost(
+    async def update_max_cart_cost(
             self,
             *,
             user_id: int,
@@ -202,11 +377,12 @@ class UserRepository(BaseRepository):
             .where(User.id == user_id)
             .values(max_cart_cost=max_cart_cost)
         )
-        with self._session_factory() as session:
-            with session.begin():
-                session.execute(statement)
+        async with self._session_factory() as session:
+            async with session.begin():
+                await session.execute(statement)
+        self.__invalidate_cached_user(user_id)
 
-    def update_permanent_discount(
+    async def update_permanent_discount(
             self,
             *,
             user_id: int,
@@ -217,12 +393,83 @@ class UserRepository(BaseRepository):
             .where(User.id == user_id)
             .values(permanent_discount=permanent_discount)
         )
-        with self._session_factory() as session:
-            with session.begin():
-                session.execute(statement)
+        async with self._session_factory() as session:
+            async with session.begin():
+                await session.execute(statement)
+        self.__invalidate_cached_user(user_id)
+
+    async def iter_mailing_recipients(
+            self,
+            *,
+            segment: MailingSegment = MailingSegment.ALL,
+            registered_after: datetime | None = None,
+            after_user_id: int = 0,
+            page_size: int = 500,
+    ) -> AsyncIterator[list[tuple[int, int]]]:
+        """Iterate over reachable users of segment in pages ordered by ID.
+
+        Every page is retrieved by its own keyset query, so memory does
+        not depend on the number of users and no read transaction is
+        held open between pages (it would block SQLite writers).
+
+        Args:
+            segment: Users to retrieve.
+            registered_after: Registration date for REGISTERED_AFTER segment.
+            after_user_id: Only users with greater ID are retrieved,
+                           used to resume from checkpoint.
+            page_size: Max number of users in page.
+
+        Returns:
+            Async iterator of pages of (user ID, Telegram ID) pairs.
+        """
+        statement = (
+            select(User.id, User.telegram_id)
+            .where(User.is_reachable.is_(True))
+            .order_by(User.id)
+            .limit(page_size)
+        )
+        if segment == MailingSegment.BUYERS:
+            statement = statement.where(
+                exists().where(Sale.user_id == User.id),
+            )
+        elif segment == MailingSegment.WITH_BALANCE:
+            statement = statement.where(User.balance > 0)
+        elif segment == MailingSegment.WITH_CART:
+            statement = statement.where(
+                exists().where(
+                    CartProduct.user_id == User.id,
+                    CartProduct.quantity > 0,
+                ),
+            )
+        elif segment == MailingSegment.REGISTERED_AFTER:
+            if registered_after is None:
+                raise ValueError('Registration date is required')
+            statement = statement.where(User.created_at >= registered_after)
+            # Users are registered in order of their IDs, so pages start
+            # from the first user found by registration date index
+            # instead of scanning all users registered before the date.
+            first_user_id_statement = (
+                select(User.id)
+                .where(User.created_at >= registered_after)
+                .order_by(User.created_at, User.id)
+                .limit(1)
+            )
+            async with self._session_factory() as session:
+                first_user_id = await session.scalar(first_user_id_statement)
+            if first_user_id is None:
+                return
+            after_user_id = max(after_user_id, first_user_id - 1)
 
-    def get_all_telegram_ids(self) -> list[int]:
-        statement = select(User.telegram_id)
-        with self._session_factory() as session:
-            rows = session.execute(statement).all()
-        return [row[0] for row in rows]
+        while True:
+            async with self._session_factory() as session:
+                rows = (
+                    await session.execute(
+                        statement.where(User.id > after_user_id),
+                    )
+                ).all()
+            if not rows:
+                return
+            yield [(user_id, telegram_id) for user_id, telegram_id in rows]
+            if len(rows) < page_size:
+                return
+            after_user_id = rows[-1][0]
@@ -0,0 +1,74 @@
+from collections.abc import Callable
+from decimal import Decimal
+
+import pytest
+import sqlalchemy
+from sqlalchemy.orm import sessionmaker
+
+from database import schemas
+from database.engine import ENGINE_PROFILES, apply_engine_profile
+from database.schemas.base import Base
+
+
+@pytest.fixture
+def session_factory(tmp_path) -> sessionmaker:
+    """Session factory of a new SQLite database file with all tables."""
+    engine = sqlalchemy.create_engine(f'sqlite:///{tmp_path / "database.db"}')
+    apply_engine_profile(engine, ENGINE_PROFILES['tuned'])
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine, expire_on_commit=False)
+    engine.dispose()
+
+
+@pytest.fixture
+def create_product(session_factory) -> Callable[..., int]:
+    """Create product in its own category and return product's ID."""
+
+    def create(
+            *,
+            quantity: int = 0,
+            min_order_quantity: int | None = None,
+            max_order_quantity: int | None = None,
+    ) -> int:
+        with session_factory() as session, session.begin():
+            category = schemas.Category(
+                name='Category',
+                priority=0,
+                max_displayed_stock_count=0,
+                is_hidden=False,
+                can_be_seen=True,
+            )
+            session.add(category)
+            session.flush()
+            product = schemas.Product(
+                category_id=category.id,
+                name='Product',
+                description='Product',
+                price=Decimal('1.00'),
+                quantity=quantity,
+                min_order_quantity=min_order_quantity,
+                max_order_quantity=max_order_quantity,
+                max_replacement_time_in_minutes=15,
+                is_duplicated_stock_entries_allowed=False,
+                is_hidden=False,
+                can_be_purchased=True,
+            )
+            session.add(product)
+            session.flush()
+            return product.id
+
+    return create
+
+
+@pytest.fixture
+def create_user(session_factory) -> Callable[[int], int]:
+    """Create user with Telegram ID and return user's ID."""
+
+    def create(telegram_id: int) -> int:
+        with session_factory() as session, session.begin():
+            user = schemas.User(telegram_id=telegram_id)
+            session.add(user)
+            session.flush()
+            return user.id
+
+    return create
@@ -0,0 +1,27 @@
+from collections.abc import Callable
+
+import pytest
+from sqlalchemy import func, select
+
+from database import schemas
+
+
+@pytest.fixture
+def get_quantities(session_factory) -> Callable[[int], tuple[int, int]]:
+    """Get product's quantity in stock and quantity reserved in carts."""
+
+    def get(product_id: int) -> tuple[int, int]:
+        with session_factory() as session:
+            product_quantity = session.scalar(
+                select(schemas.Product.quantity)
+                .where(schemas.Product.id == product_id)
+            )
+            reserved_quantity = session.scalar(
+                select(
+                    func.coalesce(func.sum(schemas.CartProduct.quantity), 0),
+                )
+                .where(schemas.CartProduct.product_id == product_id)
+            )
+        return product_quantity, reserved_quantity
+
+    return get
@@ -0,0 +1,166 @@
+import asyncio
+from decimal import Decimal
+
+from aiogram.utils.exceptions import MessageNotModified
+
+from cart.debouncer import CartQuantityChangeDebouncer
+from cart.exceptions import (
+    CartProductDoesNotExistError,
+    ProductQuantityOutOfRangeError,
+)
+from cart.models import CartProduct, Product, QuantityChangeDebouncerStats
+
+
+class CartRepositoryStub:
+
+    def __init__(self, quantities: dict[int, int], max_quantity: int):
+        self.quantities = quantities
+        self.max_quantity = max_quantity
+        self.quantity_deltas: list[int] = []
+
+    def get_cart_products(self, *, user_telegram_id: int) -> list[CartProduct]:
+        return [
+            CartProduct(
+                id=cart_product_id,
+                product=Product(
+                    id=cart_product_id,
+                    name='Product',
+                    price=Decimal('1.00'),
+                ),
+                quantity=quantity,
+            )
+            for cart_product_id, quantity in self.quantities.items()
+        ]
+
+    def change_quantity(
+            self,
+            *,
+            cart_product_id: int,
+            user_telegram_id: int,
+            quantity_delta: int,
+    ) -> list[CartProduct]:
+        self.quantity_deltas.append(quantity_delta)
+        if cart_product_id not in self.quantities:
+            raise CartProductDoesNotExistError(cart_product_id=cart_product_id)
+        quantity = self.quantities[cart_product_id] + quantity_delta
+        if not 0 <= quantity <= self.max_quantity:
+            raise ProductQuantityOutOfRangeError(product_id=cart_product_id)
+        self.quantities[cart_product_id] = quantity
+        return self.get_cart_products(user_telegram_id=user_telegram_id)
+
+
+class MessageStub:
+
+    def __init__(self, *, is_modified: bool = True, edit_delay: float = 0):
+        self.is_modified = is_modified
+        self.edit_delay = edit_delay
+        self.texts: list[str] = []
+
+    async def edit_text(self, *, text: str, reply_markup) -> None:
+        await asyncio.sleep(self.edit_delay)
+        self.texts.append(text)
+        if not self.is_modified:
+            raise MessageNotModified('Message is not modified')
+
+
+def test_rapid_changes_are_applied_as_one_write():
+    cart_repository = CartRepositoryStub({1: 1}, max_quantity=10)
+    message = MessageStub()
+
+    async def main() -> CartQuantityChangeDebouncer:
+        debouncer = CartQuantityChangeDebouncer(cart_repository, delay=0.05)
+        for quantity_delta in (1, 1, 1, -1, 1):
+            debouncer.add(
+                message=message,
+                user_telegram_id=100,
+                cart_product_id=1,
+                quantity_delta=quantity_delta,
+            )
+            await asyncio.sleep(0.01)
+        assert cart_repository.quantity_deltas == []
+        await asyncio.sleep(0.1)
+        return debouncer
+
+    debouncer = asyncio.run(main())
+
+    assert cart_repository.quantity_deltas == [3]
+    assert cart_repository.quantities == {1: 4}
+    assert message.texts == ['Total items: 4 / Total Amount: $4.00']
+    assert debouncer.get_stats() == QuantityChangeDebouncerStats(
+        changes_count=5,
+        writes_count=1,
+        edits_count=1,
+        pending_users_count=0,
+    )
+
+
+def test_net_change_is_reduced_to_allowed_range():
+    cart_repository = CartRepositoryStub({1: 1, 2: 2}, max_quantity=3)
+    message = MessageStub()
+
+    async def main() -> None:
+        debouncer = CartQuantityChangeDebouncer(cart_repository, delay=0.05)
+        for cart_product_id, quantity_delta in (
+                (1, 1), (1, 1), (1, 1), (1, 1),
+                (2, -1), (2, -1), (2, -1),
+                (3, 1),
+        ):
+            debouncer.add(
+                message=message,
+                user_telegram_id=100,
+                cart_product_id=cart_product_id,
+                quantity_delta=quantity_delta,
+            )
+        await asyncio.sleep(0.1)
+
+    asyncio.run(main())
+
+    assert cart_repository.quantities == {1: 3, 2: 0}
+    assert message.texts == ['Total items: 3 / Total Amount: $3.00']
+
+
+def test_changes_of_different_users_are_independent():
+    cart_repository = CartRepositoryStub({1: 0}, max_quantity=10)
+    messages = {100: MessageStub(), 101: MessageStub(is_modified=False)}
+
+    async def main() -> None:
+        debouncer = CartQuantityChangeDebouncer(cart_repository, delay=0.05)
+        for user_telegram_id, message in messages.items():
+            debouncer.add(
+                message=message,
+                user_telegram_id=user_telegram_id,
+                cart_product_id=1,
+                quantity_delta=1,
+            )
+        await asyncio.sleep(0.1)
+
+    asyncio.run(main())
+
+    assert cart_repository.quantity_deltas == [1, 1]
+    assert [len(message.texts) for message in messages.values()] == [1, 1]
+
+
+def test_pending_changes_are_applied_on_shutdown():
+    cart_repository = CartRepositoryStub({1: 0}, max_quantity=10)
+    messages = {
+        100: MessageStub(edit_delay=0.1),
+        101: MessageStub(edit_delay=0.1),
+    }
+
+    async def main() -> None:
+        debouncer = CartQuantityChangeDebouncer(cart_repository, delay=0.05)
+        for user_telegram_id, message in messages.items():
+            debouncer.add(
+                message=message,
+                user_telegram_id=user_telegram_id,
+                cart_product_id=1,
+                quantity_delta=1,
+            )
+        await debouncer.shutdown()
+        assert debouncer.get_stats().pending_users_count == 0
+        await asyncio.sleep(0.1)
+
+    asyncio.run(main())
+
+    assert cart_repository.quantities == {1: 2}
+    assert [len(message.texts) for message in messages.values()] == [1, 1]
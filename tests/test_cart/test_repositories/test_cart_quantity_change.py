@@ -0,0 +1,120 @@
+import random
+import threading
+
+import pytest
+
+from cart.exceptions import (
+    CartProductDoesNotExistError,
+    NotEnoughProductQuantityError,
+    ProductQuantityOutOfRangeError,
+)
+from cart.repositories import CartRepository
+
+
+def test_change_quantity_checks_stock_and_order_limits(
+        session_factory,
+        create_product,
+        create_user,
+        get_quantities,
+):
+    product_id = create_product(quantity=3, max_order_quantity=2)
+    user_id = create_user(telegram_id=100)
+    create_user(telegram_id=101)
+    repository = CartRepository(session_factory)
+    repository.create(user_id=user_id, product_id=product_id, quantity=1)
+    cart_product_id = repository.get_cart_products(user_telegram_id=100)[0].id
+
+    cart_products = repository.change_quantity(
+        cart_product_id=cart_product_id,
+        user_telegram_id=100,
+        quantity_delta=1,
+    )
+    assert [cart_product.quantity for cart_product in cart_products] == [2]
+
+    with pytest.raises(ProductQuantityOutOfRangeError):
+        repository.change_quantity(
+            cart_product_id=cart_product_id,
+            user_telegram_id=100,
+            quantity_delta=1,
+        )
+    with pytest.raises(NotEnoughProductQuantityError):
+        repository.change_quantity(
+            cart_product_id=cart_product_id,
+            user_telegram_id=100,
+            quantity_delta=2,
+        )
+    with pytest.raises(ProductQuantityOutOfRangeError):
+        repository.change_quantity(
+            cart_product_id=cart_product_id,
+            user_telegram_id=100,
+            quantity_delta=-3,
+        )
+    with pytest.raises(CartProductDoesNotExistError):
+        repository.change_quantity(
+            cart_product_id=cart_product_id,
+            user_telegram_id=101,
+            quantity_delta=1,
+        )
+    with pytest.raises(NotEnoughProductQuantityError):
+        repository.create(user_id=user_id, product_id=product_id, quantity=2)
+
+    assert get_quantities(product_id) == (1, 2)
+
+
+def test_concurrent_quantity_changes_never_oversell(
+        session_factory,
+        create_product,
+        create_user,
+        get_quantities,
+):
+    initial_quantity = 30
+    product_id = create_product(quantity=initial_quantity)
+    repository = CartRepository(session_factory)
+    telegram_ids = list(range(100, 108))
+    for telegram_id in telegram_ids:
+        user_id = create_user(telegram_id)
+        repository.create(user_id=user_id, product_id=product_id)
+    expected_cart_quantities: dict[int, int] = {}
+    errors: list[Exception] = []
+
+    def change_quantities(telegram_id: int) -> None:
+        randomizer = random.Random(telegram_id)
+        cart_product_id = repository.get_cart_products(
+            user_telegram_id=telegram_id,
+        )[0].id
+        quantity = 0
+        for _ in range(60):
+            quantity_delta = randomizer.choice((1, 1, 1, 2, -1))
+            try:
+                cart_products = repository.change_quantity(
+                    cart_product_id=cart_product_id,
+                    user_telegram_id=telegram_id,
+                    quantity_delta=quantity_delta,
+                )
+            except (
+                    NotEnoughProductQuantityError,
+                    ProductQuantityOutOfRangeError,
+            ):
+                continue
+            except Exception as error:
+                errors.append(error)
+                continue
+            quantity += quantity_delta
+            if cart_products[0].quantity != quantity:
+                errors.append(AssertionError('Lost cart quantity update'))
+        expected_cart_quantities[telegram_id] = quantity
+
+    threads = [
+        threading.Thread(target=change_quantities, args=(telegram_id,))
+        for telegram_id in telegram_ids
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    product_quantity, reserved_quantity = get_quantities(product_id)
+    assert product_quantity >= 0
+    assert product_quantity + reserved_quantity == initial_quantity
+    assert reserved_quantity == sum(expected_cart_quantities.values())
@@ -0,0 +1,160 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from cart.models import ReleasedReservations, ReservationsSweeperStats
+from cart.repositories import CartRepository
+from cart.services import CartReservationsSweeper
+from database import schemas
+from products.cache import ProductCache
+
+
+def test_expired_reservations_are_returned_to_stock(
+        session_factory,
+        create_product,
+        create_user,
+        get_quantities,
+):
+    first_product_id = create_product(quantity=10)
+    second_product_id = create_product(quantity=10)
+    repository = CartRepository(
+        session_factory,
+        reservation_ttl=timedelta(minutes=30),
+    )
+    for telegram_id in (100, 101, 102):
+        user_id = create_user(telegram_id)
+        repository.create(
+            user_id=user_id,
+            product_id=first_product_id,
+            quantity=2,
+        )
+        repository.create(
+            user_id=user_id,
+            product_id=second_product_id,
+            quantity=1,
+        )
+    with session_factory() as session, session.begin():
+        # reservation made before expiry time was introduced
+        session.execute(
+            update(schemas.CartProduct)
+            .where(
+                schemas.CartProduct.user_id == schemas.User.id,
+                schemas.User.telegram_id == 102,
+                schemas.CartProduct.product_id == second_product_id,
+            )
+            .values(expires_at=None)
+        )
+
+    now = datetime.utcnow()
+    assert repository.release_expired(now=now) == ReleasedReservations(
+        cart_products_count=1,
+        products_count=1,
+        quantity=1,
+    )
+    assert get_quantities(first_product_id) == (4, 6)
+    assert get_quantities(second_product_id) == (8, 2)
+
+    released_reservations = repository.release_expired(
+        now=now + timedelta(minutes=31),
+    )
+    assert released_reservations == ReleasedReservations(
+        cart_products_count=5,
+        products_count=2,
+        quantity=8,
+    )
+    assert get_quantities(first_product_id) == (10, 0)
+    assert get_quantities(second_product_id) == (10, 0)
+    assert repository.release_expired(
+        now=now + timedelta(minutes=31),
+    ) == ReleasedReservations()
+
+
+def test_quantity_change_extends_reservation(
+        session_factory,
+        create_product,
+        create_user,
+        get_quantities,
+):
+    product_id = create_product(quantity=10)
+    user_id = create_user(telegram_id=100)
+    repository = CartRepository(
+        session_factory,
+        reservation_ttl=timedelta(minutes=30),
+    )
+    repository.create(user_id=user_id, product_id=product_id, quantity=1)
+    with session_factory() as session, session.begin():
+        session.execute(
+            update(schemas.CartProduct)
+            .values(expires_at=datetime.utcnow() - timedelta(minutes=1))
+        )
+
+    cart_product_id = repository.get_cart_products(user_telegram_id=100)[0].id
+    repository.change_quantity(
+        cart_product_id=cart_product_id,
+        user_telegram_id=100,
+        quantity_delta=1,
+    )
+
+    assert repository.release_expired() == ReleasedReservations()
+    assert get_quantities(product_id) == (8, 2)
+
+
+def test_cart_deletion_returns_stock_and_invalidates_products(
+        session_factory,
+        create_product,
+        create_user,
+        get_quantities,
+):
+    first_product_id = create_product(quantity=5)
+    second_product_id = create_product(quantity=5)
+    user_id = create_user(telegram_id=100)
+    other_user_id = create_user(telegram_id=101)
+    product_cache = ProductCache(max_size=10)
+    repository = CartRepository(session_factory, product_cache)
+    repository.create(user_id=user_id, product_id=first_product_id, quantity=2)
+    repository.create(
+        user_id=user_id,
+        product_id=second_product_id,
+        quantity=3,
+    )
+    repository.create(
+        user_id=other_user_id,
+        product_id=first_product_id,
+        quantity=1,
+    )
+    version = product_cache.version
+
+    repository.delete_by_user_telegram_id(100)
+
+    assert product_cache.version > version
+    assert get_quantities(first_product_id) == (4, 1)
+    assert get_quantities(second_product_id) == (5, 0)
+
+    cart_product_id = repository.get_cart_products(user_telegram_id=101)[0].id
+    repository.delete_by_id(cart_product_id)
+    repository.delete_by_id(cart_product_id)
+
+    assert get_quantities(first_product_id) == (5, 0)
+
+
+def test_sweeper_keeps_totals():
+
+    class CartRepositoryStub:
+
+        def release_expired(self) -> ReleasedReservations:
+            return ReleasedReservations(
+                cart_products_count=2,
+                products_count=1,
+                quantity=3,
+            )
+
+    sweeper = CartReservationsSweeper(CartRepositoryStub())
+
+    sweeper.sweep()
+    sweeper.sweep()
+
+    assert sweeper.get_stats() == ReservationsSweeperStats(
+        sweeps_count=2,
+        released_cart_products_count=4,
+        released_quantity=6,
+    )
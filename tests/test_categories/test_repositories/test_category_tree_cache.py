@@ -0,0 +1,131 @@
+import asyncio
+import contextlib
+import threading
+
+import pytest
+from sqlalchemy import select
+
+from categories.repositories import CategoryRepository
+from database.schemas import Category
+
+
+def create_category(repository: CategoryRepository, name: str) -> int:
+    category = asyncio.run(
+        repository.create(
+            name=name,
+            priority=0,
+            max_displayed_stock_count=0,
+            is_hidden=False,
+            can_be_seen=True,
+        )
+    )
+    return category.id
+
+
+def test_category_tree_is_cached_until_write(session_factory):
+    repository = CategoryRepository(session_factory)
+    category_id = create_category(repository, 'Category')
+
+    category_tree = asyncio.run(repository.get_category_tree())
+
+    assert asyncio.run(repository.get_category_tree()) is category_tree
+    assert category_tree.get_by_id(category_id).name == 'Category'
+
+    asyncio.run(
+        repository.update_name(
+            category_id=category_id,
+            category_name='Renamed',
+        )
+    )
+    updated_category_tree = asyncio.run(repository.get_category_tree())
+
+    assert updated_category_tree.version > category_tree.version
+    assert updated_category_tree.get_by_id(category_id).name == 'Renamed'
+    assert asyncio.run(repository.get_category_tree()) is updated_category_tree
+
+
+@pytest.mark.parametrize(
+    'write',
+    [
+        lambda repository, category_id: repository.create(
+            name='Another',
+            priority=0,
+            max_displayed_stock_count=0,
+            is_hidden=False,
+            can_be_seen=True,
+        ),
+        lambda repository, category_id: repository.update_icon(
+            category_id=category_id,
+            category_icon='📦',
+        ),
+        lambda repository, category_id: repository.update_priority(
+            category_id=category_id,
+            category_priority=5,
+        ),
+        lambda repository, category_id: repository.update_hidden_status(
+            category_id=category_id,
+            is_hidden=True,
+        ),
+        lambda repository, category_id: repository.delete_by_id(category_id),
+    ],
+    ids=[
+        'create',
+        'update_icon',
+        'update_priority',
+        'update_hidden_status',
+        'delete',
+    ],
+)
+def test_every_write_rebuilds_category_tree(session_factory, write):
+    repository = CategoryRepository(session_factory)
+    category_id = create_category(repository, 'Category')
+    category_tree = asyncio.run(repository.get_category_tree())
+
+    asyncio.run(write(repository, category_id))
+    updated_category_tree = asyncio.run(repository.get_category_tree())
+
+    assert updated_category_tree is not category_tree
+    assert updated_category_tree.version > category_tree.version
+    with session_factory() as session:
+        expected_category_ids = session.scalars(
+            select(Category.id).order_by(Category.id)
+        ).all()
+    assert [
+        category.id for category in updated_category_tree.get_categories()
+    ] == expected_category_ids
+
+
+def test_load_racing_with_write_does_not_cache_stale_tree(session_factory):
+    is_race_armed = False
+
+    @contextlib.contextmanager
+    def racing_session_factory():
+        nonlocal is_race_armed
+        with session_factory() as session:
+            yield session
+        if is_race_armed:
+            is_race_armed = False
+            # categories are already read, but the tree is not cached yet
+            thread = threading.Thread(
+                target=asyncio.run,
+                args=(
+                    repository.update_name(
+                        category_id=category_id,
+                        category_name='Renamed',
+                    ),
+                ),
+            )
+            thread.start()
+            thread.join()
+
+    repository = CategoryRepository(racing_session_factory)
+    category_id = create_category(repository, 'Category')
+
+    is_race_armed = True
+    stale_category_tree = asyncio.run(repository.get_category_tree())
+    category_tree = asyncio.run(repository.get_category_tree())
+
+    assert stale_category_tree.get_by_id(category_id).name == 'Category'
+    assert category_tree is not stale_category_tree
+    assert category_tree.get_by_id(category_id).name == 'Renamed'
+
@@ -0,0 +1,37 @@
+import asyncio
+
+from common.background_tasks import BackgroundTaskQueue
+
+
+def test_background_task_queue_runs_submitted_tasks():
+    results: list[int] = []
+
+    async def task(value: int) -> None:
+        await asyncio.sleep(0.01)
+        if value == 2:
+            raise ValueError('Task failed')
+        results.append(value)
+
+    async def main() -> None:
+        background_task_queue = BackgroundTaskQueue(workers_count=2)
+        background_task_queue.start()
+        for value in range(5):
+            assert background_task_queue.submit(task, value)
+        await background_task_queue.shutdown()
+        assert background_task_queue.queue_depth == 0
+
+    asyncio.run(main())
+
+    assert sorted(results) == [0, 1, 3, 4]
+
+
+def test_background_task_queue_drops_tasks_when_full():
+
+    async def task() -> None:
+        pass
+
+    async def main() -> list[bool]:
+        background_task_queue = BackgroundTaskQueue(max_size=2)
+        return [background_task_queue.submit(task) for _ in range(3)]
+
+    assert asyncio.run(main()) == [True, True, False]
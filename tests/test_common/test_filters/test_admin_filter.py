@@ -0,0 +1,76 @@
+import asyncio
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Message, Update
+
+from common.admins import AdminTelegramIds
+from common.filters import AdminFilter
+from users.middlewares import UserContextMiddleware
+
+
+class UserRepositoryMock:
+
+    async def is_banned(self, telegram_id: int) -> bool:
+        return False
+
+    async def get_cached_by_telegram_id(self, telegram_id: int) -> None:
+        return None
+
+
+def make_update(update_id: int, telegram_id: int) -> Update:
+    return Update(**{
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'from': {'id': telegram_id, 'is_bot': False, 'first_name': 'A'},
+            'chat': {'id': telegram_id, 'type': 'private'},
+            'date': 1700000000,
+            'text': 'Hello',
+        },
+    })
+
+
+def test_admin_filter_uses_middleware_admin_set():
+    handled_by: list[tuple[str, int]] = []
+
+    async def on_admin_message(message: Message) -> None:
+        handled_by.append(('admin', message.from_user.id))
+
+    async def on_user_message(message: Message) -> None:
+        handled_by.append(('user', message.from_user.id))
+
+    async def main() -> None:
+        bot = Bot('123456789:ABCDEFGHIJKLMNOPQRSabcdefghklmnopqrs')
+        dispatcher = Dispatcher(bot)
+        admin_telegram_ids = AdminTelegramIds([1])
+        middleware = UserContextMiddleware(
+            user_repository=UserRepositoryMock(),
+            admin_telegram_ids=admin_telegram_ids,
+        )
+        dispatcher.setup_middleware(middleware)
+        dispatcher.register_message_handler(on_admin_message, AdminFilter())
+        dispatcher.register_message_handler(on_user_message)
+
+        await dispatcher.process_update(make_update(1, telegram_id=1))
+        await dispatcher.process_update(make_update(2, telegram_id=2))
+        admin_telegram_ids.reload([2])
+        await dispatcher.process_update(make_update(3, telegram_id=1))
+        await dispatcher.process_update(make_update(4, telegram_id=2))
+        await (await bot.get_session()).close()
+
+    asyncio.run(main())
+
+    assert handled_by == [
+        ('admin', 1),
+        ('user', 2),
+        ('user', 1),
+        ('admin', 2),
+    ]
+
+
+def test_admin_filter_rejects_updates_without_user_context():
+
+    async def main() -> bool:
+        return await AdminFilter().check(make_update(1, telegram_id=1).message)
+
+    assert asyncio.run(main()) is False
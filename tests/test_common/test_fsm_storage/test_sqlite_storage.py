@@ -0,0 +1,230 @@
+import asyncio
+import datetime
+import sqlite3
+from collections.abc import Awaitable, Callable
+from decimal import Decimal
+
+import pytest
+from aiogram.contrib.fsm_storage.memory import MemoryStorage
+from aiogram.dispatcher import FSMContext
+from aiogram.dispatcher.filters.state import State, StatesGroup
+from aiogram.dispatcher.storage import BaseStorage
+
+from common.fsm_storage import (
+    SQLiteStorage,
+    deserialize_state_data,
+    serialize_state_data,
+)
+from payments.models import PaymentMethod
+
+
+class Form(StatesGroup):
+    name = State()
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def storage_factory(request, tmp_path) -> Callable[[], BaseStorage]:
+    if request.param == 'memory':
+        return MemoryStorage
+    return lambda: SQLiteStorage(tmp_path / 'fsm.db')
+
+
+def run_with_storage(
+        storage_factory: Callable[[], BaseStorage],
+        test: Callable[[BaseStorage], Awaitable[None]],
+) -> None:
+
+    async def main() -> None:
+        storage = storage_factory()
+        try:
+            await test(storage)
+        finally:
+            await storage.close()
+            await storage.wait_closed()
+
+    asyncio.run(main())
+
+
+def test_state(storage_factory):
+
+    async def test(storage: BaseStorage) -> None:
+        assert await storage.get_state(chat=1, user=2) is None
+        await storage.set_state(chat=1, user=2, state=Form.name)
+        assert await storage.get_state(chat=1, user=2) == 'Form:name'
+        assert await storage.get_state(chat=1, user=3) is None
+        assert await storage.get_state(chat='1', user='2') == 'Form:name'
+        await storage.reset_state(chat=1, user=2, with_data=False)
+        assert await storage.get_state(chat=1, user=2) is None
+
+    run_with_storage(storage_factory, test)
+
+
+def test_data(storage_factory):
+
+    async def test(storage: BaseStorage) -> None:
+        assert await storage.get_data(chat=1, user=2) == {}
+        await storage.set_data(chat=1, user=2, data={'a': 1})
+        await storage.update_data(chat=1, user=2, data={'b': 2}, c=3)
+        assert await storage.get_data(chat=1, user=2) == {
+            'a': 1,
+            'b': 2,
+            'c': 3,
+        }
+        assert await storage.get_data(chat=1, user=3) == {}
+
+        data = await storage.get_data(chat=1, user=2)
+        data['a'] = 100
+        assert (await storage.get_data(chat=1, user=2))['a'] == 1
+
+        await storage.set_state(chat=1, user=2, state=Form.name)
+        await storage.reset_state(chat=1, user=2, with_data=False)
+        assert await storage.get_data(chat=1, user=2) != {}
+        await storage.set_state(chat=1, user=2, state=Form.name)
+        await storage.finish(chat=1, user=2)
+        assert await storage.get_state(chat=1, user=2) is None
+        assert await storage.get_data(chat=1, user=2) == {}
+
+    run_with_storage(storage_factory, test)
+
+
+def test_bucket(storage_factory):
+
+    async def test(storage: BaseStorage) -> None:
+        assert storage.has_bucket()
+        assert await storage.get_bucket(chat=1, user=2) == {}
+        await storage.set_bucket(chat=1, user=2, bucket={'a': 1})
+        await storage.update_bucket(chat=1, user=2, b=2)
+        assert await storage.get_bucket(chat=1, user=2) == {'a': 1, 'b': 2}
+        await storage.reset_bucket(chat=1, user=2)
+        assert await storage.get_bucket(chat=1, user=2) == {}
+
+    run_with_storage(storage_factory, test)
+
+
+def test_address_is_required(storage_factory):
+
+    async def test(storage: BaseStorage) -> None:
+        with pytest.raises(ValueError):
+            await storage.get_state()
+        await storage.set_state(chat=5, state=Form.name)
+        assert await storage.get_state(user=5) == 'Form:name'
+
+    run_with_storage(storage_factory, test)
+
+
+def test_fsm_context_proxy(storage_factory):
+
+    async def test(storage: BaseStorage) -> None:
+        context = FSMContext(storage, chat=1, user=2)
+        async with context.proxy() as data:
+            data['units'] = ['a', 'b']
+        await context.set_state(Form.name)
+        assert await context.get_data() == {'units': ['a', 'b']}
+        assert await context.get_state() == 'Form:name'
+
+    run_with_storage(storage_factory, test)
+
+
+def test_states_are_kept_after_reopening(tmp_path):
+    data = {
+        'amount': Decimal('10.50'),
+        'starts_at': datetime.datetime(2024, 1, 1, 12, 30),
+        'permitted_gateways': {PaymentMethod.COINBASE},
+        'units': [f'login{i}:password{i}' for i in range(1000)],
+    }
+
+    async def main() -> None:
+        storage = SQLiteStorage(tmp_path / 'fsm.db')
+        await storage.set_state(chat=1, user=1, state=Form.name)
+        await storage.set_data(chat=1, user=1, data=data)
+        await storage.close()
+
+        storage = SQLiteStorage(tmp_path / 'fsm.db')
+        assert await storage.get_state(chat=1, user=1) == 'Form:name'
+        assert await storage.get_data(chat=1, user=1) == data
+        await storage.close()
+
+    asyncio.run(main())
+
+
+def test_changes_are_written_behind(tmp_path):
+
+    def count_rows() -> int:
+        with sqlite3.connect(tmp_path / 'fsm.db') as connection:
+            return connection.execute(
+                'SELECT COUNT(*) FROM fsm_states'
+            ).fetchone()[0]
+
+    async def main() -> None:
+        storage = SQLiteStorage(tmp_path / 'fsm.db', flush_interval=0.1)
+        for user_id in range(100):
+            await storage.set_state(chat=user_id, state=Form.name)
+            await storage.update_data(chat=user_id, step=1)
+            await storage.update_data(chat=user_id, step=2)
+        assert count_rows() == 0
+        assert storage.get_stats().dirty_records_count == 100
+
+        await asyncio.sleep(0.3)
+        assert count_rows() == 100
+        assert storage.get_stats().dirty_records_count == 0
+
+        for user_id in range(100):
+            await storage.finish(chat=user_id)
+        await storage.flush()
+        assert count_rows() == 0
+        assert storage.get_stats().cached_records_count == 0
+        await storage.close()
+
+    asyncio.run(main())
+
+
+def test_idle_states_are_evicted(tmp_path):
+
+    async def main() -> None:
+        storage = SQLiteStorage(
+            tmp_path / 'fsm.db',
+            state_ttl=0.2,
+            cache_ttl=0,
+        )
+        await storage.set_state(chat=1, state=Form.name)
+        await storage.set_state(chat=2, state=Form.name)
+        await storage.flush()
+        assert storage.get_stats().cached_records_count == 0
+
+        await asyncio.sleep(0.3)
+        await storage.set_state(chat=3, state=Form.name)
+        await storage.flush()
+        assert storage.get_stats().expired_records_count == 2
+        assert await storage.get_state(chat=1) is None
+        assert await storage.get_state(chat=3) == 'Form:name'
+        await storage.close()
+
+    asyncio.run(main())
+
+
+def test_expired_cached_state_is_not_returned(tmp_path):
+
+    async def main() -> None:
+        storage = SQLiteStorage(tmp_path / 'fsm.db', state_ttl=0.1)
+        await storage.set_state(chat=1, state=Form.name)
+        await storage.update_data(chat=1, product_id=1)
+        await asyncio.sleep(0.2)
+        assert await storage.get_state(chat=1) is None
+        assert await storage.get_data(chat=1) == {}
+        await storage.close()
+
+    asyncio.run(main())
+
+
+def test_serialization_compresses_large_payloads():
+    small_data = {'product_id': 1}
+    large_data = {'units': ['login:password'] * 10000}
+
+    serialized_small_data = serialize_state_data(small_data)
+    serialized_large_data = serialize_state_data(large_data)
+
+    assert serialize_state_data({}) is None
+    assert deserialize_state_data(None) == {}
+    assert deserialize_state_data(serialized_small_data) == small_data
+    assert deserialize_state_data(serialized_large_data) == large_data
+    assert len(serialized_large_data) < 1000
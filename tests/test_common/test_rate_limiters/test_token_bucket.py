@@ -0,0 +1,39 @@
+import asyncio
+import time
+
+from common.rate_limiters import TokenBucket
+
+
+def test_token_bucket_allows_burst_up_to_capacity():
+    token_bucket = TokenBucket(rate=10, capacity=5)
+
+    async def main() -> float:
+        started_at = time.monotonic()
+        for _ in range(5):
+            await token_bucket.acquire()
+        return time.monotonic() - started_at
+
+    assert asyncio.run(main()) < 0.05
+
+
+def test_token_bucket_limits_rate():
+    token_bucket = TokenBucket(rate=50, capacity=1)
+
+    async def main() -> float:
+        started_at = time.monotonic()
+        await asyncio.gather(*(token_bucket.acquire() for _ in range(11)))
+        return time.monotonic() - started_at
+
+    assert asyncio.run(main()) >= 0.19
+
+
+def test_token_bucket_pause():
+    token_bucket = TokenBucket(rate=1000, capacity=10)
+
+    async def main() -> float:
+        token_bucket.pause(0.2)
+        started_at = time.monotonic()
+        await token_bucket.acquire()
+        return time.monotonic() - started_at
+
+    assert asyncio.run(main()) >= 0.19
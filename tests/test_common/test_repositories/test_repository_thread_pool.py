@@ -0,0 +1,41 @@
+import asyncio
+import threading
+
+from common.repositories import (
+    BaseRepository,
+    RepositoryThreadPool,
+    run_in_thread_pool,
+)
+
+
+class MockRepository(BaseRepository):
+
+    @run_in_thread_pool
+    def get_thread_name(self) -> str:
+        return threading.current_thread().name
+
+
+def test_run_in_thread_pool_without_thread_pool():
+    repository = MockRepository(lambda: None)
+    thread_name = asyncio.run(repository.get_thread_name())
+    assert thread_name == threading.current_thread().name
+
+
+def test_run_in_thread_pool_with_thread_pool():
+    thread_pool = RepositoryThreadPool(max_workers=2)
+    repository = MockRepository(lambda: None, thread_pool)
+
+    async def main() -> list[str]:
+        return await asyncio.gather(
+            *(repository.get_thread_name() for _ in range(5))
+        )
+
+    thread_names = asyncio.run(main())
+    thread_pool.shutdown()
+
+    assert all(name.startswith('repository') for name in thread_names)
+    assert thread_pool.queue_depth == 0
+    stats, = thread_pool.get_stats()
+    assert stats.method_name == 'MockRepository.get_thread_name'
+    assert stats.calls_count == 5
+    assert stats.max_wait_time >= stats.average_wait_time >= 0
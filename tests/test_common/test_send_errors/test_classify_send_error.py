@@ -0,0 +1,29 @@
+import asyncio
+
+import pytest
+from aiogram.utils.exceptions import (
+    BadRequest,
+    BotBlocked,
+    ChatNotFound,
+    NetworkError,
+    UserDeactivated,
+)
+
+from common.send_errors import SendFailureReason, classify_send_error
+
+
+@pytest.mark.parametrize(
+    'error, expected',
+    [
+        (BotBlocked('Forbidden: bot was blocked by the user'),
+         SendFailureReason.BLOCKED),
+        (UserDeactivated('Forbidden: user is deactivated'),
+         SendFailureReason.DEACTIVATED),
+        (ChatNotFound('Chat not found'), SendFailureReason.DEACTIVATED),
+        (NetworkError('Connection reset'), SendFailureReason.TRANSIENT),
+        (asyncio.TimeoutError(), SendFailureReason.TRANSIENT),
+        (BadRequest('Message is too long'), SendFailureReason.OTHER),
+    ],
+)
+def test_classify_send_error(error, expected):
+    assert classify_send_error(error) == expected
@@ -0,0 +1,156 @@
+import asyncio
+import time
+
+import pytest
+from aiogram.bot.api import TelegramAPIServer
+from aiogram.utils.exceptions import RetryAfter
+from aiohttp import web
+
+from common.send_queue import (
+    OutboundSendQueue,
+    QueuedBot,
+    SendPriority,
+    send_priority,
+)
+
+
+def test_higher_priority_calls_overtake_queued_bulk_calls():
+    send_queue = OutboundSendQueue(global_rate=100, per_chat_rate=1000)
+    granted_priorities: list[SendPriority] = []
+
+    async def send(chat_id: int, priority: SendPriority) -> None:
+        with send_priority(priority):
+            await send_queue.acquire(chat_id)
+        granted_priorities.append(priority)
+
+    async def main() -> None:
+        bulk_tasks = [
+            asyncio.create_task(send(chat_id, SendPriority.BULK))
+            for chat_id in range(200)
+        ]
+        await asyncio.sleep(0.05)
+        await asyncio.gather(
+            send(1000, SendPriority.INTERACTIVE),
+            send(1001, SendPriority.ADMIN),
+            *bulk_tasks,
+        )
+        await send_queue.close()
+
+    asyncio.run(main())
+
+    interactive_position = granted_priorities.index(SendPriority.INTERACTIVE)
+    admin_position = granted_priorities.index(SendPriority.ADMIN)
+    assert interactive_position < admin_position < 120
+    stats = {stats.priority_name: stats for stats in send_queue.get_stats()}
+    assert stats['BULK'].calls_count == 200
+    assert stats['INTERACTIVE'].calls_count == 1
+    assert stats['BULK'].queue_depth == 0
+
+
+def test_per_chat_rate_limit():
+    send_queue = OutboundSendQueue(
+        global_rate=1000,
+        per_chat_rate=10,
+        per_chat_burst=1,
+    )
+
+    async def main() -> tuple[float, float]:
+        started_at = time.monotonic()
+        await asyncio.gather(*(send_queue.acquire(1) for _ in range(3)))
+        same_chat_time = time.monotonic() - started_at
+        started_at = time.monotonic()
+        await asyncio.gather(
+            *(send_queue.acquire(chat_id) for chat_id in (2, 3, 4))
+        )
+        other_chats_time = time.monotonic() - started_at
+        await send_queue.close()
+        return same_chat_time, other_chats_time
+
+    same_chat_time, other_chats_time = asyncio.run(main())
+
+    assert same_chat_time >= 0.19
+    assert other_chats_time < 0.1
+
+
+def run_with_stand_in_server(test) -> None:
+    """Run test with bot talking to local server standing in for Bot API."""
+    requested_methods: list[str] = []
+
+    async def handle(request: web.Request) -> web.Response:
+        method = request.match_info['method']
+        requested_methods.append(method)
+        if method == 'getMe':
+            return web.json_response({
+                'ok': True,
+                'result': {'id': 1, 'is_bot': True, 'first_name': 'Bot'},
+            })
+        return web.json_response(
+            {
+                'ok': False,
+                'error_code': 429,
+                'description': 'Too Many Requests: retry after 1',
+                'parameters': {'retry_after': 1},
+            },
+            status=429,
+        )
+
+    async def main() -> None:
+        app = web.Application()
+        app.add_routes([web.post('/bot{token}/{method}', handle)])
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        _, port = runner.addresses[0]
+        send_queue = OutboundSendQueue()
+        bot = QueuedBot(
+            '123456789:ABCDEFGHIJKLMNOPQRSabcdefghklmnopqrs',
+            server=TelegramAPIServer.from_base(f'http://127.0.0.1:{port}'),
+            send_queue=send_queue,
+        )
+        try:
+            await test(bot, send_queue, requested_methods)
+        finally:
+            await send_queue.close()
+            await (await bot.get_session()).close()
+            await runner.cleanup()
+
+    asyncio.run(main())
+
+
+def test_queued_bot_rate_limits_sending_and_pauses_on_flood():
+
+    async def test(bot, send_queue, requested_methods) -> None:
+        await bot.get_me()
+        with pytest.raises(RetryAfter):
+            await bot.send_message(chat_id=1, text='Hello')
+
+        stats = {
+            stats.priority_name: stats for stats in send_queue.get_stats()
+        }
+        assert requested_methods == ['getMe', 'sendMessage']
+        assert stats['INTERACTIVE'].calls_count == 1
+
+        # flood wait of one chat does not delay calls to other chats
+        started_at = time.monotonic()
+        await send_queue.acquire(2)
+        assert time.monotonic() - started_at < 0.1
+
+        started_at = time.monotonic()
+        await send_queue.acquire(1)
+        assert time.monotonic() - started_at >= 0.9
+
+    run_with_stand_in_server(test)
+
+
+def test_pause_without_chat_stops_all_calls():
+    send_queue = OutboundSendQueue(global_rate=1000, per_chat_rate=1000)
+
+    async def main() -> float:
+        send_queue.pause(0.2)
+        started_at = time.monotonic()
+        await send_queue.acquire(1)
+        await send_queue.close()
+        return time.monotonic() - started_at
+
+    assert asyncio.run(main()) >= 0.19
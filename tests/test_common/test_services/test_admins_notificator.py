@@ -0,0 +1,66 @@
+import asyncio
+from collections.abc import Iterable
+
+from aiogram.utils.exceptions import BotBlocked, ChatNotFound, NetworkError
+
+from common.admins import AdminTelegramIds
+from common.services import AdminsNotificator
+
+
+class MockBot:
+
+    def __init__(self, errors_by_chat_id: dict[int, Exception]):
+        self.__errors_by_chat_id = errors_by_chat_id
+        self.sent_to_chat_ids: list[int] = []
+
+    async def send_message(self, *, chat_id, text, reply_markup=None):
+        error = self.__errors_by_chat_id.get(chat_id)
+        if error is not None:
+            raise error
+        self.sent_to_chat_ids.append(chat_id)
+        return chat_id
+
+
+class MockUserRepository:
+
+    def __init__(self):
+        self.unreachable_telegram_ids: list[int] = []
+
+    async def mark_unreachable(self, telegram_ids: Iterable[int]) -> None:
+        self.unreachable_telegram_ids += telegram_ids
+
+
+ERRORS_BY_CHAT_ID = {
+    2: BotBlocked('Forbidden: bot was blocked by the user'),
+    3: ChatNotFound('Chat not found'),
+    4: NetworkError('Connection reset'),
+}
+
+
+def test_admins_notificator_marks_unreachable_admins():
+    bot = MockBot(ERRORS_BY_CHAT_ID)
+    user_repository = MockUserRepository()
+    admins_notificator = AdminsNotificator(
+        admin_ids=AdminTelegramIds([1, 2, 3, 4]),
+        bot=bot,
+        user_repository=user_repository,
+    )
+
+    asyncio.run(admins_notificator.notify('Notification'))
+
+    assert bot.sent_to_chat_ids == [1]
+    assert sorted(user_repository.unreachable_telegram_ids) == [2, 3]
+
+
+def test_admins_notificator_uses_reloaded_admins():
+    bot = MockBot({})
+    admin_telegram_ids = AdminTelegramIds([1, 2])
+    admins_notificator = AdminsNotificator(
+        admin_ids=admin_telegram_ids,
+        bot=bot,
+    )
+
+    admin_telegram_ids.reload([3])
+    asyncio.run(admins_notificator.notify('Notification'))
+
+    assert bot.sent_to_chat_ids == [3]
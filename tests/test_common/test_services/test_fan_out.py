@@ -0,0 +1,35 @@
+import asyncio
+
+from aiogram.utils.exceptions import BotBlocked
+
+from common.services import fan_out
+
+
+def test_fan_out_caps_concurrency_and_collects_errors():
+    concurrent_calls_count = 0
+    max_concurrent_calls_count = 0
+
+    async def send(chat_id: int) -> int:
+        nonlocal concurrent_calls_count, max_concurrent_calls_count
+        concurrent_calls_count += 1
+        max_concurrent_calls_count = max(
+            max_concurrent_calls_count,
+            concurrent_calls_count,
+        )
+        try:
+            await asyncio.sleep(0.01)
+            if chat_id % 5 == 0:
+                raise BotBlocked('Forbidden: bot was blocked by the user')
+            return chat_id * 10
+        finally:
+            concurrent_calls_count -= 1
+
+    result = asyncio.run(fan_out(range(1, 21), send, max_concurrency=3))
+
+    assert max_concurrent_calls_count == 3
+    assert sorted(result.errors) == [5, 10, 15, 20]
+    assert all(
+        isinstance(error, BotBlocked) for error in result.errors.values()
+    )
+    assert result.results[7] == 70
+    assert len(result.results) == 16
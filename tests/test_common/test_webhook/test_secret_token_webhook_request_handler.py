@@ -0,0 +1,178 @@
+import asyncio
+import copy
+import json
+import pathlib
+
+import pytest
+from aiogram import Bot, Dispatcher
+from aiogram.dispatcher.webhook import BOT_DISPATCHER_KEY
+from aiogram.types import Message
+from aiohttp.test_utils import TestClient, TestServer
+
+import config
+from common.webhook import (
+    SECRET_TOKEN_HEADER,
+    SecretTokenWebhookRequestHandler,
+    create_webhook_app,
+)
+
+RECORDED_UPDATE_PATH = (
+    pathlib.Path(__file__).parents[3]
+    / 'scripts' / 'webhook_updates' / 'start_command.json'
+)
+RECORDED_UPDATE = json.loads(RECORDED_UPDATE_PATH.read_text())
+
+
+def make_update(update_id: int) -> dict:
+    update = copy.deepcopy(RECORDED_UPDATE)
+    update['update_id'] = update_id
+    update['message']['message_id'] = update_id
+    return update
+
+
+def run_with_webhook_client(
+        test,
+        *,
+        secret_token: str | None = 'secret',
+        max_concurrent_updates: int = 10,
+        handler_delay: float = 0,
+) -> tuple[list[int], int]:
+    """Run test with client of webhook server backed by real dispatcher.
+
+    Returns ids of handled messages and the highest number of
+    handlers that were running at the same time.
+    """
+    handled_message_ids: list[int] = []
+    running_handlers_count = 0
+    max_running_handlers_count = 0
+
+    async def on_message(message: Message) -> None:
+        nonlocal running_handlers_count, max_running_handlers_count
+        running_handlers_count += 1
+        max_running_handlers_count = max(
+            max_running_handlers_count,
+            running_handlers_count,
+        )
+        await asyncio.sleep(handler_delay)
+        handled_message_ids.append(message.message_id)
+        running_handlers_count -= 1
+
+    async def main() -> None:
+        bot = Bot('123456789:ABCDEFGHIJKLMNOPQRSabcdefghklmnopqrs')
+        dispatcher = Dispatcher(bot)
+        dispatcher.register_message_handler(on_message)
+        app = create_webhook_app(
+            secret_token=secret_token,
+            max_concurrent_updates=max_concurrent_updates,
+        )
+        app.router.add_route(
+            '*',
+            '/webhook',
+            SecretTokenWebhookRequestHandler,
+        )
+        app[BOT_DISPATCHER_KEY] = dispatcher
+        async with TestClient(TestServer(app)) as client:
+            await test(client)
+        await (await bot.get_session()).close()
+
+    asyncio.run(main())
+    return handled_message_ids, max_running_handlers_count
+
+
+def test_recorded_update_is_handled():
+
+    async def test(client: TestClient) -> None:
+        response = await client.post(
+            '/webhook',
+            json=make_update(1),
+            headers={SECRET_TOKEN_HEADER: 'secret'},
+        )
+        assert response.status == 200
+        assert await response.text() == 'ok'
+
+    handled_message_ids, _ = run_with_webhook_client(test)
+
+    assert handled_message_ids == [1]
+
+
+def test_requests_without_valid_secret_token_are_rejected():
+
+    async def test(client: TestClient) -> None:
+        response = await client.post('/webhook', json=make_update(1))
+        assert response.status == 401
+        response = await client.post(
+            '/webhook',
+            json=make_update(2),
+            headers={SECRET_TOKEN_HEADER: 'wrong'},
+        )
+        assert response.status == 401
+
+    handled_message_ids, _ = run_with_webhook_client(test)
+
+    assert handled_message_ids == []
+
+
+def test_secret_token_check_is_disabled_without_secret_token():
+
+    async def test(client: TestClient) -> None:
+        response = await client.post('/webhook', json=make_update(1))
+        assert response.status == 200
+
+    handled_message_ids, _ = run_with_webhook_client(test, secret_token=None)
+
+    assert handled_message_ids == [1]
+
+
+def test_updates_are_processed_concurrently_up_to_limit():
+
+    async def test(client: TestClient) -> None:
+        responses = await asyncio.gather(
+            *(
+                client.post(
+                    '/webhook',
+                    json=make_update(update_id),
+                    headers={SECRET_TOKEN_HEADER: 'secret'},
+                ) for update_id in range(1, 11)
+            )
+        )
+        assert all(response.status == 200 for response in responses)
+
+    handled_message_ids, max_running_handlers_count = (
+        run_with_webhook_client(
+            test,
+            max_concurrent_updates=3,
+            handler_delay=0.05,
+        )
+    )
+
+    assert sorted(handled_message_ids) == list(range(1, 11))
+    assert max_running_handlers_count == 3
+
+
+@pytest.mark.parametrize('secret_token', ['', None])
+def test_secret_token_check_is_disabled_with_empty_secret_token(
+        secret_token,
+):
+
+    async def test(client: TestClient) -> None:
+        response = await client.post(
+            '/webhook',
+            json=make_update(1),
+            headers={SECRET_TOKEN_HEADER: 'anything'},
+        )
+        assert response.status == 200
+
+    handled_message_ids, _ = run_with_webhook_client(
+        test,
+        secret_token=secret_token,
+    )
+
+    assert handled_message_ids == [1]
+
+
+def test_empty_secret_token_setting_is_unset(monkeypatch):
+    monkeypatch.setenv('WEBHOOK_SECRET_TOKEN', '')
+    assert config.WebhookSettings().secret_token is None
+
+    monkeypatch.setenv('WEBHOOK_SECRET_TOKEN', 'secret')
+    assert config.WebhookSettings().secret_token == 'secret'
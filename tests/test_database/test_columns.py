@@ -0,0 +1,109 @@
+import asyncio
+
+import sqlalchemy
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database.schemas.base import Base
+from database.setup import (
+    create_missing_columns,
+    create_missing_indexes,
+    relax_not_null_columns,
+)
+from products.repositories import ProductRepository
+
+
+def test_create_missing_columns(tmp_path):
+    engine = create_engine(f'sqlite:///{tmp_path / "database.db"}')
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.exec_driver_sql('ALTER TABLE users DROP COLUMN is_reachable')
+        connection.exec_driver_sql(
+            'INSERT INTO users (telegram_id, balance, is_banned,'
+            ' permanent_discount, updated_at)'
+            ' VALUES (1, 0, 0, 0, CURRENT_TIMESTAMP)'
+        )
+
+    create_missing_columns(engine)
+
+    with engine.connect() as connection:
+        column_names = {
+            column['name']
+            for column in sqlalchemy.inspect(connection).get_columns('users')
+        }
+        is_reachable = connection.exec_driver_sql(
+            'SELECT is_reachable FROM users',
+        ).scalar_one()
+    engine.dispose()
+
+    assert 'is_reachable' in column_names
+    assert is_reachable == 1
+
+
+def test_relax_not_null_columns(tmp_path):
+    engine = create_engine(f'sqlite:///{tmp_path / "database.db"}')
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        # product units table as it was created before sale ID of units
+        # that are not sold yet became nullable
+        connection.exec_driver_sql('DROP TABLE product_units')
+        connection.exec_driver_sql(
+            'CREATE TABLE product_units ('
+            ' product_id INTEGER NOT NULL REFERENCES products (id),'
+            ' content VARCHAR NOT NULL,'
+            ' type VARCHAR NOT NULL,'
+            ' sale_id INTEGER NOT NULL REFERENCES sales (id),'
+            ' id INTEGER NOT NULL PRIMARY KEY,'
+            ' created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,'
+            ' updated_at TIMESTAMP NOT NULL'
+            ')'
+        )
+        connection.exec_driver_sql(
+            'INSERT INTO product_units'
+            ' (product_id, content, type, sale_id, updated_at)'
+            " VALUES (1, 'sold', 'text', 1, CURRENT_TIMESTAMP)"
+        )
+        connection.exec_driver_sql(
+            'INSERT INTO categories'
+            ' (name, priority, max_displayed_stock_count, is_hidden,'
+            ' can_be_seen, updated_at)'
+            " VALUES ('Category', 0, 0, 0, 1, CURRENT_TIMESTAMP)"
+        )
+        connection.exec_driver_sql(
+            'INSERT INTO products'
+            ' (category_id, name, description, price, quantity,'
+            ' max_replacement_time_in_minutes,'
+            ' is_duplicated_stock_entries_allowed, is_hidden,'
+            ' can_be_purchased, max_displayed_stock_count, updated_at)'
+            " VALUES (1, 'Product', 'Product', 1, 0, 15, 0, 0, 1, 0,"
+            ' CURRENT_TIMESTAMP)'
+        )
+
+    relax_not_null_columns(engine)
+    create_missing_columns(engine)
+    create_missing_indexes(engine)
+    imported_units_count = asyncio.run(
+        ProductRepository(sessionmaker(bind=engine)).import_units(
+            product_id=1,
+            contents=['login:password'],
+        ),
+    )
+
+    with engine.connect() as connection:
+        inspector = sqlalchemy.inspect(connection)
+        sale_id_column = next(
+            column for column in inspector.get_columns('product_units')
+            if column['name'] == 'sale_id'
+        )
+        index_names = {
+            index['name'] for index in inspector.get_indexes('product_units')
+        }
+        units = connection.exec_driver_sql(
+            'SELECT content, sale_id FROM product_units ORDER BY id',
+        ).all()
+    engine.dispose()
+
+    assert imported_units_count == 1
+    assert sale_id_column['nullable']
+    assert 'ix_product_units_product_id_sale_id' in index_names
+    assert units == [('sold', 1), ('login:password', None)]
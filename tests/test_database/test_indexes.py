@@ -0,0 +1,226 @@
+import asyncio
+import contextlib
+import datetime
+from collections.abc import Callable
+
+import pytest
+from sqlalchemy import Engine, create_engine, event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from cart.repositories import CartRepository
+from database import queries
+from database.schemas import Category, MailingSegment, SupportTicketStatus
+from database.schemas.base import Base
+from database.setup import create_missing_indexes
+from sales.repositories import SaleRepository
+from support.repositories import SupportTicketRepository
+from users.exceptions import UserNotInDatabase
+from users.repositories import UserRepository
+
+
+@pytest.fixture
+def database_url(tmp_path) -> str:
+    return f'sqlite:///{tmp_path / "database.db"}'
+
+
+@pytest.fixture
+def engine(database_url) -> Engine:
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def capture_statements(engine: Engine, call: Callable[[], object]) -> list:
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, many):
+        statements.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', on_execute)
+    try:
+        call()
+    finally:
+        event.remove(engine, 'before_cursor_execute', on_execute)
+    return statements
+
+
+def explain_query_plans(engine: Engine, statements: list) -> list[str]:
+    details = []
+    with engine.connect() as connection:
+        for statement, parameters in statements:
+            rows = connection.exec_driver_sql(
+                f'EXPLAIN QUERY PLAN {statement}',
+                parameters,
+            ).all()
+            details += [detail for *_, detail in rows]
+    return details
+
+
+async def get_mailing_recipient_pages(
+        repository: UserRepository,
+        **kwargs,
+) -> list[list[tuple[int, int]]]:
+    return [
+        page async for page in repository.iter_mailing_recipients(**kwargs)
+    ]
+
+
+def assert_index_used(details: list[str], index_name: str) -> None:
+    assert any(index_name in detail for detail in details), details
+
+
+def test_create_missing_indexes(engine):
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.drop(connection)
+
+    create_missing_indexes(engine)
+
+    with engine.connect() as connection:
+        index_names = set(
+            connection.exec_driver_sql(
+                'SELECT name FROM sqlite_master WHERE type = \'index\'',
+            ).scalars()
+        )
+    assert {
+        index.name
+        for table in Base.metadata.sorted_tables
+        for index in table.indexes
+    } <= index_names
+
+
+@pytest.mark.parametrize(
+    'call, index_name',
+    [
+        (
+            lambda repository: repository.is_banned(1),
+            'sqlite_autoindex_users_1',
+        ),
+        (
+            lambda repository: repository.get_by_telegram_id(1),
+            'sqlite_autoindex_users_1',
+        ),
+        (
+            lambda repository: get_mailing_recipient_pages(
+                repository,
+                segment=MailingSegment.BUYERS,
+            ),
+            'ix_sales_user_id_created_at',
+        ),
+        (
+            lambda repository: get_mailing_recipient_pages(
+                repository,
+                segment=MailingSegment.WITH_CART,
+            ),
+            'ix_cart_products_user_id',
+        ),
+        (
+            lambda repository: get_mailing_recipient_pages(
+                repository,
+                segment=MailingSegment.REGISTERED_AFTER,
+                registered_after=datetime.datetime(2023, 1, 1),
+            ),
+            'ix_users_created_at',
+        ),
+    ],
+)
+def test_user_repository_uses_index(database_url, engine, call, index_name):
+    async_engine = create_async_engine(
+        database_url.replace('sqlite://', 'sqlite+aiosqlite://'),
+    )
+    repository = UserRepository(async_sessionmaker(bind=async_engine))
+
+    async def run_call() -> None:
+        with contextlib.suppress(UserNotInDatabase):
+            await call(repository)
+        await async_engine.dispose()
+
+    statements = capture_statements(
+        async_engine.sync_engine,
+        lambda: asyncio.run(run_call()),
+    )
+
+    assert_index_used(explain_query_plans(engine, statements), index_name)
+
+
+@pytest.mark.parametrize(
+    'repository_class, call, index_name',
+    [
+        (
+            CartRepository,
+            lambda repository: repository.get_cart_products(
+                user_telegram_id=1,
+            ),
+            'ix_cart_products_user_id',
+        ),
+        (
+            SupportTicketRepository,
+            lambda repository: repository.get_by_user_telegram_id(1),
+            'ix_support_tickets_user_id_created_at',
+        ),
+        (
+            SupportTicketRepository,
+            lambda repository: repository.get_latest_support_ticket_or_none(
+                user_telegram_id=1,
+            ),
+            'ix_support_tickets_user_id_created_at',
+        ),
+        (
+            SupportTicketRepository,
+            lambda repository: repository.get_all_closed(),
+            'ix_support_tickets_status',
+        ),
+        (
+            SupportTicketRepository,
+            lambda repository: repository.get_support_tickets_by_filter(
+                status=SupportTicketStatus.OPEN,
+            ),
+            'ix_support_tickets_status',
+        ),
+        (
+            SaleRepository,
+            lambda repository: repository.count_by_user_id(1),
+            'ix_sales_user_id_created_at',
+        ),
+    ],
+)
+def test_repository_uses_index(engine, repository_class, call, index_name):
+    repository = repository_class(sessionmaker(bind=engine))
+
+    statements = capture_statements(engine, lambda: call(repository))
+
+    assert_index_used(explain_query_plans(engine, statements), index_name)
+
+
+def test_not_sold_product_units_query_uses_index(engine):
+    session_factory = sessionmaker(bind=engine)
+
+    def call() -> None:
+        with session_factory() as session:
+            queries.get_not_sold_product_units(session, product_id=1)
+
+    statements = capture_statements(engine, call)
+
+    assert_index_used(
+        explain_query_plans(engine, statements),
+        'ix_product_units_product_id_sale_id',
+    )
+
+
+def test_category_children_lookup_uses_index(engine):
+    statement = select(Category).where(Category.parent_id == 1)
+    session_factory = sessionmaker(bind=engine)
+
+    def call() -> None:
+        with session_factory() as session:
+            session.scalars(statement).all()
+
+    statements = capture_statements(engine, call)
+
+    assert_index_used(
+        explain_query_plans(engine, statements),
+        'ix_categories_parent_id',
+    )
@@ -0,0 +1,260 @@
+import asyncio
+from dataclasses import dataclass
+
+from aiogram.utils.exceptions import BotBlocked
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from common.rate_limiters import TokenBucket
+from database.schemas.base import Base
+from mailing.models import MailingJobStatus, MailingStats
+from mailing.repositories import MailingJobRepository
+from mailing.services import MailingJobManager
+from users.repositories import UserRepository
+
+USERS_COUNT = 25
+
+
+@dataclass(frozen=True)
+class MockChat:
+    id: int
+
+
+@dataclass(frozen=True)
+class MockMessage:
+    chat: MockChat
+    message_id: int
+
+
+class MockBot:
+
+    def __init__(self, blocked_chat_ids: tuple[int, ...] = ()):
+        self.__blocked_chat_ids = blocked_chat_ids
+        self.copied_to_chat_ids: list[int] = []
+        self.edited_texts: list[str] = []
+        self.is_sending_allowed = asyncio.Event()
+        self.is_sending_allowed.set()
+
+    async def copy_message(self, *, chat_id, from_chat_id, message_id):
+        await self.is_sending_allowed.wait()
+        if chat_id in self.__blocked_chat_ids:
+            raise BotBlocked('Forbidden: bot was blocked by the user')
+        self.copied_to_chat_ids.append(chat_id)
+
+    async def edit_message_text(self, *, text, chat_id, message_id, **_):
+        self.edited_texts.append(text)
+
+
+def run_with_manager(
+        tmp_path,
+        test,
+        blocked_chat_ids: tuple[int, ...] = (),
+) -> None:
+    database_path = tmp_path / 'database.db'
+    Base.metadata.create_all(create_engine(f'sqlite:///{database_path}'))
+    engine = create_async_engine(f'sqlite+aiosqlite:///{database_path}')
+    user_repository = UserRepository(
+        async_sessionmaker(bind=engine, expire_on_commit=False),
+    )
+    mailing_job_repository = MailingJobRepository(
+        sessionmaker(bind=create_engine(f'sqlite:///{database_path}')),
+    )
+
+    async def main() -> None:
+        for telegram_id in range(1000, 1000 + USERS_COUNT):
+            await user_repository.create(telegram_id=telegram_id)
+        bot = MockBot(blocked_chat_ids)
+        mailing_job_manager = MailingJobManager(
+            bot=bot,
+            mailing_job_repository=mailing_job_repository,
+            user_repository=user_repository,
+            rate_limiter=TokenBucket(rate=10000),
+            page_size=10,
+            progress_update_interval=0.01,
+        )
+        await test(
+            bot,
+            mailing_job_manager,
+            mailing_job_repository,
+            user_repository,
+        )
+        await mailing_job_manager.shutdown()
+        await engine.dispose()
+
+    asyncio.run(main())
+
+
+async def wait_for_status(
+        mailing_job_repository: MailingJobRepository,
+        mailing_job_id: int,
+        status: MailingJobStatus,
+) -> None:
+    for _ in range(500):
+        mailing_job = await mailing_job_repository.get_by_id(mailing_job_id)
+        if mailing_job.status == status:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f'Mailing job is not {status.value}')
+
+
+async def start(mailing_job_manager: MailingJobManager):
+    return await mailing_job_manager.start(
+        message=MockMessage(chat=MockChat(id=1), message_id=10),
+        progress_message=MockMessage(chat=MockChat(id=1), message_id=11),
+    )
+
+
+def test_mailing_job_completes_with_checkpoints(tmp_path):
+
+    async def test(bot, mailing_job_manager, mailing_job_repository, _):
+        mailing_job = await start(mailing_job_manager)
+        await wait_for_status(
+            mailing_job_repository,
+            mailing_job.id,
+            MailingJobStatus.COMPLETED,
+        )
+        mailing_job = await mailing_job_repository.get_by_id(mailing_job.id)
+
+        assert sorted(bot.copied_to_chat_ids) == list(
+            range(1000, 1000 + USERS_COUNT),
+        )
+        assert mailing_job.last_user_id == USERS_COUNT
+        assert mailing_job.stats.sent_count == USERS_COUNT
+        assert bot.edited_texts[-1].startswith(
+            '✅ The newsletter is completed',
+        )
+
+    run_with_manager(tmp_path, test)
+
+
+def test_running_mailing_job_is_resumed_from_checkpoint(tmp_path):
+
+    async def test(bot, mailing_job_manager, mailing_job_repository, _):
+        mailing_job = await mailing_job_repository.create(
+            from_chat_id=1,
+            message_id=10,
+            progress_chat_id=1,
+            progress_message_id=11,
+        )
+        await mailing_job_repository.save_checkpoint(
+            mailing_job_id=mailing_job.id,
+            last_user_id=20,
+            stats=MailingStats(sent_count=18, blocked_count=2),
+        )
+
+        await mailing_job_manager.resume_running()
+        await wait_for_status(
+            mailing_job_repository,
+            mailing_job.id,
+            MailingJobStatus.COMPLETED,
+        )
+        mailing_job = await mailing_job_repository.get_by_id(mailing_job.id)
+
+        assert sorted(bot.copied_to_chat_ids) == list(
+            range(1020, 1000 + USERS_COUNT),
+        )
+        assert mailing_job.stats.sent_count == 23
+        assert mailing_job.stats.blocked_count == 2
+
+    run_with_manager(tmp_path, test)
+
+
+def test_mailing_job_pause_resume_and_cancel(tmp_path):
+
+    async def test(bot, mailing_job_manager, mailing_job_repository, _):
+        bot.is_sending_allowed.clear()
+        mailing_job = await start(mailing_job_manager)
+        assert await mailing_job_manager.pause(mailing_job.id)
+        bot.is_sending_allowed.set()
+        await wait_for_status(
+            mailing_job_repository,
+            mailing_job.id,
+            MailingJobStatus.PAUSED,
+        )
+        assert bot.edited_texts[-1].startswith('⏸ The newsletter is paused')
+
+        bot.is_sending_allowed.clear()
+        assert await mailing_job_manager.resume(mailing_job.id)
+        assert not await mailing_job_manager.resume(mailing_job.id)
+        await asyncio.sleep(0.05)
+        assert await mailing_job_manager.cancel(mailing_job.id)
+        await wait_for_status(
+            mailing_job_repository,
+            mailing_job.id,
+            MailingJobStatus.CANCELLED,
+        )
+
+        assert len(bot.copied_to_chat_ids) < USERS_COUNT
+        assert not await mailing_job_manager.resume(mailing_job.id)
+        assert not await mailing_job_manager.cancel(mailing_job.id)
+
+    run_with_manager(tmp_path, test)
+
+
+def test_mailing_job_fails_on_unexpected_error(tmp_path):
+
+    async def test(
+            bot,
+            mailing_job_manager,
+            mailing_job_repository,
+            user_repository,
+    ):
+
+        async def mark_unreachable(telegram_ids) -> None:
+            raise RuntimeError('Database is unavailable')
+
+        user_repository.mark_unreachable = mark_unreachable
+        mailing_job = await start(mailing_job_manager)
+        await wait_for_status(
+            mailing_job_repository,
+            mailing_job.id,
+            MailingJobStatus.FAILED,
+        )
+        await asyncio.sleep(0.05)
+
+        assert bot.edited_texts[-1].startswith('❌ The newsletter failed')
+        assert not await mailing_job_manager.resume(mailing_job.id)
+        assert not await mailing_job_manager.cancel(mailing_job.id)
+
+    run_with_manager(tmp_path, test)
+
+
+def test_blocked_users_are_skipped_by_next_mailing(tmp_path):
+
+    async def test(
+            bot,
+            mailing_job_manager,
+            mailing_job_repository,
+            user_repository,
+    ):
+        mailing_job = await start(mailing_job_manager)
+        await wait_for_status(
+            mailing_job_repository,
+            mailing_job.id,
+            MailingJobStatus.COMPLETED,
+        )
+        mailing_job = await mailing_job_repository.get_by_id(mailing_job.id)
+        assert mailing_job.stats.blocked_count == 2
+
+        mailing_job = await start(mailing_job_manager)
+        await wait_for_status(
+            mailing_job_repository,
+            mailing_job.id,
+            MailingJobStatus.COMPLETED,
+        )
+        mailing_job = await mailing_job_repository.get_by_id(mailing_job.id)
+        assert mailing_job.stats.blocked_count == 0
+        assert mailing_job.stats.sent_count == USERS_COUNT - 2
+
+        await user_repository.mark_reachable(1003)
+        recipient_telegram_ids = [
+            telegram_id
+            async for page in user_repository.iter_mailing_recipients()
+            for _, telegram_id in page
+        ]
+        assert 1003 in recipient_telegram_ids
+        assert 1017 not in recipient_telegram_ids
+
+    run_with_manager(tmp_path, test, blocked_chat_ids=(1003, 1017))
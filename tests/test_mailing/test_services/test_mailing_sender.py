@@ -0,0 +1,116 @@
+import asyncio
+from collections.abc import AsyncIterator
+
+from aiogram.utils.exceptions import (
+    BadRequest,
+    BotBlocked,
+    NetworkError,
+    RetryAfter,
+    UserDeactivated,
+)
+
+from common.rate_limiters import TokenBucket
+from mailing.models import SendFailureReason
+from mailing.services import MailingSender
+
+
+class MockSend:
+
+    def __init__(self, errors_by_chat_id: dict[int, list[Exception]]):
+        self.__errors_by_chat_id = errors_by_chat_id
+        self.calls: list[int] = []
+        self.concurrent_calls_count = 0
+        self.max_concurrent_calls_count = 0
+
+    async def __call__(self, chat_id: int) -> None:
+        self.calls.append(chat_id)
+        self.concurrent_calls_count += 1
+        self.max_concurrent_calls_count = max(
+            self.max_concurrent_calls_count,
+            self.concurrent_calls_count,
+        )
+        try:
+            await asyncio.sleep(0.001)
+            errors = self.__errors_by_chat_id.get(chat_id)
+            if errors:
+                raise errors.pop(0)
+        finally:
+            self.concurrent_calls_count -= 1
+
+
+def test_mailing_sender_classifies_failures():
+    send = MockSend({
+        2: [BotBlocked('Forbidden: bot was blocked by the user')],
+        3: [UserDeactivated('Forbidden: user is deactivated')],
+        4: [NetworkError('Connection reset')],
+        5: [NetworkError('Connection reset')] * 3,
+        6: [BadRequest('Message is too long')],
+    })
+    results: dict[int, SendFailureReason | None] = {}
+
+    async def on_result(chat_id, reason) -> None:
+        results[chat_id] = reason
+
+    mailing_sender = MailingSender(
+        send=send,
+        rate_limiter=TokenBucket(rate=1000),
+        workers_count=3,
+        backoff_factor=0.001,
+        on_result=on_result,
+    )
+    stats = asyncio.run(mailing_sender.run(range(1, 8)))
+
+    assert results == {
+        1: None,
+        2: SendFailureReason.BLOCKED,
+        3: SendFailureReason.DEACTIVATED,
+        4: None,
+        5: SendFailureReason.TRANSIENT,
+        6: SendFailureReason.OTHER,
+        7: None,
+    }
+    assert stats.sent_count == 3
+    assert stats.blocked_count == 1
+    assert stats.deactivated_count == 1
+    assert stats.transient_failed_count == 1
+    assert stats.other_failed_count == 1
+    assert stats.processed_count == 7
+    assert send.calls.count(5) == 3
+    assert send.max_concurrent_calls_count <= 3
+
+
+def test_mailing_sender_backs_off_on_retry_after():
+    send = MockSend({1: [RetryAfter(1)]})
+    rate_limiter = TokenBucket(rate=1000)
+    pauses: list[float] = []
+    pause = rate_limiter.pause
+
+    def record_pause(seconds: float) -> None:
+        pauses.append(seconds)
+        pause(0.01)
+
+    rate_limiter.pause = record_pause
+    mailing_sender = MailingSender(send=send, rate_limiter=rate_limiter)
+    stats = asyncio.run(mailing_sender.run([1, 2]))
+
+    assert pauses == [1]
+    assert stats.sent_count == 2
+    assert stats.retry_after_count == 1
+    assert send.calls.count(1) == 2
+
+
+def test_mailing_sender_accepts_async_iterable():
+    send = MockSend({})
+
+    async def get_chat_ids() -> AsyncIterator[int]:
+        for chat_id in range(50):
+            yield chat_id
+
+    mailing_sender = MailingSender(
+        send=send,
+        rate_limiter=TokenBucket(rate=1000),
+    )
+    stats = asyncio.run(mailing_sender.run(get_chat_ids()))
+
+    assert stats.sent_count == 50
+    assert sorted(send.calls) == list(range(50))
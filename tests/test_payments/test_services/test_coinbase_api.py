@@ -0,0 +1,109 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+
+import pytest
+from aiohttp import web
+
+from payments.exceptions import CoinbaseAPIError
+from payments.models import ChargeStatus
+from payments.services.payments_apis import CoinbaseAPI
+from payments.services.payments_apis.http_client import create_http_client
+
+
+def run_with_stand_in_server(
+        routes: list[web.RouteDef],
+        test: Callable[[CoinbaseAPI], Awaitable[None]],
+) -> None:
+    """Run test against local server standing in for Coinbase Commerce."""
+
+    async def main() -> None:
+        app = web.Application()
+        app.add_routes(routes)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        _, port = runner.addresses[0]
+        async with create_http_client() as http_client:
+            coinbase_api = CoinbaseAPI(
+                'api-key',
+                http_client=http_client,
+                api_url=f'http://127.0.0.1:{port}',
+            )
+            try:
+                await test(coinbase_api)
+            finally:
+                await runner.cleanup()
+
+    asyncio.run(main())
+
+
+def test_create_charge():
+    requests = []
+
+    async def create_charge(request: web.Request) -> web.Response:
+        requests.append((dict(request.headers), await request.json()))
+        return web.json_response(
+            {'data': {'id': 'charge-id', 'hosted_url': 'https://pay'}},
+            status=201,
+        )
+
+    async def test(coinbase_api: CoinbaseAPI) -> None:
+        charge = await coinbase_api.create_charge('Balance', '10.50')
+        assert charge == {'id': 'charge-id', 'hosted_url': 'https://pay'}
+
+    run_with_stand_in_server([web.post('/charges', create_charge)], test)
+
+    (headers, body), = requests
+    assert headers['X-CC-Api-Key'] == 'api-key'
+    assert body['local_price'] == {'amount': '10.50', 'currency': 'USD'}
+
+
+def test_check_charge_is_retried_on_server_error():
+    responses = [
+        web.json_response({}, status=503),
+        web.json_response({
+            'data': {'timeline': [{'status': 'COMPLETED'}]},
+        }),
+    ]
+
+    async def get_charge(request: web.Request) -> web.Response:
+        assert request.match_info['charge_id'] == 'charge-id'
+        return responses.pop(0)
+
+    async def test(coinbase_api: CoinbaseAPI) -> None:
+        result = await coinbase_api.check_charge('charge-id')
+        assert result.status == ChargeStatus.PAID
+
+    run_with_stand_in_server(
+        [web.get('/charges/{charge_id}', get_charge)],
+        test,
+    )
+    assert not responses
+
+
+def test_create_charge_is_not_retried_on_server_error():
+    requests_count = 0
+
+    async def create_charge(request: web.Request) -> web.Response:
+        nonlocal requests_count
+        requests_count += 1
+        return web.json_response({}, status=500)
+
+    async def test(coinbase_api: CoinbaseAPI) -> None:
+        with pytest.raises(CoinbaseAPIError):
+            await coinbase_api.create_charge('Balance', '10')
+
+    run_with_stand_in_server([web.post('/charges', create_charge)], test)
+    assert requests_count == 1
+
+
+def test_check_invalid_api_key():
+
+    async def list_charges(request: web.Request) -> web.Response:
+        return web.json_response({}, status=401)
+
+    async def test(coinbase_api: CoinbaseAPI) -> None:
+        assert not await coinbase_api.check()
+
+    run_with_stand_in_server([web.get('/charges', list_charges)], test)
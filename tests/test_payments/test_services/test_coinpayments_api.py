@@ -0,0 +1,53 @@
+import asyncio
+
+from aiohttp import web
+
+from payments.models import ChargeStatus
+from payments.services.payments_apis import CoinPaymentsAPI
+from payments.services.payments_apis.http_client import create_http_client
+
+
+def test_check_charges_batches_txids():
+    requested_txids: list[list[str]] = []
+
+    async def api(request: web.Request) -> web.Response:
+        assert request.query['cmd'] == 'get_tx_info_multi'
+        txids = request.query['txid'].split('|')
+        requested_txids.append(txids)
+        return web.json_response({
+            'error': 'ok',
+            'result': {
+                txid: {'error': 'ok', 'status': int(txid) % 3 * 100 - 100}
+                for txid in txids
+            },
+        })
+
+    async def main() -> dict:
+        app = web.Application()
+        app.add_routes([web.post('/api.php', api)])
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        _, port = runner.addresses[0]
+        async with create_http_client() as http_client:
+            coinpayments_api = CoinPaymentsAPI(
+                'public-key',
+                'secret-key',
+                http_client=http_client,
+            )
+            coinpayments_api.api_url = f'http://127.0.0.1:{port}/api.php'
+            try:
+                return await coinpayments_api.check_charges(
+                    str(txid) for txid in range(60)
+                )
+            finally:
+                await runner.cleanup()
+
+    results = asyncio.run(main())
+
+    assert [len(txids) for txids in requested_txids] == [25, 25, 10]
+    assert len(results) == 60
+    assert results['0'].status == ChargeStatus.FAILED
+    assert results['1'].status == ChargeStatus.PENDING
+    assert results['2'].status == ChargeStatus.PAID
@@ -0,0 +1,45 @@
+from decimal import Decimal
+
+import pytest
+
+from payments.models import ChargeCheckResult, ChargeStatus
+from payments.services.payments_apis.coinbase_api import (
+    parse_charge_check_result,
+)
+
+
+@pytest.mark.parametrize(
+    'last_event, expected',
+    [
+        (
+            {'status': 'NEW'},
+            ChargeCheckResult(status=ChargeStatus.PENDING),
+        ),
+        (
+            {'status': 'COMPLETED'},
+            ChargeCheckResult(status=ChargeStatus.PAID),
+        ),
+        (
+            {'status': 'UNRESOLVED', 'context': 'OVERPAID'},
+            ChargeCheckResult(status=ChargeStatus.PAID),
+        ),
+        (
+            {
+                'status': 'UNRESOLVED',
+                'context': 'UNDERPAID',
+                'payment': {'value': {'amount': '4.50'}},
+            },
+            ChargeCheckResult(
+                status=ChargeStatus.PARTIALLY_PAID,
+                paid_amount=Decimal('4.50'),
+            ),
+        ),
+        (
+            {'status': 'EXPIRED'},
+            ChargeCheckResult(status=ChargeStatus.FAILED),
+        ),
+    ],
+)
+def test_parse_charge_check_result(last_event, expected):
+    charge = {'timeline': [{'status': 'NEW'}, last_event]}
+    assert parse_charge_check_result(charge) == expected
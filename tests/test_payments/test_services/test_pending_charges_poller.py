@@ -0,0 +1,122 @@
+import asyncio
+from collections.abc import Iterable
+from decimal import Decimal
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from database.schemas import PendingCharge, PendingChargeStatus, User
+from database.schemas.base import Base
+from payments.models import ChargeCheckResult, ChargeStatus, PaymentMethod
+from payments.repositories import PendingChargeRepository
+from payments.services.pending_charges import PendingChargesPoller
+from top_up_bonuses.repositories import TopUpBonusRepository
+
+
+class MockPaymentAPI:
+
+    def __init__(self, results: dict[str, ChargeCheckResult]):
+        self.results = results
+        self.checked_charge_ids: list[str] = []
+
+    async def check_charges(
+            self,
+            charge_ids: Iterable[str],
+    ) -> dict[str, ChargeCheckResult]:
+        charge_ids = list(charge_ids)
+        self.checked_charge_ids += charge_ids
+        return {charge_id: self.results[charge_id] for charge_id in charge_ids}
+
+
+class MockBot:
+
+    def __init__(self):
+        self.sent_messages: list[tuple[int, str]] = []
+
+    async def send_message(self, *, chat_id: int, text: str):
+        self.sent_messages.append((chat_id, text))
+
+
+class MockAdminsNotificator:
+
+    def __init__(self):
+        self.notifications_count = 0
+
+    def notify_in_background(self, text, reply_markup=None):
+        self.notifications_count += 1
+
+
+def test_pending_charges_poller_credits_balance_once():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+    with session_factory() as session, session.begin():
+        session.add(User(id=1, telegram_id=100, balance=Decimal('0')))
+    pending_charge_repository = PendingChargeRepository(session_factory)
+    payment_api = MockPaymentAPI({
+        'paid': ChargeCheckResult(status=ChargeStatus.PENDING),
+        'partially-paid': ChargeCheckResult(
+            status=ChargeStatus.PARTIALLY_PAID,
+            paid_amount=Decimal('3'),
+        ),
+        'failed': ChargeCheckResult(status=ChargeStatus.FAILED),
+    })
+    bot = MockBot()
+    admins_notificator = MockAdminsNotificator()
+
+    def create_poller() -> PendingChargesPoller:
+        return PendingChargesPoller(
+            bot=bot,
+            payment_apis={PaymentMethod.COINBASE: payment_api},
+            pending_charge_repository=pending_charge_repository,
+            top_up_bonus_repository=TopUpBonusRepository(session_factory),
+            admins_notificator=admins_notificator,
+            batch_size=2,
+        )
+
+    async def main() -> None:
+        for charge_id, amount in (
+                ('paid', Decimal('10')),
+                ('partially-paid', Decimal('5')),
+                ('failed', Decimal('7')),
+        ):
+            await pending_charge_repository.create(
+                user_id=1,
+                payment_method=PaymentMethod.COINBASE,
+                charge_id=charge_id,
+                amount=amount,
+            )
+
+        await create_poller().poll()
+        assert sorted(payment_api.checked_charge_ids) == [
+            'failed',
+            'paid',
+            'partially-paid',
+        ]
+
+        # New poller resumes pending charges, as after restart.
+        payment_api.results['paid'] = ChargeCheckResult(
+            status=ChargeStatus.PAID,
+        )
+        payment_api.checked_charge_ids.clear()
+        await create_poller().poll()
+        await create_poller().poll()
+        assert payment_api.checked_charge_ids == ['paid']
+
+    asyncio.run(main())
+
+    with session_factory() as session:
+        balance = session.scalar(select(User.balance))
+        statuses = dict(
+            session.execute(
+                select(PendingCharge.charge_id, PendingCharge.status),
+            ).all()
+        )
+    assert balance == Decimal('13')
+    assert statuses == {
+        'paid': PendingChargeStatus.CREDITED,
+        'partially-paid': PendingChargeStatus.CREDITED,
+        'failed': PendingChargeStatus.FAILED,
+    }
+    assert len(bot.sent_messages) == 3
+    assert admins_notificator.notifications_count == 2
@@ -0,0 +1,64 @@
+from dataclasses import dataclass
+
+from products.cache import ProductCache
+
+
+@dataclass(frozen=True, slots=True)
+class MockProduct:
+    id: int
+    category_id: int = 1
+
+
+def test_product_cache_hits_and_misses():
+    cache = ProductCache(max_size=10)
+    assert cache.get_product(1) is None
+
+    cache.put_product(MockProduct(id=1), version=cache.version)
+
+    assert cache.get_product(1) == MockProduct(id=1)
+    stats = cache.get_stats()
+    assert (stats.hits_count, stats.misses_count) == (1, 1)
+
+
+def test_product_cache_evicts_least_recently_used():
+    cache = ProductCache(max_size=2)
+    for product_id in (1, 2):
+        cache.put_product(MockProduct(id=product_id), version=cache.version)
+    cache.get_product(1)
+
+    cache.put_product(MockProduct(id=3), version=cache.version)
+
+    assert cache.get_product(2) is None
+    assert cache.get_product(1) is not None
+    assert cache.get_stats().evictions_count == 1
+
+
+def test_product_cache_skips_put_after_invalidation():
+    cache = ProductCache(max_size=10)
+    version = cache.version
+
+    cache.invalidate_product(1)
+    cache.put_product(MockProduct(id=1), version=version)
+
+    assert cache.get_product(1) is None
+
+
+def test_product_cache_category_products():
+    cache = ProductCache(max_size=10)
+    products = [MockProduct(id=1), MockProduct(id=2)]
+    cache.put_category_products(
+        category_id=1,
+        products=products,
+        version=cache.version,
+    )
+    assert cache.get_category_products(1) == products
+
+    cache.invalidate_product(2)
+    assert cache.get_category_products(1) is None
+
+    cache.put_product(MockProduct(id=2), version=cache.version)
+    assert cache.get_category_products(1) == products
+
+    cache.invalidate_deleted_product(1)
+    assert cache.get_category_products(1) is None
+    assert cache.get_product(2) is not None
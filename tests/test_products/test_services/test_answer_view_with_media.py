@@ -0,0 +1,138 @@
+import asyncio
+import dataclasses
+from types import SimpleNamespace
+from uuid import uuid4
+
+from common.views import View
+from products.models import MediaType, ProductMedia
+from products.services import answer_view_with_media
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class MockProduct:
+    id: int
+    media: list[ProductMedia]
+
+    @property
+    def photos_and_videos(self) -> list[ProductMedia]:
+        return [
+            media for media in self.media
+            if media.type in (MediaType.PHOTO, MediaType.VIDEO)
+        ]
+
+    @property
+    def animations(self) -> list[ProductMedia]:
+        return [
+            media for media in self.media
+            if media.type == MediaType.ANIMATION
+        ]
+
+
+class MockMessage:
+
+    def __init__(self):
+        self.sent_media: list = []
+        self.uploads_count = 0
+
+    def __to_file_id(self, media) -> str:
+        if isinstance(media, str):
+            return media
+        self.uploads_count += 1
+        return f'file-id-{self.uploads_count}'
+
+    async def answer_animation(self, animation):
+        file_id = self.__to_file_id(animation)
+        self.sent_media.append(file_id)
+        return SimpleNamespace(
+            animation=SimpleNamespace(file_id=file_id),
+            video=None,
+            photo=[],
+        )
+
+    async def answer_media_group(self, media_group):
+        sent_messages = []
+        for input_media in media_group.media:
+            media = input_media.media
+            if input_media.file is not None:
+                media = input_media.file
+            file_id = self.__to_file_id(media)
+            self.sent_media.append(file_id)
+            sent_messages.append(
+                SimpleNamespace(
+                    animation=None,
+                    video=None,
+                    photo=[SimpleNamespace(file_id=file_id)],
+                ),
+            )
+        return sent_messages
+
+    async def answer(self, text, reply_markup):
+        return text
+
+
+class MockProductRepository:
+
+    def __init__(self):
+        self.saved_file_ids = {}
+
+    async def save_media_telegram_file_ids(
+            self,
+            *,
+            product_id,
+            media_telegram_file_ids,
+    ):
+        self.saved_file_ids |= media_telegram_file_ids
+
+
+def test_answer_view_with_media_reuses_telegram_file_ids(tmp_path):
+    media = [
+        ProductMedia(uuid=uuid4(), type=MediaType.ANIMATION),
+        ProductMedia(uuid=uuid4(), type=MediaType.PHOTO),
+    ]
+    for product_media in media:
+        (tmp_path / product_media.file_name).write_bytes(b'media')
+    product_repository = MockProductRepository()
+
+    message = MockMessage()
+    asyncio.run(
+        answer_view_with_media(
+            message=message,
+            base_path=tmp_path,
+            product=MockProduct(id=1, media=media),
+            view=View(),
+            product_repository=product_repository,
+        ),
+    )
+
+    assert message.uploads_count == 2
+    assert product_repository.saved_file_ids == {
+        media[0].uuid: 'file-id-1',
+        media[1].uuid: 'file-id-2',
+    }
+
+    for product_media in media:
+        (tmp_path / product_media.file_name).unlink()
+    media_with_file_ids = [
+        dataclasses.replace(
+            product_media,
+            telegram_file_id=product_repository.saved_file_ids[
+                product_media.uuid
+            ],
+        ) for product_media in media
+    ]
+    product_repository.saved_file_ids.clear()
+
+    message = MockMessage()
+    asyncio.run(
+        answer_view_with_media(
+            message=message,
+            base_path=tmp_path,
+            product=MockProduct(id=1, media=media_with_file_ids),
+            view=View(),
+            product_repository=product_repository,
+        ),
+    )
+
+    assert message.uploads_count == 0
+    assert message.sent_media == ['file-id-1', 'file-id-2']
+    assert product_repository.saved_file_ids == {}
@@ -0,0 +1,210 @@
+import asyncio
+import io
+from collections.abc import Iterator
+
+import pytest
+from sqlalchemy import event, func, select, update
+from sqlalchemy.orm import sessionmaker
+
+from common.repositories import RepositoryThreadPool
+from database import schemas
+from products.exceptions import ProductDoesNotExistError
+from products.repositories import ProductRepository
+from products.services import import_product_units
+
+
+def get_units_count_and_quantity(
+        session_factory: sessionmaker,
+        product_id: int,
+) -> tuple[int, int]:
+    with session_factory() as session:
+        units_count = session.scalar(
+            select(func.count())
+            .select_from(schemas.ProductUnit)
+            .where(
+                schemas.ProductUnit.product_id == product_id,
+                schemas.ProductUnit.sale_id.is_(None),
+            )
+        )
+        quantity = session.scalar(
+            select(schemas.Product.quantity)
+            .where(schemas.Product.id == product_id)
+        )
+    return units_count, quantity
+
+
+def test_units_are_inserted_in_batches(session_factory, create_product):
+    product_id = create_product(quantity=5)
+    repository = ProductRepository(session_factory)
+    consumed_lines_count = 0
+    imported_units_counts: list[tuple[int, int]] = []
+    statements: list[tuple[str, bool]] = []
+
+    def generate_lines() -> Iterator[str]:
+        nonlocal consumed_lines_count
+        for index in range(2500):
+            consumed_lines_count += 1
+            yield f'login{index}:password{index}\n'
+            if index % 100 == 0:
+                yield '  \n'
+
+    def on_batch_imported(imported_units_count: int) -> None:
+        imported_units_counts.append(
+            (imported_units_count, consumed_lines_count),
+        )
+
+    def on_execute(conn, cursor, statement, parameters, context, many):
+        statements.append((statement.split()[0], many))
+
+    event.listen(
+        session_factory.kw['bind'],
+        'before_cursor_execute',
+        on_execute,
+    )
+    imported_units_count = asyncio.run(
+        repository.import_units(
+            product_id=product_id,
+            contents=(
+                line.strip() for line in generate_lines() if line.strip()
+            ),
+            batch_size=1000,
+            on_batch_imported=on_batch_imported,
+        )
+    )
+
+    assert imported_units_count == 2500
+    # contents are consumed one batch at a time
+    assert imported_units_counts == [(1000, 1000), (2000, 2000), (2500, 2500)]
+    assert statements.count(('INSERT', True)) == 3
+    # every batch is committed with its own quantity increment
+    assert statements.count(('UPDATE', False)) == 3
+    assert get_units_count_and_quantity(session_factory, product_id) == (
+        2500,
+        2505,
+    )
+
+
+def test_import_reports_progress_and_skips_blank_lines(
+        session_factory,
+        create_product,
+):
+    product_id = create_product(quantity=0)
+    thread_pool = RepositoryThreadPool(max_workers=1)
+    repository = ProductRepository(session_factory, thread_pool)
+    document = io.StringIO(
+        ''.join(f'login{index}:password{index}\r\n' for index in range(5000))
+        + '\n\n'
+    )
+    reported_units_counts: list[int] = []
+
+    async def on_progress(imported_units_count: int) -> None:
+        reported_units_counts.append(imported_units_count)
+
+    imported_units_count = asyncio.run(
+        import_product_units(
+            product_repository=repository,
+            product_id=product_id,
+            lines=document,
+            on_progress=on_progress,
+            progress_interval=0,
+        )
+    )
+    thread_pool.shutdown()
+
+    assert imported_units_count == 5000
+    assert reported_units_counts == sorted(set(reported_units_counts))
+    assert all(0 < count <= 5000 for count in reported_units_counts)
+    assert get_units_count_and_quantity(session_factory, product_id) == (
+        5000,
+        5000,
+    )
+    with session_factory() as session:
+        assert session.scalar(
+            select(schemas.ProductUnit.content)
+            .order_by(schemas.ProductUnit.id.desc())
+        ) == 'login4999:password4999'
+
+
+def test_failed_import_leaves_no_units(session_factory, create_product):
+    product_id = create_product(quantity=1)
+    repository = ProductRepository(session_factory)
+    document = io.TextIOWrapper(
+        io.BytesIO(b'login:password\n' * 3000 + b'\xff\n'),
+        encoding='utf-8-sig',
+    )
+
+    async def on_progress(imported_units_count: int) -> None:
+        pass
+
+    with pytest.raises(UnicodeDecodeError):
+        asyncio.run(
+            import_product_units(
+                product_repository=repository,
+                product_id=product_id,
+                lines=document,
+                on_progress=on_progress,
+            )
+        )
+    with pytest.raises(ProductDoesNotExistError):
+        asyncio.run(
+            repository.import_units(
+                product_id=product_id + 1,
+                contents=['unit'],
+            )
+        )
+
+    assert get_units_count_and_quantity(session_factory, product_id) == (0, 1)
+
+
+def test_write_lock_is_released_between_batches(
+        session_factory,
+        create_product,
+        create_user,
+):
+    product_id = create_product(quantity=1)
+    user_id = create_user(telegram_id=100)
+    repository = ProductRepository(session_factory)
+
+    def generate_contents() -> Iterator[str]:
+        for index in range(2500):
+            yield f'login{index}:password{index}'
+        raise UnicodeDecodeError('utf-8', b'\xff', 0, 1, 'invalid start byte')
+
+    def on_batch_imported(imported_units_count: int) -> None:
+        if imported_units_count != 1000:
+            return
+        # concurrent write, e.g. a sale, is not blocked by the import
+        with session_factory() as session, session.begin():
+            sale = schemas.Sale(
+                user_id=user_id,
+                payment_method=schemas.PaymentMethod.BALANCE,
+            )
+            session.add(sale)
+            session.flush()
+            session.execute(
+                update(schemas.ProductUnit)
+                .where(schemas.ProductUnit.id == 1)
+                .values(sale_id=sale.id)
+            )
+            session.execute(
+                update(schemas.Product)
+                .where(schemas.Product.id == product_id)
+                .values(quantity=schemas.Product.quantity - 1)
+            )
+
+    with pytest.raises(UnicodeDecodeError):
+        asyncio.run(
+            repository.import_units(
+                product_id=product_id,
+                contents=generate_contents(),
+                batch_size=1000,
+                on_batch_imported=on_batch_imported,
+            )
+        )
+
+    # unsold units of the failed import are deleted, the sold one is kept
+    assert get_units_count_and_quantity(session_factory, product_id) == (0, 1)
+    with session_factory() as session:
+        assert session.scalar(
+            select(func.count()).select_from(schemas.ProductUnit)
+        ) == 1
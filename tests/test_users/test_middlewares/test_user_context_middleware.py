@@ -0,0 +1,95 @@
+import asyncio
+import time
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from aiogram.dispatcher.handler import CancelHandler
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from common.admins import AdminTelegramIds
+from database.schemas.base import Base
+from users.cache import UserCache
+from users.middlewares import UserContextMiddleware
+from users.repositories import UserRepository
+
+
+def make_message(telegram_id: int) -> SimpleNamespace:
+    return SimpleNamespace(from_user=SimpleNamespace(id=telegram_id))
+
+
+def test_user_context_is_loaded_once_and_cached(tmp_path):
+    database_path = tmp_path / 'database.db'
+    Base.metadata.create_all(create_engine(f'sqlite:///{database_path}'))
+    engine = create_async_engine(f'sqlite+aiosqlite:///{database_path}')
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    user_cache = UserCache(ttl=60, max_size=100)
+    repository = UserRepository(session_factory, user_cache)
+    middleware = UserContextMiddleware(
+        user_repository=repository,
+        admin_telegram_ids=AdminTelegramIds([200]),
+    )
+    select_statements: list[str] = []
+
+    @event.listens_for(engine.sync_engine, 'before_cursor_execute')
+    def on_execute(conn, cursor, statement, *args) -> None:
+        if statement.startswith('SELECT'):
+            select_statements.append(statement)
+
+    async def get_context(telegram_id: int) -> dict:
+        data = {}
+        await middleware.pre_process(make_message(telegram_id), data)
+        return data
+
+    async def main() -> None:
+        await repository.load_banned_telegram_ids()
+        context = await get_context(100)
+        assert context == {'is_banned': False, 'is_admin': False, 'user': None}
+
+        user = await repository.create(telegram_id=100)
+        await repository.create(telegram_id=200)
+        select_statements.clear()
+        for _ in range(5):
+            assert (await get_context(100))['user'] == user
+        assert (await get_context(200))['is_admin']
+        assert select_statements == []
+
+        await repository.top_up_balance(
+            user_id=user.id,
+            amount_to_top_up=Decimal('10'),
+        )
+        context = await get_context(100)
+        assert context['user'].balance == Decimal('10')
+        assert len(select_statements) == 1
+
+        await repository.ban_by_id(user.id)
+        with pytest.raises(CancelHandler):
+            await get_context(100)
+
+        await engine.dispose()
+
+    asyncio.run(main())
+
+
+def test_user_cache_entries_expire():
+    user_cache = UserCache(ttl=0.05, max_size=1)
+    users = [
+        SimpleNamespace(id=user_id, telegram_id=user_id + 100)
+        for user_id in (1, 2)
+    ]
+
+    user_cache.put(users[0], version=user_cache.version)
+    assert user_cache.get(101) is users[0]
+    user_cache.put(users[1], version=user_cache.version)
+    assert user_cache.get(101) is None
+    assert user_cache.get(102) is users[1]
+
+    version = user_cache.version
+    user_cache.invalidate_by_id(1)
+    user_cache.put(users[0], version=version)
+    assert user_cache.get(101) is None
+
+    time.sleep(0.06)
+    assert user_cache.get(102) is None
+    assert user_cache.get_stats().evictions_count == 1
@@ -0,0 +1,38 @@
+import asyncio
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from database.schemas.base import Base
+from users.repositories import UserRepository
+
+
+def test_banned_telegram_ids_are_kept_in_memory(tmp_path):
+    database_path = tmp_path / 'database.db'
+    Base.metadata.create_all(create_engine(f'sqlite:///{database_path}'))
+    engine = create_async_engine(f'sqlite+aiosqlite:///{database_path}')
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    repository = UserRepository(session_factory)
+    other_repository = UserRepository(session_factory)
+
+    async def main() -> None:
+        user = await repository.create(telegram_id=100)
+        await repository.ban_by_id(user.id)
+        await repository.load_banned_telegram_ids()
+        assert await repository.is_banned(100)
+
+        # Changes made by another process are picked up only on resync.
+        await other_repository.unban_by_id(user.id)
+        assert await repository.is_banned(100)
+        await repository.load_banned_telegram_ids()
+        assert not await repository.is_banned(100)
+
+        await repository.ban_by_id(user.id)
+        assert await repository.is_banned(100)
+        await repository.unban_by_id(user.id)
+        assert not await repository.is_banned(100)
+        assert not await repository.ban_by_id(user.id + 1)
+
+        await engine.dispose()
+
+    asyncio.run(main())
@@ -0,0 +1,118 @@
+import asyncio
+import datetime
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from database.schemas import (
+    CartProduct,
+    MailingSegment,
+    PaymentMethod,
+    Sale,
+    User,
+)
+from users.repositories import UserRepository
+
+
+@pytest.fixture
+def user_repository(
+        session_factory,
+        create_product,
+        create_user,
+) -> UserRepository:
+    for telegram_id in range(1001, 1011):
+        create_user(telegram_id)
+    product_id = create_product(quantity=10)
+    with session_factory() as session, session.begin():
+        session.add_all([
+            Sale(user_id=2, payment_method=PaymentMethod.BALANCE),
+            Sale(user_id=2, payment_method=PaymentMethod.BALANCE),
+            Sale(user_id=7, payment_method=PaymentMethod.COINBASE),
+            CartProduct(user_id=3, product_id=product_id, quantity=1),
+            CartProduct(user_id=4, product_id=product_id, quantity=0),
+        ])
+        session.execute(
+            update(User).where(User.id.in_((5, 6))).values(balance=10),
+        )
+        session.execute(
+            update(User)
+            .where(User.id >= 8)
+            .values(created_at=datetime.datetime(2023, 6, 1))
+        )
+        session.execute(
+            update(User)
+            .where(User.id < 8)
+            .values(created_at=datetime.datetime(2023, 1, 1))
+        )
+    database_url = session_factory.kw['bind'].url
+    async_engine = create_async_engine(
+        database_url.set(drivername='sqlite+aiosqlite'),
+    )
+    yield UserRepository(
+        async_sessionmaker(bind=async_engine, expire_on_commit=False),
+    )
+    asyncio.run(async_engine.dispose())
+
+
+def get_pages(user_repository: UserRepository, **kwargs) -> list[list]:
+
+    async def main() -> list[list]:
+        return [
+            page
+            async for page in user_repository.iter_mailing_recipients(**kwargs)
+        ]
+
+    return asyncio.run(main())
+
+
+def test_all_users_are_paged_by_id(user_repository):
+    pages = get_pages(user_repository, page_size=4)
+
+    assert [len(page) for page in pages] == [4, 4, 2]
+    assert [user_id for page in pages for user_id, _ in page] == list(
+        range(1, 11),
+    )
+    assert pages[0][0] == (1, 1001)
+
+
+def test_paging_resumes_after_user_id(user_repository):
+    pages = get_pages(user_repository, after_user_id=8, page_size=4)
+
+    assert pages == [[(9, 1009), (10, 1010)]]
+
+
+@pytest.mark.parametrize(
+    'segment, registered_after, expected_user_ids',
+    [
+        (MailingSegment.BUYERS, None, [2, 7]),
+        (MailingSegment.WITH_BALANCE, None, [5, 6]),
+        (MailingSegment.WITH_CART, None, [3]),
+        (
+            MailingSegment.REGISTERED_AFTER,
+            datetime.datetime(2023, 3, 1),
+            [8, 9, 10],
+        ),
+        (
+            MailingSegment.REGISTERED_AFTER,
+            datetime.datetime(2024, 1, 1),
+            [],
+        ),
+    ],
+)
+def test_segments(
+        user_repository,
+        segment,
+        registered_after,
+        expected_user_ids,
+):
+    pages = get_pages(
+        user_repository,
+        segment=segment,
+        registered_after=registered_after,
+        page_size=1,
+    )
+
+    assert [
+        user_id for page in pages for user_id, _ in page
+    ] == expected_user_ids
@@ -0,0 +1,43 @@
+import asyncio
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from database.schemas.base import Base
+from users.repositories import UserRepository
+
+
+def test_unreachable_users_are_excluded_from_mailings(tmp_path):
+    database_path = tmp_path / 'database.db'
+    Base.metadata.create_all(create_engine(f'sqlite:///{database_path}'))
+    engine = create_async_engine(f'sqlite+aiosqlite:///{database_path}')
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    repository = UserRepository(session_factory)
+
+    async def get_recipient_telegram_ids() -> list[int]:
+        return [
+            telegram_id
+            async for page in repository.iter_mailing_recipients()
+            for _, telegram_id in page
+        ]
+
+    async def main() -> None:
+        for telegram_id in (100, 101, 102):
+            await repository.create(telegram_id=telegram_id)
+        await repository.load_unreachable_telegram_ids()
+
+        await repository.mark_unreachable([100, 102])
+        assert await get_recipient_telegram_ids() == [101]
+
+        await repository.mark_reachable(100)
+        assert await get_recipient_telegram_ids() == [100, 101]
+
+        # Reachability set is restored from database on restart.
+        other_repository = UserRepository(session_factory)
+        await other_repository.load_unreachable_telegram_ids()
+        await other_repository.mark_reachable(102)
+        assert await get_recipient_telegram_ids() == [100, 101, 102]
+
+        await engine.dispose()
+
+    asyncio.run(main())